@@ -0,0 +1,30 @@
+"""
+Gemeinsame Fixtures der Tests
+"""
+
+import zipfile
+
+import pytest
+
+from .helpers import make_zip
+
+
+@pytest.fixture
+def conflicting_archives(tmp_path):
+    """Drei Archive, die teilweise dieselben Zielpfade schreiben (das letzte gewinnt)"""
+    zip_folder = tmp_path / "zips"
+    return [
+        make_zip(zip_folder / "a.zip", {
+            "mods/version/a.wotmod": b"a" * 5000,
+            "mods/configs/shared.json": b"from a",
+            "res_mods/configs/x.xml": b"a-x",
+        }),
+        make_zip(zip_folder / "b.zip", {
+            "mods/configs/shared.json": b"from b, longer",
+            "mods/1.0.0.0/b.wotmod": b"b" * 3000,
+        }, zipfile.ZIP_STORED),
+        make_zip(zip_folder / "c.zip", {
+            "res_mods/configs/x.xml": b"c-x",
+            "mods/configs/shared.json": b"from c",
+        }),
+    ]
@@ -0,0 +1,52 @@
+"""
+Hilfsfunktionen der Tests: synthetische ZIP-Dateien und WoT-Ordner
+"""
+
+import os
+import zipfile
+from pathlib import Path
+
+from wot_mod_installer_core import STATE_DIR_NAME, InstallSession
+
+
+# Spielversion der Test-Installationen
+VERSION = "1.2.0.0"
+
+
+def make_zip(zip_file_path, files, compression=zipfile.ZIP_DEFLATED):
+    """Erstelle eine ZIP-Datei aus {Name: Inhalt} (Reihenfolge bleibt erhalten)"""
+    zip_file_path = Path(zip_file_path)
+    zip_file_path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(zip_file_path, 'w', compression) as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return zip_file_path
+
+
+def make_game(base_path, version=VERSION):
+    """Leerer WoT-Ordner mit mods/<Version>"""
+    game_path = Path(base_path)
+    (game_path / "mods" / version).mkdir(parents=True, exist_ok=True)
+    return game_path
+
+
+def read_tree(base_path):
+    """Alle Dateien eines Ordners als {relativer Pfad: Inhalt}, ohne Verwaltungsdaten des Installers"""
+    base_path = Path(base_path)
+    tree = {}
+    for directory, dirnames, filenames in os.walk(base_path):
+        if STATE_DIR_NAME in dirnames:
+            dirnames.remove(STATE_DIR_NAME)
+        for filename in filenames:
+            file_path = Path(directory) / filename
+            tree[file_path.relative_to(base_path).as_posix()] = file_path.read_bytes()
+    return tree
+
+
+def install(game_path, zip_files, jobs=1, version=VERSION, **options):
+    """Installiere ZIP-Dateien ohne Ausgabe, gibt die Session zurück (Meldungen in session.messages)"""
+    messages = []
+    session = InstallSession(game_path, version, log=messages.append, file_log=lambda message: None, **options)
+    session.messages = messages
+    session.install_all(zip_files, jobs)
+    return session
@@ -0,0 +1,55 @@
+"""
+Benchmarks: Zählung der Dateisystem-Aufrufe und Vergleich mit der Baseline
+"""
+
+import builtins
+import io
+import os
+
+import pytest
+
+from wot_mod_installer_bench import SyscallCounter, compare_with_baseline
+
+
+def test_syscall_counter_restores_functions_after_error(tmp_path):
+    """Auch nach einer Ausnahme im Block sind os und open wieder die Originale"""
+    originals = (os.stat, os.open, builtins.open, io.open)
+
+    with pytest.raises(RuntimeError):
+        with SyscallCounter() as counter:
+            os.stat(tmp_path)
+            (tmp_path / "a.txt").write_text("a")
+            raise RuntimeError("Benchmark fehlgeschlagen")
+
+    assert (os.stat, os.open, builtins.open, io.open) == originals
+    assert counter.counts["stat"] >= 1
+    assert counter.counts["open"] >= 1
+
+
+def test_syscall_counter_restores_functions_when_patching_fails(monkeypatch):
+    """Schlägt das Ersetzen mittendrin fehl, werden die bereits ersetzten Funktionen zurückgesetzt"""
+    original_stat = os.stat
+
+    def failing_wrap(name, func):
+        if name == "open":
+            raise RuntimeError("Ersetzen fehlgeschlagen")
+        return lambda *args, **kwargs: func(*args, **kwargs)
+
+    counter = SyscallCounter()
+    monkeypatch.setattr(counter, "wrap", failing_wrap)
+    with pytest.raises(RuntimeError):
+        with counter:
+            pass
+
+    assert os.stat is original_stat
+    assert counter.patched == []
+
+
+def test_peak_rss_is_compared_only_with_the_same_measurement():
+    """RSS zählt als Verschlechterung, aber nur wenn beide Werte gleich gemessen wurden"""
+    baseline = {"results": [{"benchmark": "cli_install", "peak_rss_kb": 1000, "peak_rss_reset": True}]}
+    grown = {"benchmark": "cli_install", "peak_rss_kb": 2000, "peak_rss_reset": True}
+
+    regressions = compare_with_baseline([grown], baseline)
+    assert [(regression["metric"], regression["change"]) for regression in regressions] == [("peak_rss_kb", 1.0)]
+    assert compare_with_baseline([dict(grown, peak_rss_reset=False)], baseline) == []
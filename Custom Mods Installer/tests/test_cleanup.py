@@ -0,0 +1,56 @@
+"""
+Aufräumen alter Versionsordner: die neuesten N und die aktuelle Spielversion bleiben erhalten
+"""
+
+import pytest
+
+from wot_mod_installer_core import find_version_folders, remove_version_folders
+
+
+@pytest.fixture
+def game(tmp_path):
+    """WoT Ordner mit Versionsordnern in mods/ und res_mods/ (1.11 gibt es nur in res_mods/)"""
+    game_path = tmp_path / "game"
+    files = {
+        "mods/1.10.0.0/a.wotmod": 100,
+        "mods/1.9.0.0/a.wotmod": 100,
+        "mods/1.9.0.0/sub/b.wotmod": 50,
+        "res_mods/1.11.0.0/gui/x.xml": 10,
+        "res_mods/1.9.0.0/gui/x.xml": 20,
+        "res_mods/1.8.0.0/gui/x.xml": 30,
+    }
+    for name, size in files.items():
+        (game_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (game_path / name).write_bytes(b"x" * size)
+    (game_path / "mods" / "configs").mkdir()
+    return game_path
+
+
+def test_keep_newest_and_current_version(game):
+    """Die aktuelle Version (neuester Ordner in mods/) bleibt auch bei keep=1 erhalten, wenn res_mods/ neuer ist"""
+    folders = find_version_folders(game, keep=1, jobs=2)
+
+    assert [(folder.version, folder.path.parent.name, folder.size, folder.files, folder.keep)
+            for folder in folders] == [
+        ("1.11.0.0", "res_mods", 10, 1, True),
+        ("1.10.0.0", "mods", 100, 1, True),
+        ("1.9.0.0", "mods", 150, 2, False),
+        ("1.9.0.0", "res_mods", 20, 1, False),
+        ("1.8.0.0", "res_mods", 30, 1, False),
+    ]
+    # keep=0 behält mindestens die neueste Version
+    assert [folder.keep for folder in find_version_folders(game, keep=0)] == [folder.keep for folder in folders]
+    assert [folder.version for folder in find_version_folders(game, keep=3) if folder.keep] == \
+        ["1.11.0.0", "1.10.0.0", "1.9.0.0", "1.9.0.0"]
+
+
+def test_remove_stale_folders_reports_freed_bytes(game):
+    """Gelöscht werden nur die übergebenen Ordner, zurückgegeben wird ihre Größe"""
+    messages = []
+    stale = [folder for folder in find_version_folders(game, keep=1) if not folder.keep]
+
+    assert remove_version_folders(stale, log=messages.append) == 200
+    assert len(messages) == 3
+    assert [(folder.version, folder.path.parent.name) for folder in find_version_folders(game, keep=1)] == \
+        [("1.11.0.0", "res_mods"), ("1.10.0.0", "mods")]
+    assert (game / "mods" / "configs").is_dir()
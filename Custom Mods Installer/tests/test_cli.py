@@ -0,0 +1,102 @@
+"""
+Kommandozeile: mit --yes keine Rückfrage, mit --json nur JSON-Zeilen
+"""
+
+import json
+import sys
+
+import pytest
+
+import wot_mod_installer_cli
+
+from .helpers import VERSION, install, make_game, make_zip
+
+
+def run_cli(monkeypatch, capsys, *arguments):
+    """Rufe main() auf, gibt Rückgabewert und die ausgegebenen JSON-Ereignisse zurück"""
+    monkeypatch.setattr(sys, "argv", ["wot_mod_installer_cli.py", *map(str, arguments)])
+    # Jede Rückfrage wäre bei --yes ein Fehler
+    monkeypatch.setattr("builtins.input", lambda prompt="": pytest.fail(f"Unerwartete Rückfrage: {prompt}"))
+    code = wot_mod_installer_cli.main()
+    return code, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+@pytest.fixture
+def installed(tmp_path):
+    """WoT Ordner mit einem installierten Archiv"""
+    archive = make_zip(tmp_path / "zips" / "a.zip", {"mods/version/a.wotmod": b"a" * 100,
+                                                     "res_mods/configs/a.xml": b"a"})
+    game = make_game(tmp_path / "game")
+    install(game, [archive])
+    return game, archive.parent
+
+
+def test_uninstall_with_yes_and_json(monkeypatch, capsys, installed):
+    """--uninstall --yes --json fragt nicht nach und gibt nur Ereignisse aus"""
+    game, _ = installed
+
+    code, events = run_cli(monkeypatch, capsys, "--wot-path", game, "--uninstall", "a.zip", "--yes", "--json")
+
+    assert code == 0
+    assert [event["event"] for event in events] == ["uninstall_plan", "uninstall"]
+    assert events[1]["removed"] == 2 and events[1]["refused"] == []
+    assert not (game / "mods" / VERSION / "a.wotmod").exists()
+
+    code, events = run_cli(monkeypatch, capsys, "--wot-path", game, "--uninstall", "a.zip", "--yes", "--json")
+    assert code == 1 and [event["event"] for event in events] == ["error"]
+
+
+def test_installed_and_migrate_with_json(monkeypatch, capsys, installed):
+    """--installed und --migrate geben bei --json nur Ereignisse aus"""
+    game, zip_folder = installed
+
+    code, events = run_cli(monkeypatch, capsys, "--wot-path", game, "--installed", "--yes", "--json")
+    assert code == 0
+    assert [(event["event"], event["archive"], event["files"]) for event in events] == [("installed", "a.zip", 2)]
+
+    (game / "mods" / "1.3.0.0").mkdir()
+    code, events = run_cli(monkeypatch, capsys, "--wot-path", game, "--zip-folder", zip_folder, "--migrate",
+                           "--yes", "--json")
+    assert code == 0
+    assert events[-1]["event"] == "migrate_summary"
+    assert events[-1]["migrated"] == ["a.zip"] and events[-1]["version"] == "1.3.0.0"
+    assert (game / "mods" / "1.3.0.0" / "a.wotmod").read_bytes() == b"a" * 100
+
+
+@pytest.fixture
+def conflicting(tmp_path):
+    """Leerer WoT Ordner und zwei Archive mit einem gemeinsamen Zielpfad"""
+    zip_folder = tmp_path / "zips"
+    make_zip(zip_folder / "a.zip", {"mods/configs/x.json": b"from a", "mods/configs/a.json": b"a"})
+    make_zip(zip_folder / "b.zip", {"mods/configs/x.json": b"from b, longer"})
+    return make_game(tmp_path / "game"), zip_folder
+
+
+def test_conflicts_with_json(monkeypatch, capsys, conflicting):
+    """--conflicts --json gibt ein Ereignis pro Zielpfad mit Archiven und Größen aus (auch ohne --yes)"""
+    game, zip_folder = conflicting
+
+    code, events = run_cli(monkeypatch, capsys, "--wot-path", game, "--zip-folder", zip_folder, "--conflicts", "--json")
+
+    assert code == 0
+    conflicts = [event for event in events if event["event"] == "conflict"]
+    assert len(conflicts) == 1 and events[-1] is conflicts[0]
+    assert conflicts[0]["path"].replace("\\", "/") == "mods/configs/x.json"
+    assert conflicts[0]["winner"] == "b.zip" and conflicts[0]["identical"] is False
+    assert [(item["archive"], item["size"]) for item in conflicts[0]["archives"]] == [("a.zip", 6), ("b.zip", 14)]
+
+
+def test_json_requires_yes_only_when_asking(monkeypatch, capsys, conflicting):
+    """Vorschau und Auflistung laufen mit --json ohne --yes, die Installation nicht"""
+    game, zip_folder = conflicting
+
+    code, events = run_cli(monkeypatch, capsys, "--wot-path", game, "--zip-folder", zip_folder, "--preview", "--json")
+    assert code == 0
+    assert events[-1]["event"] == "conflicts"
+
+    code, events = run_cli(monkeypatch, capsys, "--wot-path", game, "--installed", "--json")
+    assert code == 0 and events == []
+
+    code, events = run_cli(monkeypatch, capsys, "--wot-path", game, "--zip-folder", zip_folder, "--json")
+    assert code == 1 and events[-1]["event"] == "error"
+    assert not (game / "mods" / "configs").exists()
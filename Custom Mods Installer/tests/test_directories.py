@@ -0,0 +1,46 @@
+"""
+Zielordner: einmalig angelegt und über zwischengespeicherte Verzeichnis-Handles beschrieben
+"""
+
+import pytest
+
+from wot_mod_installer_core import DirectoryHandles
+
+from .helpers import VERSION, install, make_game, make_zip, read_tree
+
+
+def test_handles_write_into_more_directories_than_stay_open(tmp_path):
+    """Jede Datei landet im richtigen Ordner, auch wenn ältere Handles geschlossen werden"""
+    directories = [tmp_path / f"d{i}" for i in range(10)]
+    for directory in directories:
+        directory.mkdir()
+
+    handles = DirectoryHandles(max_handles=4)
+    try:
+        # Zweiter Durchgang in umgekehrter Reihenfolge überschreibt mit kürzerem Inhalt
+        for content, order in ((b"long content", directories), (b"short", directories[::-1])):
+            for directory in order:
+                with handles.open_file(directory / "a.bin") as target:
+                    target.write(content + directory.name.encode())
+            assert len(handles.handles) <= 4
+    finally:
+        handles.close()
+
+    assert not handles.handles
+    assert [(directory / "a.bin").read_bytes() for directory in directories] == \
+        [b"short" + directory.name.encode() for directory in directories]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_install_creates_nested_target_directories(tmp_path, jobs):
+    """Zielordner beliebiger Tiefe werden angelegt, Ordner-Einträge der Archive erzeugen keine Dateien"""
+    files = {f"res_mods/gui/{i % 3}/sub{i % 2}/f{i}.xml": str(i).encode() for i in range(12)}
+    archives = [
+        make_zip(tmp_path / "zips" / "a.zip", dict({"res_mods/gui/empty/": b""}, **files)),
+        make_zip(tmp_path / "zips" / "b.zip", {"mods/version/deep/er/b.wotmod": b"b"}),
+    ]
+    game = make_game(tmp_path / "game")
+
+    install(game, archives, jobs)
+
+    assert read_tree(game) == dict(files, **{f"mods/{VERSION}/deep/er/b.wotmod": b"b"})
@@ -0,0 +1,107 @@
+"""
+Speicherplatzprüfung vor dem Schreiben: Abbruch ohne Änderung, überschriebene Dateien zählen nur mit dem Zuwachs
+"""
+
+import io
+import os
+import shutil
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import wot_mod_installer_core
+from wot_mod_installer_core import (
+    PhaseProfiler, extract_member, extract_member_pipelined, extract_member_profiled, extract_member_to_targets,
+)
+
+from .helpers import VERSION, install, make_game, make_zip, read_tree
+
+
+DiskUsage = namedtuple("DiskUsage", ["total", "used", "free"])
+
+
+@pytest.fixture
+def free_space(monkeypatch):
+    """Setze den freien Platz, den shutil.disk_usage meldet"""
+    def set_free(free):
+        monkeypatch.setattr(shutil, "disk_usage", lambda path: DiskUsage(10 ** 12, 10 ** 12 - free, free))
+    return set_free
+
+
+def test_install_is_refused_before_any_file_is_written(tmp_path, free_space):
+    """Reicht der Platz nicht, wird keine Datei und kein Ordner angelegt"""
+    archive = make_zip(tmp_path / "zips" / "a.zip", {"mods/version/a.wotmod": b"a" * 200000,
+                                                     "res_mods/configs/a.xml": b"a"})
+    game = make_game(tmp_path / "game")
+    free_space(100000)
+
+    session = install(game, [archive])
+
+    assert session.results == [False]
+    assert any("Nicht genug Speicherplatz" in message for message in session.messages)
+    assert read_tree(game) == {}
+    assert not (game / "res_mods").exists()
+
+
+@pytest.mark.parametrize("transactional", [False, True])
+def test_overwritten_files_count_only_with_their_growth(tmp_path, free_space, transactional):
+    """Ersetzt eine Installation große Dateien, zählt nur der Zuwachs (transaktional bleibt das Backup erhalten)"""
+    archive = make_zip(tmp_path / "zips" / "a.zip", {"mods/version/big.wotmod": b"n" * 310000,
+                                                     "res_mods/configs/a.xml": b"a"})
+    game = make_game(tmp_path / "game")
+    (game / "mods" / VERSION / "big.wotmod").write_bytes(b"o" * 300000)
+    free_space(100000)
+
+    session = install(game, [archive], transactional=transactional)
+
+    if transactional:
+        assert session.results == [False]
+        assert read_tree(game) == {f"mods/{VERSION}/big.wotmod": b"o" * 300000}
+    else:
+        assert session.results == [True]
+        assert read_tree(game)[f"mods/{VERSION}/big.wotmod"] == b"n" * 310000
+
+
+class _FailingSource(io.BytesIO):
+    """ZIP-Element, das nach drei Blöcken einen CRC-Fehler meldet"""
+
+    reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        if self.reads >= 4:
+            raise zipfile.BadZipFile("Bad CRC-32")
+        return b"x" * size
+
+
+@pytest.mark.parametrize("allocation", ["posix_fallocate", "truncate"])
+@pytest.mark.parametrize("writer", ["plain", "pipelined", "profiled", "fleet"])
+def test_failed_extraction_leaves_no_preallocated_zeros(tmp_path, monkeypatch, allocation, writer):
+    """Nach einem Fehler ist die Zieldatei nur so lang wie die geschriebenen Blöcke, nicht so groß wie reserviert"""
+    monkeypatch.setattr(wot_mod_installer_core, "PREALLOCATE_MIN_SIZE", 0)
+    if allocation == "posix_fallocate" and not hasattr(os, "posix_fallocate"):
+        pytest.skip("posix_fallocate gibt es nur unter Unix")
+    zip_ref = SimpleNamespace(open=lambda member: _FailingSource())
+    member = zipfile.ZipInfo("mods/a.wotmod")
+    member.file_size = 1024 * 1024
+    target = tmp_path / "a.wotmod"
+
+    with monkeypatch.context() as patch, ThreadPoolExecutor(max_workers=1) as executor:
+        if allocation == "truncate":
+            # Verhalten unter Windows: Verlängern per SetEndOfFile
+            patch.delattr(os, "posix_fallocate", raising=False)
+            patch.setattr(os, "name", "nt")
+        with pytest.raises(zipfile.BadZipFile):
+            if writer == "plain":
+                extract_member(zip_ref, member, target, 1024)
+            elif writer == "pipelined":
+                extract_member_pipelined(zip_ref, member, target, executor, 1024)
+            elif writer == "profiled":
+                extract_member_profiled(zip_ref, member, target, PhaseProfiler(), 1024)
+            else:
+                extract_member_to_targets(zip_ref, member, [target], 1024)
+
+    assert target.read_bytes() == b"x" * 3 * 1024
@@ -0,0 +1,143 @@
+"""
+Per Hardlink geteilte Dateien (Dateispeicher, Migration): spätere Installationen ersetzen nur den eigenen Link
+"""
+
+import os
+import zipfile
+
+import pytest
+
+import wot_mod_installer_core
+from wot_mod_installer_core import ContentStore, FleetInstallSession, InstallSession, ManifestStore, PhaseProfiler
+
+from .helpers import VERSION, install, make_game, make_zip, read_tree
+
+
+CONFIG = "res_mods/configs/cfg.xml"
+
+
+def quiet_session(game_path, **options):
+    """InstallSession ohne Ausgabe"""
+    return InstallSession(game_path, VERSION, log=lambda message: None, file_log=lambda message: None, **options)
+
+
+@pytest.fixture
+def linked_clients(tmp_path):
+    """EU- und Testclient, beide per Hardlink aus demselben Dateispeicher installiert"""
+    zip_folder = tmp_path / "zips"
+    archive = make_zip(zip_folder / "a.zip", {CONFIG: b"ORIGINAL", "mods/version/a.wotmod": b"a" * 4000})
+    eu = make_game(tmp_path / "eu")
+    test = make_game(tmp_path / "test")
+    install(eu, [archive], content_store=ContentStore(zip_folder))
+    install(test, [archive], content_store=ContentStore(zip_folder))
+    if os.stat(eu / CONFIG).st_ino != os.stat(test / CONFIG).st_ino:
+        pytest.skip("Dateisystem ohne Hardlinks")
+    return zip_folder, eu, test
+
+
+@pytest.mark.parametrize("writer", ["plain", "pipelined", "profiled", "fleet", "transactional"])
+def test_later_install_does_not_write_through_store_links(tmp_path, linked_clients, monkeypatch, writer):
+    """Eine normale Installation in einen Client verändert weder den anderen Client noch den Dateispeicher"""
+    zip_folder, eu, test = linked_clients
+    other = make_zip(tmp_path / "other" / "b.zip", {CONFIG: b"OTHER", "mods/version/a.wotmod": b"b" * 4000})
+
+    if writer == "pipelined":
+        # Auch kleine Einträge über die Pipeline schreiben
+        monkeypatch.setattr(wot_mod_installer_core, "PIPELINE_MIN_SIZE", 0)
+    if writer == "fleet":
+        spare = make_game(tmp_path / "spare")
+        FleetInstallSession([quiet_session(eu), quiet_session(spare)], log=lambda message: None).install_all([other])
+    else:
+        options = {"profiler": PhaseProfiler()} if writer == "profiled" else {}
+        install(eu, [other], transactional=writer == "transactional", **options)
+
+    assert (eu / CONFIG).read_bytes() == b"OTHER"
+    assert (test / CONFIG).read_bytes() == b"ORIGINAL"
+    assert (test / "mods" / VERSION / "a.wotmod").read_bytes() == b"a" * 4000
+
+    # Der Dateispeicher ist unverändert und wird beim nächsten Mal weiter verwendet
+    fresh = make_game(tmp_path / "fresh")
+    store = ContentStore(zip_folder)
+    install(fresh, [zip_folder / "a.zip"], content_store=store)
+    assert store.hits == 2 and store.misses == 0
+    assert read_tree(fresh) == read_tree(test)
+
+
+def test_same_content_with_different_timestamps_is_stored_once(tmp_path):
+    """Zwei Archive mit demselben Inhalt, aber verschiedenen ZIP-Zeitstempeln teilen sich eine Datei im Speicher"""
+    zip_folder = tmp_path / "zips"
+    zip_folder.mkdir()
+    payload = os.urandom(100000)
+    for name, date_time in (("a.zip", (2020, 1, 1, 12, 0, 0)), ("b.zip", (2023, 6, 15, 8, 30, 0))):
+        with zipfile.ZipFile(zip_folder / name, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(zipfile.ZipInfo(f"res_mods/configs/lib_{name}.bin", date_time), payload)
+
+    first = make_game(tmp_path / "first")
+    store = ContentStore(zip_folder)
+    install(first, [zip_folder / "a.zip", zip_folder / "b.zip"], content_store=store)
+    assert (store.hits, store.misses) == (1, 1)
+
+    second = make_game(tmp_path / "second")
+    store = ContentStore(zip_folder)
+    install(second, [zip_folder / "a.zip", zip_folder / "b.zip"], content_store=store)
+    assert (store.hits, store.misses) == (2, 0)
+
+    links = {os.stat(game / "res_mods" / "configs" / f"lib_{name}.bin").st_ino
+             for game in (first, second) for name in ("a.zip", "b.zip")}
+    if os.stat(first / "res_mods" / "configs" / "lib_a.zip.bin").st_nlink == 1:
+        pytest.skip("Dateisystem ohne Hardlinks")
+    assert len(links) == 1
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_install_after_migration_keeps_old_version_folder(tmp_path, incremental):
+    """Nach der Migration per Hardlink verändert eine Installation in die neue Version den alten Ordner nicht"""
+    archive = make_zip(tmp_path / "zips" / "a.zip", {"mods/version/a.wotmod": b"OLD" * 1000,
+                                                     "mods/configs/a.json": b"{}"})
+    game = make_game(tmp_path / "game")
+    install(game, [archive])
+    (game / "mods" / "1.3.0.0").mkdir()
+
+    result = ManifestStore(game).migrate("1.3.0.0", log=lambda message: None)
+    assert result.migrated == ["a.zip"] and result.files == 1 and result.reinstall == []
+    old_file = game / "mods" / VERSION / "a.wotmod"
+    new_file = game / "mods" / "1.3.0.0" / "a.wotmod"
+    if os.stat(old_file).st_ino != os.stat(new_file).st_ino:
+        pytest.skip("Dateisystem ohne Hardlinks")
+
+    update = make_zip(tmp_path / "update" / "a.zip", {"mods/version/a.wotmod": b"NEW" * 1000})
+    install(game, [update], version="1.3.0.0", incremental=incremental)
+
+    assert new_file.read_bytes() == b"NEW" * 1000
+    assert old_file.read_bytes() == b"OLD" * 1000
+
+
+def test_migrate_move_leaves_no_copy_behind(tmp_path):
+    """--migrate-move verschiebt die Dateien und entfernt leer gewordene Versionsunterordner"""
+    archive = make_zip(tmp_path / "zips" / "a.zip", {"mods/version/sub/a.wotmod": b"a" * 100})
+    game = make_game(tmp_path / "game")
+    install(game, [archive])
+    (game / "mods" / "1.3.0.0").mkdir()
+
+    ManifestStore(game).migrate("1.3.0.0", move=True, log=lambda message: None)
+
+    assert read_tree(game) == {"mods/1.3.0.0/sub/a.wotmod": b"a" * 100}
+    assert ManifestStore(game).load_all()["a.zip"]["version"] == "1.3.0.0"
+
+
+def test_migrate_reextracts_archives_with_version_dependent_targets(tmp_path):
+    """Ein Platzhalter außerhalb des Versionsordners hängt von der Version ab: nur dieses Archiv wird neu entpackt"""
+    zip_folder = tmp_path / "zips"
+    dependent = make_zip(zip_folder / "dependent.zip", {"res_mods/configs/version/x.xml": b"x",
+                                                        "mods/version/dependent.wotmod": b"d"})
+    plain = make_zip(zip_folder / "plain.zip", {"mods/version/plain.wotmod": b"p", "res_mods/version/y.xml": b"y"})
+    game = make_game(tmp_path / "game")
+    install(game, [dependent, plain])
+    (game / "mods" / "1.3.0.0").mkdir()
+
+    # res_mods/configs/1.2.0.0/ liegt außerhalb des Versionsordners, eine Neuinstallation schreibt 1.3.0.0/
+    result = ManifestStore(game).migrate("1.3.0.0", log=lambda message: None, zip_folder=zip_folder)
+    assert result.migrated == ["plain.zip"] and result.reinstall == ["dependent.zip"]
+    assert ManifestStore(game).load_all()["plain.zip"]["version"] == "1.3.0.0"
+    assert (game / "res_mods" / "1.3.0.0" / "y.xml").read_bytes() == b"y"
+    assert not (game / "mods" / "1.3.0.0" / "dependent.wotmod").exists()
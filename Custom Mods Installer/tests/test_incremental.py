@@ -0,0 +1,70 @@
+"""
+Inkrementelle Installation: identische Dateien werden übersprungen, auch bei Konflikten zwischen Archiven
+"""
+
+import zipfile
+
+import pytest
+
+from wot_mod_installer_core import FleetInstallSession, InstallSession, get_state_dir
+
+from .helpers import VERSION, install, make_game, make_zip, read_tree
+
+
+@pytest.fixture
+def archives(tmp_path):
+    """Zwei Archive mit gemeinsamen Zielpfaden unterschiedlichen Inhalts (b gewinnt)"""
+    zip_folder = tmp_path / "zips"
+    shared = {f"res_mods/configs/x{i}.xml": b"a" * (10 + i) for i in range(25)}
+    return [
+        make_zip(zip_folder / "a.zip", dict(shared, **{"mods/version/a.wotmod": b"a" * 1000})),
+        make_zip(zip_folder / "b.zip", {name: b"B" * (20 + i) for i, name in enumerate(shared)}, zipfile.ZIP_STORED),
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_rerun_with_identical_inputs_writes_nothing(tmp_path, archives, jobs):
+    """Ein zweiter Lauf schreibt keine Datei, auch nicht die Verlierer eines Konflikts"""
+    game = make_game(tmp_path / "game")
+    first = install(game, archives, jobs, incremental=True)
+    # Jeder Zielpfad wird genau einmal geschrieben, und zwar vom letzten Archiv
+    assert (first.written_count, first.skipped_count) == (26, 0)
+    state_file = get_state_dir(game) / "file_state.json"
+    state = state_file.read_bytes()
+
+    second = install(game, archives, jobs, incremental=True)
+
+    assert (second.written_count, second.skipped_count) == (0, 26)
+    assert state_file.read_bytes() == state
+    assert second.progress.snapshot().total_files == 26
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_incremental_result_matches_full_install(tmp_path, archives, jobs):
+    """Inkrementell (erster Lauf und Wiederholung nach Änderung) ergibt denselben Ordner wie eine volle Installation"""
+    reference = make_game(tmp_path / "reference")
+    install(reference, archives)
+
+    game = make_game(tmp_path / "game")
+    install(game, archives, jobs, incremental=True)
+    assert read_tree(game) == read_tree(reference)
+
+    # Vom Benutzer veränderte Datei wird mit dem Inhalt des letzten Archivs wiederhergestellt
+    (game / "res_mods" / "configs" / "x3.xml").write_bytes(b"user")
+    rerun = install(game, archives, jobs, incremental=True)
+    assert rerun.written_count == 1
+    assert read_tree(game) == read_tree(reference)
+
+
+def test_fleet_rerun_with_identical_inputs_writes_nothing(tmp_path, archives):
+    """Mehrere Ziele: auch sequentiell schreibt nur das letzte Archiv eines Konflikts"""
+    games = [make_game(tmp_path / name) for name in ("eu", "test")]
+
+    def run():
+        sessions = [InstallSession(game, VERSION, log=lambda message: None, file_log=lambda message: None,
+                                   incremental=True) for game in games]
+        FleetInstallSession(sessions, log=lambda message: None).install_all(archives)
+        return sessions
+
+    assert [session.written_count for session in run()] == [26, 26]
+    assert [session.written_count for session in run()] == [0, 0]
@@ -0,0 +1,61 @@
+"""
+Index-Cache der ZIP-Inhaltsverzeichnisse: Wiederverwendung, Neueinlesen nach Änderung und Bereinigung
+"""
+
+from pathlib import Path
+
+import pytest
+
+import wot_mod_installer_core
+from wot_mod_installer_core import ArchiveIndexCache, scan_zip_folder
+
+from .helpers import make_zip
+
+
+@pytest.fixture
+def read_calls(monkeypatch):
+    """Namen der Archive, deren Inhaltsverzeichnis tatsächlich aus der ZIP-Datei gelesen wurde"""
+    calls = []
+    read_archive_entries = wot_mod_installer_core.read_archive_entries
+
+    def counting(zip_file_path, *args, **kwargs):
+        calls.append(Path(zip_file_path).name)
+        return read_archive_entries(zip_file_path, *args, **kwargs)
+
+    monkeypatch.setattr(wot_mod_installer_core, "read_archive_entries", counting)
+    return calls
+
+
+def test_unchanged_archive_is_read_once_across_sessions(tmp_path, read_calls):
+    """Ein gespeicherter Index wird in der nächsten Sitzung ohne Öffnen des Archivs verwendet"""
+    zip_folder = tmp_path / "zips"
+    archive = make_zip(zip_folder / "a.zip", {"mods/version/a.wotmod": b"a" * 100, "res_mods/configs/a.xml": b"a"})
+
+    cache = ArchiveIndexCache(zip_folder)
+    entries = cache.get_entries(archive)
+    cache.save()
+
+    assert [(entry.filename, entry.file_size) for entry in entries] == [("mods/version/a.wotmod", 100),
+                                                                        ("res_mods/configs/a.xml", 1)]
+    assert ArchiveIndexCache(zip_folder).get_entries(archive) == entries
+    assert read_calls == ["a.zip"]
+
+
+def test_changed_archive_is_reread_and_deleted_archive_pruned(tmp_path, read_calls):
+    """Geänderte Archive werden neu eingelesen, gelöschte verschwinden beim Bereinigen aus dem Index"""
+    zip_folder = tmp_path / "zips"
+    a = make_zip(zip_folder / "a.zip", {"mods/version/a.wotmod": b"a" * 100})
+    b = make_zip(zip_folder / "b.zip", {"mods/version/b.wotmod": b"b" * 100})
+    cache = ArchiveIndexCache(zip_folder)
+    cache.get_entries(a)
+    cache.get_entries(b)
+
+    make_zip(a, {"mods/version/a.wotmod": b"a" * 200})
+    assert [entry.file_size for entry in cache.get_entries(a)] == [200]
+
+    b.unlink()
+    cache.prune(scan_zip_folder(zip_folder))
+    cache.save()
+
+    assert list(ArchiveIndexCache(zip_folder).archives) == ["a.zip"]
+    assert read_calls == ["a.zip", "b.zip", "a.zip"]
@@ -0,0 +1,32 @@
+"""
+Verschachtelte Archive: innere ZIP-Dateien direkt aus dem äußeren Archiv installieren
+"""
+
+import zipfile
+
+import pytest
+
+from .helpers import VERSION, install, make_game, make_zip, read_tree
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_nested_archive_is_installed_in_place(tmp_path, compression):
+    """Innere ZIP-Dateien werden an ihrer Stelle installiert, ihre Pfade werden wie die des äußeren umgeschrieben"""
+    inner = make_zip(tmp_path / "inner.zip", {"mods/version/inner.wotmod": b"i" * 2000,
+                                              "res_mods/configs/inner.xml": b"inner"})
+    outer = make_zip(tmp_path / "zips" / "outer.zip", {
+        "mods/configs/before.json": b"before",
+        "bundle/inner.zip": inner.read_bytes(),
+        "mods/1.1.0.0/after.wotmod": b"after",
+    }, compression)
+    game = make_game(tmp_path / "game")
+
+    session = install(game, [outer])
+
+    assert session.results == [True]
+    assert read_tree(game) == {
+        "mods/configs/before.json": b"before",
+        f"mods/{VERSION}/inner.wotmod": b"i" * 2000,
+        "res_mods/configs/inner.xml": b"inner",
+        f"mods/{VERSION}/after.wotmod": b"after",
+    }
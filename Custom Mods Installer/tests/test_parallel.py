@@ -0,0 +1,20 @@
+"""
+Parallele Installation mehrerer Archive: das letzte Archiv gewinnt wie bei der sequentiellen Installation
+"""
+
+from .helpers import VERSION, install, make_game, read_tree
+
+
+def test_last_archive_wins_sequential_and_parallel(tmp_path, conflicting_archives):
+    """Parallel installiert ergibt denselben Ordner wie sequentiell, das letzte Archiv gewinnt"""
+    sequential = make_game(tmp_path / "sequential")
+    parallel = make_game(tmp_path / "parallel")
+    install(sequential, conflicting_archives, jobs=1)
+    install(parallel, conflicting_archives, jobs=3)
+
+    tree = read_tree(sequential)
+    assert read_tree(parallel) == tree
+    assert tree["mods/configs/shared.json"] == b"from c"
+    assert tree["res_mods/configs/x.xml"] == b"c-x"
+    assert tree[f"mods/{VERSION}/a.wotmod"] == b"a" * 5000
+    assert tree[f"mods/{VERSION}/b.wotmod"] == b"b" * 3000
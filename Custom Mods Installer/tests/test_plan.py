@@ -0,0 +1,50 @@
+"""
+Installationspläne: speichern, prüfen und wiederholen
+"""
+
+import json
+import zipfile
+
+from wot_mod_installer_core import InstallPlan
+
+from .helpers import VERSION, install, make_game, make_zip, read_tree
+
+
+def test_plan_replay_matches_install_and_is_refused_after_change(tmp_path, conflicting_archives):
+    """Ein gespeicherter Plan installiert dasselbe, nach einer Inhaltsänderung gleicher Größe wird er abgelehnt"""
+    zip_folder = conflicting_archives[0].parent
+    plan_path = tmp_path / "plan.json"
+    InstallPlan.compile(conflicting_archives, VERSION).save(plan_path)
+    plan = InstallPlan.load(plan_path)
+    assert plan.check(zip_folder) == []
+
+    reference = make_game(tmp_path / "reference")
+    replayed = make_game(tmp_path / "replayed")
+    install(reference, conflicting_archives)
+    install(replayed, plan.zip_files(zip_folder), plan=plan)
+    assert read_tree(replayed) == read_tree(reference)
+
+    # Gleiche Größe (unkomprimiert gespeichert), anderer Inhalt
+    make_zip(zip_folder / "b.zip", {
+        "mods/configs/shared.json": b"FROM B, LONGER",
+        "mods/1.0.0.0/b.wotmod": b"b" * 3000,
+    }, zipfile.ZIP_STORED)
+    assert plan.check(zip_folder) == ["b.zip: Inhalt geändert"]
+
+    conflicting_archives[2].unlink()
+    assert plan.check(zip_folder)[-1] == "c.zip: nicht gefunden"
+
+
+def test_plan_stores_metadata_fingerprint_and_reads_old_format(tmp_path, conflicting_archives):
+    """Der Fingerabdruck steht unter "fingerprint", Pläne des alten Formats mit "sha256" werden weiterhin gelesen"""
+    zip_folder = conflicting_archives[0].parent
+    plan_path = tmp_path / "plan.json"
+    InstallPlan.compile(conflicting_archives, VERSION).save(plan_path)
+    saved = json.loads(plan_path.read_text(encoding="utf-8"))
+    assert all("fingerprint" in archive and "sha256" not in archive for archive in saved["archives"])
+
+    saved["format"] = 1
+    for archive in saved["archives"]:
+        archive["sha256"] = archive.pop("fingerprint")
+    plan_path.write_text(json.dumps(saved), encoding="utf-8")
+    assert InstallPlan.load(plan_path).check(zip_folder) == []
@@ -0,0 +1,71 @@
+"""
+Vorschau: gleiche Sicht wie die Installation, bei Konflikten zählt nur das letzte Archiv
+"""
+
+import zipfile
+
+import pytest
+
+from wot_mod_installer_core import DIFF_CHANGED, DIFF_IDENTICAL, DIFF_NEW, DiffSummary, iter_install_diff
+
+from .helpers import VERSION, install, make_game, make_zip
+
+
+@pytest.fixture
+def archives(tmp_path):
+    """a und b schreiben x.xml mit unterschiedlichem Inhalt (b gewinnt)"""
+    zip_folder = tmp_path / "zips"
+    return [
+        make_zip(zip_folder / "a.zip", {"res_mods/configs/x.xml": b"a", "mods/version/a.wotmod": b"a" * 1000}),
+        make_zip(zip_folder / "b.zip", {"res_mods/configs/x.xml": b"bb", "mods/configs/b.json": b"{}"},
+                 zipfile.ZIP_STORED),
+    ]
+
+
+def preview(game, archives):
+    """Vorschau als Liste und Zusammenfassung"""
+    summary = DiffSummary()
+    entries = [summary.add(entry) for entry in iter_install_diff(archives, game, VERSION)]
+    return entries, summary
+
+
+def test_preview_of_empty_folder_lists_each_target_once(tmp_path, archives):
+    """Jeder Zielpfad erscheint einmal, mit dem Archiv und der Größe, die die Installation schreibt"""
+    entries, summary = preview(make_game(tmp_path / "game"), archives)
+
+    assert [(entry.status, entry.archive, entry.target_path) for entry in entries] == [
+        (DIFF_NEW, "a.zip", f"mods/{VERSION}/a.wotmod"),
+        (DIFF_NEW, "b.zip", "res_mods/configs/x.xml"),
+        (DIFF_NEW, "b.zip", "mods/configs/b.json"),
+    ]
+    assert summary.bytes_to_write == 1000 + 2 + 2
+
+
+def test_preview_after_install_reports_nothing_to_write(tmp_path, archives):
+    """Nach der Installation ist alles identisch, auch der Konfliktpfad, den das frühere Archiv anders enthält"""
+    game = make_game(tmp_path / "game")
+    install(game, archives)
+
+    entries, summary = preview(game, archives)
+
+    assert {entry.status for entry in entries} == {DIFF_IDENTICAL}
+    assert summary.counts[DIFF_IDENTICAL] == 3 and summary.bytes_to_write == 0
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_preview_matches_incremental_install(tmp_path, archives, jobs):
+    """Neue und geänderte Dateien der Vorschau sind genau die, die eine inkrementelle Installation schreibt"""
+    game = make_game(tmp_path / "game")
+    install(game, archives)
+    (game / "res_mods" / "configs" / "x.xml").write_bytes(b"a")
+    (game / "mods" / "configs" / "b.json").unlink()
+
+    entries, summary = preview(game, archives)
+    assert sorted((entry.status, entry.target_path) for entry in entries if entry.status != DIFF_IDENTICAL) == [
+        (DIFF_CHANGED, "res_mods/configs/x.xml"),
+        (DIFF_NEW, "mods/configs/b.json"),
+    ]
+
+    session = install(game, archives, jobs, incremental=True)
+    assert session.written_count == summary.counts[DIFF_NEW] + summary.counts[DIFF_CHANGED]
+    assert session.skipped_count == summary.counts[DIFF_IDENTICAL]
@@ -0,0 +1,36 @@
+"""
+Zeitmessung pro Phase: Zusammenfassung als JSON und Chrome-Trace
+"""
+
+import json
+
+from wot_mod_installer_core import PhaseProfiler
+
+from .helpers import install, make_game
+
+
+def test_profile_summary_and_trace_per_archive(tmp_path, conflicting_archives):
+    """Summen pro Archiv und Phase, je ein Trace-Ereignis pro Archiv und pro geschriebener Datei"""
+    game = make_game(tmp_path / "game")
+    profiler = PhaseProfiler()
+    install(game, conflicting_archives, jobs=2, profiler=profiler)
+
+    trace_path = profiler.save(tmp_path / "profile.json")
+    summary = json.loads((tmp_path / "profile.json").read_text(encoding="utf-8"))
+    trace = json.loads(trace_path.read_text(encoding="utf-8"))
+
+    assert trace_path.name == "profile.trace.json"
+    assert set(summary["archives"]) == {"a.zip", "b.zip", "c.zip", PhaseProfiler.SESSION}
+    assert {"open_archive", "central_directory", "decompress", "write"} <= set(summary["archives"]["a.zip"])
+    assert "plan" in summary["archives"][PhaseProfiler.SESSION]
+    for name, seconds in summary["phases"].items():
+        archive_seconds = sum(phases.get(name, 0.0) for phases in summary["archives"].values())
+        assert abs(seconds - archive_seconds) < 0.001
+
+    events = trace["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    assert sorted(event["args"]["archive"] for event in spans if event["name"] == "install") == \
+        ["a.zip", "b.zip", "c.zip"]
+    # Parallel schreibt jedes Archiv nur die Zielpfade, die es gewinnt
+    assert len([event for event in spans if event["name"] == "extract"]) == 4
+    assert {event["tid"] for event in spans} == {event["tid"] for event in events if event["ph"] == "M"}
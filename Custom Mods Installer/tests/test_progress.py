@@ -0,0 +1,44 @@
+"""
+Fortschritt in Bytes: Gesamtmenge aus der Planung, übersprungene und parallel geschriebene Dateien zählen mit
+"""
+
+import pytest
+
+from wot_mod_installer_core import ProgressSnapshot, format_progress
+
+from .helpers import install, make_game, make_zip
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_progress_reaches_planned_totals(tmp_path, conflicting_archives, jobs):
+    """Am Ende sind alle geplanten Bytes und Dateien erledigt, sequentiell wie parallel"""
+    game = make_game(tmp_path / "game")
+
+    snapshot = install(game, conflicting_archives, jobs).progress.snapshot()
+
+    assert (snapshot.done_bytes, snapshot.done_files) == (snapshot.total_bytes, snapshot.total_files)
+    if jobs > 1:
+        # Parallel werden nur die Gewinner der Konflikte geschrieben und gezählt
+        assert (snapshot.total_bytes, snapshot.total_files) == (5000 + 3000 + 6 + 3, 4)
+
+
+def test_skipped_files_count_with_their_size(tmp_path):
+    """Unveränderte Dateien einer inkrementellen Wiederholung zählen mit ihrer vollen Größe"""
+    archive = make_zip(tmp_path / "zips" / "a.zip", {"mods/version/a.wotmod": b"a" * 3000,
+                                                     "res_mods/configs/a.xml": b"x" * 500})
+    game = make_game(tmp_path / "game")
+    install(game, [archive], incremental=True)
+
+    session = install(game, [archive], incremental=True)
+
+    assert session.written_count == 0
+    assert session.progress.snapshot()[:4] == (3500, 3500, 2, 2)
+
+
+def test_format_progress_without_rate():
+    """Ohne Durchsatz gibt es keine Restzeit, ohne Gesamtmenge gilt die Installation als fertig"""
+    line = format_progress(ProgressSnapshot(512, 1024, 1, 2, 0.0, 0.0, 0.0, None))
+    assert line.startswith(" 50.0% |")
+    assert line.endswith("| 1/2 Dateien | Rest --:--")
+
+    assert format_progress(ProgressSnapshot(0, 0, 0, 0, 0.0, 0.0, 0.0, None)).startswith("100.0% |")
@@ -0,0 +1,67 @@
+"""
+Gemeinsame Pfad-Umschreibung: dieselben Zielpfade wie die bisherige smart_version_replacement() der GUI
+"""
+
+import re
+
+import pytest
+
+from wot_mod_installer_core import PathRewriter, get_path_rewriter
+
+from .helpers import VERSION
+
+
+def smart_version_replacement(file_path, current_version):
+    """Umschreibung der GUI bis Version 2.3, unverändert als Referenz"""
+    # 1. Ersetze expliziten "version" Platzhalter
+    if "/version/" in file_path or "\\version\\" in file_path:
+        return file_path.replace("/version/", f"/{current_version}/").replace("\\version\\", f"\\{current_version}\\")
+
+    # 2. Erkenne und ersetze existierende Versionsnummern im mods/ Ordner
+    if "mods/" in file_path:
+        pattern = r'mods/\d+\.\d+\.\d+\.\d+/'
+        if re.search(pattern, file_path):
+            return re.sub(pattern, f'mods/{current_version}/', file_path)
+
+    if "mods\\" in file_path:
+        pattern = r'mods\\\d+\.\d+\.\d+\.\d+\\'
+        if re.search(pattern, file_path):
+            return re.sub(pattern, f'mods\\{current_version}\\', file_path)
+
+    # 3. Keine Änderung nötig
+    return file_path
+
+
+@pytest.mark.parametrize("file_path", [
+    "mods/version/a.wotmod",
+    "mods\\version\\a.wotmod",
+    "mods/version/sub/version/a.wotmod",
+    "mods/1.0.0.0/b.wotmod",
+    "mods/1.0.0.0/x/mods/1.1.0.0/c.wotmod",
+    "res_mods/1.0.0.0/gui/x.xml",
+    "mods/1.0.0/short.wotmod",
+    "mods/configs/x.json",
+    "mods/version.txt",
+    "res/audioww/a.bnk",
+])
+def test_rewrite_matches_previous_gui_rules(file_path):
+    """Für alle Pfade, die die alte Umschreibung verarbeiten konnte, ist das Ergebnis gleich"""
+    assert PathRewriter(VERSION).rewrite(file_path) == smart_version_replacement(file_path, VERSION)
+
+
+def test_backslash_version_folder_is_rewritten():
+    """Backslash-Pfade mit Versionsnummer: die alte Regex-Vorlage scheiterte, jetzt wird ersetzt"""
+    with pytest.raises(re.error):
+        smart_version_replacement("mods\\1.0.0.0\\b.wotmod", VERSION)
+    assert PathRewriter(VERSION).rewrite("mods\\1.0.0.0\\b.wotmod") == f"mods\\{VERSION}\\b.wotmod"
+
+
+def test_map_targets_skips_directories_and_is_shared_per_version():
+    """Eine Instanz pro Version, Ordner-Einträge der namelist() entfallen"""
+    rewriter = get_path_rewriter(VERSION)
+    assert get_path_rewriter(VERSION) is rewriter
+    assert get_path_rewriter("1.3.0.0") is not rewriter
+
+    names = ["mods/", "mods/version/", "mods/version/a.wotmod", "res_mods\\configs\\", "res_mods/configs/a.xml"]
+    assert rewriter.map_targets(names) == [("mods/version/a.wotmod", f"mods/{VERSION}/a.wotmod"),
+                                           ("res_mods/configs/a.xml", "res_mods/configs/a.xml")]
@@ -0,0 +1,137 @@
+"""
+Blockweises Entpacken: gleicher Inhalt und konstanter Speicherbedarf unabhängig von der Eintragsgröße
+"""
+
+import io
+import os
+import sys
+import json
+import errno
+import zipfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from wot_mod_installer_core import extract_member, extract_member_pipelined
+
+from .helpers import make_zip
+
+
+# Größe des synthetischen Eintrags in MB (Standard: 64 MB, WOT_TEST_STREAM_MB=2048 für den Lauf mit 2 GB)
+STREAM_SIZE = int(os.environ.get("WOT_TEST_STREAM_MB", "64")) * 1024 * 1024 + 12345
+
+# Erlaubter Anstieg des Spitzen-RSS während des Entpackens (Puffer und Pipeline-Blöcke, nicht die Eintragsgröße),
+# bei kleinen Einträgen deutlich unter der Eintragsgröße, damit vollständiges Einlesen auffällt
+RSS_LIMIT = min(64 * 1024 * 1024, STREAM_SIZE // 4)
+
+# Läuft in einem eigenen Prozess, damit der Spitzenwert nur das Entpacken misst
+CHILD_SCRIPT = """
+import os, sys, json, zipfile, resource
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, sys.argv[1])
+from wot_mod_installer_core import extract_member, extract_member_pipelined
+
+def peak_rss():
+    # Linux: KB, macOS: Bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+with zipfile.ZipFile(sys.argv[2]) as zip_ref, ThreadPoolExecutor(max_workers=1) as executor:
+    info = zip_ref.infolist()[0]
+    before = peak_rss()
+    if sys.argv[3] == "pipelined":
+        extract_member_pipelined(zip_ref, info, os.devnull, executor)
+    else:
+        extract_member(zip_ref, info, os.devnull)
+    print(json.dumps({"before": before, "after": peak_rss(), "size": info.file_size}))
+"""
+
+
+@pytest.fixture(scope="module")
+def huge_archive(tmp_path_factory):
+    """ZIP-Datei mit einem einzelnen Eintrag von STREAM_SIZE Bytes (Nullen, komprimiert nur wenige MB)"""
+    zip_file_path = tmp_path_factory.mktemp("stream") / "huge.zip"
+    chunk = bytes(1024 * 1024)
+    with zipfile.ZipFile(zip_file_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        info = zipfile.ZipInfo("mods/version/huge.wotmod", (2024, 1, 1, 0, 0, 0))
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with zf.open(info, 'w', force_zip64=True) as target:
+            remaining = STREAM_SIZE
+            while remaining:
+                count = min(remaining, len(chunk))
+                target.write(chunk[:count])
+                remaining -= count
+    return zip_file_path
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="ru_maxrss gibt es nur unter Unix")
+@pytest.mark.parametrize("mode", ["plain", "pipelined"])
+def test_peak_memory_stays_flat_for_huge_member(huge_archive, mode):
+    """Spitzen-RSS wächst beim Entpacken eines Multi-GB-Eintrags nur um den Puffer"""
+    core_dir = Path(__file__).resolve().parent.parent
+    output = subprocess.run([sys.executable, "-c", CHILD_SCRIPT, str(core_dir), str(huge_archive), mode],
+                            check=True, capture_output=True, text=True).stdout
+    result = json.loads(output)
+
+    assert result["size"] == STREAM_SIZE
+    assert result["after"] - result["before"] < RSS_LIMIT
+
+
+@pytest.mark.parametrize("buffer_size", [64, 4096, 1024 * 1024])
+def test_extract_member_copies_content_exactly(tmp_path, buffer_size):
+    """Blockweises Entpacken ergibt unabhängig von der Puffergröße denselben Inhalt"""
+    content = os.urandom(300000)
+    zip_file_path = make_zip(tmp_path / "a.zip", {"mods/a.wotmod": content})
+    with zipfile.ZipFile(zip_file_path) as zip_ref, ThreadPoolExecutor(max_workers=1) as executor:
+        info = zip_ref.getinfo("mods/a.wotmod")
+        extract_member(zip_ref, info, tmp_path / "plain", buffer_size)
+        extract_member_pipelined(zip_ref, info, tmp_path / "pipelined", executor, max(buffer_size, 4096))
+
+    assert (tmp_path / "plain").read_bytes() == content
+    assert (tmp_path / "pipelined").read_bytes() == content
+
+
+class _FailingTarget(io.BytesIO):
+    """Zieldatei, deren Laufwerk voll ist"""
+
+    def write(self, data):
+        raise OSError(errno.ENOSPC, "Kein Speicherplatz")
+
+
+class _FailingSource(io.BytesIO):
+    """ZIP-Element, das beim vierten Lesen einen CRC-Fehler meldet"""
+
+    reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        if self.reads >= 4:
+            raise zipfile.BadZipFile("Bad CRC-32")
+        return b"x" * size
+
+
+def test_pipelined_write_error_is_raised_when_source_fails_too(tmp_path):
+    """Scheitern Schreiben und danach Entpacken, meldet der Pipeline-Modus den Schreibfehler statt zu hängen"""
+    zip_ref = SimpleNamespace(open=lambda member: _FailingSource())
+    dir_handles = SimpleNamespace(open_file=lambda path: _FailingTarget())
+    member = zipfile.ZipInfo("mods/a.wotmod")
+    errors = []
+
+    def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            try:
+                extract_member_pipelined(zip_ref, member, tmp_path / "a", executor, 1024,
+                                         dir_handles=dir_handles, depth=2)
+            except OSError as e:
+                errors.append(e)
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    worker.join(10)
+
+    assert not worker.is_alive()
+    assert [e.errno for e in errors] == [errno.ENOSPC]
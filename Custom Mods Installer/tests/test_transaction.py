@@ -0,0 +1,71 @@
+"""
+Transaktionale Installation: Übernahme, Abbruch und Rollback
+"""
+
+from wot_mod_installer_core import FileStateIndex, InstallTransaction, ManifestStore, target_key
+
+from .helpers import install, make_game, make_zip, read_tree
+
+
+def test_transaction_commit_and_rollback(tmp_path, conflicting_archives):
+    """Rollback stellt ersetzte Dateien wieder her und entfernt neu hinzugefügte"""
+    game = make_game(tmp_path / "game")
+    (game / "mods" / "configs").mkdir()
+    (game / "mods" / "configs" / "shared.json").write_bytes(b"original")
+    before = read_tree(game)
+
+    session = install(game, conflicting_archives, transactional=True)
+    assert all(session.results)
+    assert read_tree(game)["mods/configs/shared.json"] == b"from c"
+
+    InstallTransaction(game).rollback()
+    assert read_tree(game) == before
+
+
+def test_transaction_aborts_on_broken_archive(tmp_path, conflicting_archives):
+    """Ein defektes Archiv bricht die Transaktion ab, der WoT Ordner bleibt unverändert"""
+    game = make_game(tmp_path / "game")
+    broken = conflicting_archives[0].with_name("broken.zip")
+    broken.write_bytes(b"PK\x03\x04 kein ZIP")
+    before = read_tree(game)
+
+    session = install(game, conflicting_archives + [broken], transactional=True)
+
+    assert session.results == [False] * 4
+    assert read_tree(game) == before
+
+
+def test_rollback_keeps_files_changed_by_a_later_install(tmp_path):
+    """Ein später überschriebener Zielpfad bleibt beim Rollback erhalten, Manifeste und Dateistatus werden angepasst"""
+    zip_folder = tmp_path / "zips"
+    a = make_zip(zip_folder / "a.zip", {"mods/configs/x.json": b"from a", "mods/configs/a.json": b"only a"})
+    b = make_zip(zip_folder / "b.zip", {"mods/configs/x.json": b"from b, longer"})
+    game = make_game(tmp_path / "game")
+
+    install(game, [a], transactional=True, incremental=True)
+    install(game, [b])
+    key = target_key("mods/configs/a.json")
+    assert key in FileStateIndex(game).entries
+
+    result = InstallTransaction(game).rollback()
+
+    assert result.restored == 1
+    assert result.skipped == [str(game / "mods" / "configs" / "x.json")]
+    assert read_tree(game) == {"mods/configs/x.json": b"from b, longer"}
+    assert ManifestStore(game).installed_archives() == ["b.zip"]
+    assert key not in FileStateIndex(game).entries
+
+
+def test_rollback_restores_previous_manifest(tmp_path):
+    """Nach dem Rollback einer Neuinstallation gilt wieder das Manifest der vorherigen Installation"""
+    zip_folder = tmp_path / "zips"
+    game = make_game(tmp_path / "game")
+    install(game, [make_zip(zip_folder / "a.zip", {"mods/configs/a.json": b"v1"})])
+    before = ManifestStore(game).load("a.zip")
+
+    install(game, [make_zip(zip_folder / "a.zip", {"mods/configs/a.json": b"v2", "mods/configs/new.json": b"n"})],
+            transactional=True)
+    InstallTransaction(game).rollback()
+
+    assert read_tree(game) == {"mods/configs/a.json": b"v1"}
+    assert ManifestStore(game).load("a.zip") == before
@@ -0,0 +1,36 @@
+"""
+Deinstallation anhand der Manifeste
+"""
+
+from wot_mod_installer_core import ManifestStore
+
+from .helpers import VERSION, install, make_game
+
+
+def test_uninstall_keeps_overwritten_and_modified_files(tmp_path, conflicting_archives):
+    """Deinstallation löscht nur Dateien, die kein späteres Archiv überschrieben hat und die unverändert sind"""
+    game = make_game(tmp_path / "game")
+    install(game, conflicting_archives[:2])
+    (game / "mods" / VERSION / "b.wotmod").write_bytes(b"changed by user")
+
+    store = ManifestStore(game)
+    result = store.uninstall("a.zip")
+    assert sorted(result.removed) == [f"mods/{VERSION}/a.wotmod", "res_mods/configs/x.xml"]
+    assert result.refused == [("mods/configs/shared.json", "überschrieben von b.zip")]
+    assert (game / "mods" / "configs" / "shared.json").read_bytes() == b"from b, longer"
+
+    result = store.uninstall("b.zip")
+    assert result.removed == ["mods/configs/shared.json"]
+    assert result.refused == [(f"mods/{VERSION}/b.wotmod", "seit der Installation verändert")]
+    assert store.installed_archives() == []
+
+
+def test_uninstall_keeps_modified_file_of_same_size(tmp_path, conflicting_archives):
+    """Eine veränderte Datei gleicher Größe wird am CRC32 erkannt und nicht gelöscht"""
+    game = make_game(tmp_path / "game")
+    install(game, conflicting_archives[:1])
+    (game / "mods" / VERSION / "a.wotmod").write_bytes(b"u" * 5000)
+
+    result = ManifestStore(game).uninstall("a.zip")
+    assert result.refused == [(f"mods/{VERSION}/a.wotmod", "seit der Installation verändert")]
+    assert (game / "mods" / VERSION / "a.wotmod").read_bytes() == b"u" * 5000
@@ -0,0 +1,22 @@
+"""
+Prüfung installierter Dateien gegen die Archive
+"""
+
+from wot_mod_installer_core import verify_installation
+
+from .helpers import VERSION, install, make_game
+
+
+def test_verify_reports_missing_and_modified_files(tmp_path, conflicting_archives):
+    """Fehlende Dateien und Änderungen gleicher Größe werden erkannt, gewonnene Konflikte gelten als in Ordnung"""
+    game = make_game(tmp_path / "game")
+    install(game, conflicting_archives)
+    (game / "mods" / VERSION / "a.wotmod").unlink()
+    (game / "res_mods" / "configs" / "x.xml").write_bytes(b"z-x")
+
+    result = verify_installation(conflicting_archives, game, VERSION, jobs=2)
+
+    assert result.missing == [(f"mods/{VERSION}/a.wotmod", "a.zip")]
+    assert result.modified == [("res_mods/configs/x.xml", "c.zip")]
+    assert sorted(result.ok) == [("mods/1.2.0.0/b.wotmod", "b.zip"), ("mods/configs/shared.json", "c.zip")]
+    assert result.errors == []
@@ -0,0 +1,22 @@
+"""
+Erkennung der Spielversion: Versionsordner in mods/, neueste zuerst
+"""
+
+from wot_mod_installer_core import find_game_versions
+
+
+def test_versions_are_sorted_numerically_newest_first(tmp_path):
+    """Numerisch sortiert (1.10 nach 1.9), Dateien und andere Ordner zählen nicht"""
+    mods = tmp_path / "mods"
+    for name in ("1.9.0.0", "1.10.0.0", "1.10.0.1", "configs", "1.2.3"):
+        (mods / name).mkdir(parents=True)
+    (mods / "2.0.0.0").write_text("keine Version, sondern eine Datei")
+
+    assert find_game_versions(tmp_path) == ["1.10.0.1", "1.10.0.0", "1.9.0.0"]
+
+
+def test_missing_mods_folder_is_not_an_empty_installation(tmp_path):
+    """Ohne mods-Ordner None, mit leerem mods-Ordner eine leere Liste"""
+    assert find_game_versions(tmp_path) is None
+    (tmp_path / "mods").mkdir()
+    assert find_game_versions(tmp_path) == []
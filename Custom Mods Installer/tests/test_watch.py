@@ -0,0 +1,62 @@
+"""
+Überwachung des ZIP-Ordners: neue Archive erst melden, wenn sie sich eine Wartezeit lang nicht mehr ändern
+"""
+
+from wot_mod_installer_core import FolderWatcher
+
+from .helpers import make_zip
+
+
+class FakeClock:
+    """Uhr der Tests, die nur per advance() weiterläuft"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def test_new_archive_is_reported_once_after_it_stopped_changing(tmp_path):
+    """Ein noch wachsendes Archiv startet die Wartezeit neu, danach wird es genau einmal gemeldet"""
+    zip_folder = tmp_path / "zips"
+    make_zip(zip_folder / "old.zip", {"mods/version/old.wotmod": b"o"})
+    clock = FakeClock()
+    watcher = FolderWatcher(zip_folder, debounce=3.0, clock=clock)
+
+    # Beim Start vorhandene Archive gelten als installiert
+    assert watcher.poll() == []
+
+    new = make_zip(zip_folder / "new.zip", {"mods/version/new.wotmod": b"n"})
+    (zip_folder / "readme.txt").write_text("kein Archiv")
+    assert watcher.poll() == []
+    clock.advance(2.0)
+    # Kopiervorgang noch nicht fertig: Größe ändert sich
+    make_zip(new, {"mods/version/new.wotmod": b"n" * 5000})
+    assert watcher.poll() == []
+    clock.advance(2.0)
+    assert watcher.poll() == []
+    clock.advance(1.0)
+    assert watcher.poll() == [new]
+    clock.advance(10.0)
+    assert watcher.poll() == []
+
+
+def test_deleted_and_recreated_archive_is_reported_again(tmp_path):
+    """Ein gelöschtes Archiv wird vergessen und beim erneuten Anlegen wieder gemeldet"""
+    zip_folder = tmp_path / "zips"
+    archive = make_zip(zip_folder / "a.zip", {"mods/version/a.wotmod": b"a"})
+    clock = FakeClock()
+    watcher = FolderWatcher(zip_folder, debounce=1.0, clock=clock)
+
+    archive.unlink()
+    assert watcher.poll() == []
+    assert watcher.known == {}
+
+    make_zip(archive, {"mods/version/a.wotmod": b"a"})
+    assert watcher.poll() == []
+    clock.advance(1.0)
+    assert watcher.poll() == [archive]
@@ -6,18 +6,96 @@ Ersetzt den "version" Platzhalter durch die aktuelle Spielversion.
 """
 
 import os
-import zipfile
-import shutil
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
 import threading
+import queue
+import tempfile
 from pathlib import Path
-import re
 import json
+from collections import namedtuple
 from datetime import datetime
 
+from wot_mod_installer_core import (
+    DEFAULT_BUFFER_SIZE, InstallSession, InstallTransaction, InstallPlan, ManifestStore, ContentStore, PhaseProfiler,
+    FolderWatcher, ArchiveIndexCache, find_conflicts, format_progress, get_path_rewriter, iter_conflict_report,
+    iter_install_diff, scan_zip_folder, verify_installation, with_later_winners, format_size, DiffSummary, DIFF_ERROR,
+    DIFF_IDENTICAL, DIFF_NEW, GAME_VERSION_PATTERN, find_game_versions, find_version_folders, remove_version_folders,
+)
+
+
+# Werte der Oberfläche für Hintergrund-Threads (Tk-Variablen werden nur im Mainloop gelesen)
+InstallSettings = namedtuple("InstallSettings", [
+    "wot_base_path", "zip_path", "current_version", "jobs", "incremental", "transactional", "index_cache",
+    "content_store",
+])
+
+
+class LineSpool:
+    """Zeilen in einer temporären Datei: der Schreiber wartet nie auf die Anzeige, der Speicherbedarf bleibt konstant"""
+    
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.lock = threading.Lock()
+        self.read_pos = 0
+        self.write_pos = 0
+    
+    def write(self, text):
+        """Zeilen anhängen (aus dem Hintergrund-Thread, nach close() ohne Wirkung)"""
+        data = text.encode("utf-8")
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.seek(self.write_pos)
+            self.file.write(data)
+            self.write_pos += len(data)
+    
+    def read_lines(self, limit):
+        """Höchstens limit noch nicht angezeigte Zeilen"""
+        lines = []
+        with self.lock:
+            if self.file.closed:
+                return lines
+            self.file.seek(self.read_pos)
+            while len(lines) < limit and self.read_pos < self.write_pos:
+                line = self.file.readline()
+                self.read_pos += len(line)
+                lines.append(line.decode("utf-8"))
+        return lines
+    
+    def pending(self):
+        """Gibt es noch nicht angezeigte Zeilen?"""
+        with self.lock:
+            return self.read_pos < self.write_pos
+    
+    def close(self):
+        """Temporäre Datei löschen"""
+        with self.lock:
+            self.file.close()
+
 
 class WoTModInstaller:
+    # Log-Ausgabe: Abfrageintervall der Warteschlange und maximale Zeilen im Log-Fenster
+    LOG_POLL_INTERVAL_MS = 100
+    LOG_MAX_LINES = 5000
+    
+    # Vorschau: Zeilen pro Seite im Textfeld (nächste Seite beim Scrollen ans Ende)
+    PREVIEW_PAGE_SIZE = 2000
+    
+    # Aktualisierungsintervall der Fortschrittsanzeige
+    PROGRESS_POLL_INTERVAL_MS = 250
+    
+    # Prüfung installierter Dateien: maximal so viele Pfade pro Kategorie im Log
+    VERIFY_LOG_LIMIT = 50
+    
+    # Überwachung des ZIP-Ordners: Abfrageintervall und Wartezeit bis eine neue ZIP-Datei als vollständig gilt
+    WATCH_POLL_INTERVAL_MS = 2000
+    WATCH_DEBOUNCE_SECONDS = 3.0
+    
+    # Aufgaben aus Hintergrund-Threads: Abfrageintervall und Einträge pro Schritt beim Füllen der Dateiliste
+    UI_POLL_INTERVAL_MS = 50
+    FILE_LIST_CHUNK = 500
+    
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("World of Tanks Mod Installer v2.1")
@@ -28,17 +106,69 @@ class WoTModInstaller:
         self.config_file = "installer_config.json"
         self.load_config()
         
+        # Puffergröße beim Entpacken (in KB über die Konfiguration einstellbar)
+        buffer_size_kb = self.config.get("buffer_size_kb", DEFAULT_BUFFER_SIZE // 1024)
+        if not isinstance(buffer_size_kb, int) or buffer_size_kb <= 0:
+            # 0 würde jede Datei leer schreiben, negative Werte lesen ganze Dateien in den Speicher
+            print(f"Ungültige Puffergröße in {self.config_file}: {buffer_size_kb!r}, verwende {DEFAULT_BUFFER_SIZE // 1024} KB")
+            buffer_size_kb = DEFAULT_BUFFER_SIZE // 1024
+        self.buffer_size = buffer_size_kb * 1024
+        
         # Variablen - mit intelligenter Pfad-Erkennung
         default_wot_path = self.config.get("wot_path", "G:\\Games\\World_of_Tanks_EU")
         self.wot_path = tk.StringVar(value=default_wot_path)
-        self.current_version = tk.StringVar()
         
-        # Smart ZIP-Ordner Bestimmung
-        default_zip_folder = self.get_smart_zip_folder(default_wot_path)
-        self.zip_folder = tk.StringVar(value=default_zip_folder)
+        # Zuletzt erkannte Version und zuletzt verwendeter ZIP-Ordner, bis die Erkennung im Hintergrund fertig ist
+        self.current_version = tk.StringVar(value=self.config.get("wot_version", ""))
+        self.zip_folder = tk.StringVar(value=self.config.get("zip_folder", os.getcwd()))
+        
+        # Index-Cache der ZIP-Inhaltsverzeichnisse (pro ZIP-Ordner)
+        self.index_cache = None
+        
+        # Anzahl parallel installierter ZIP-Dateien
+        self.install_jobs = tk.IntVar(value=self.config.get("install_jobs", 1))
+        
+        # Inkrementelle Installation (identische Dateien überspringen)
+        self.incremental = tk.BooleanVar(value=self.config.get("incremental", False))
+        
+        # Transaktionale Installation (Staging-Verzeichnis, Übernahme per Umbenennen, Rollback)
+        self.transactional = tk.BooleanVar(value=self.config.get("transactional", False))
+        
+        # Dateispeicher im ZIP-Ordner (Bereitstellung per Hardlink)
+        self.use_content_store = tk.BooleanVar(value=self.config.get("content_store", False))
+        
+        # Zeitmessung pro Phase (nur über die Konfiguration, Ausgabe neben der Konfigurationsdatei)
+        self.profile = self.config.get("profile", False)
+        
+        # Überwachung des ZIP-Ordners (neue oder geänderte ZIP-Dateien automatisch installieren)
+        self.watch_enabled = tk.BooleanVar(value=self.config.get("watch", False))
+        self.folder_watcher = None
+        self.watch_after_id = None  # geplante Abfrage, es läuft höchstens eine
+        self.watch_polling = False  # Verzeichnisdurchlauf läuft im Hintergrund
+        self.watch_generation = 0  # Ergebnisse vor dem letzten Ein-/Ausschalten werden verworfen
+        self.watch_ready = []  # erkannte ZIP-Dateien, die auf das Ende einer laufenden Installation warten
+        
+        # Log-Nachrichten aus allen Threads, werden im Tk-Mainloop gesammelt ausgegeben
+        self.log_queue = queue.Queue()
+        
+        # Laufende Installation (für die Fortschrittsanzeige)
+        self.install_thread = None
+        self.active_session = None
+        self.progress_text = tk.StringVar()
+        
+        # Aufgaben aus Hintergrund-Threads, die im Tk-Mainloop ausgeführt werden
+        self.ui_queue = queue.Queue()
+        
+        # Zähler der Ordner-Durchläufe, Ergebnisse veralteter Durchläufe werden verworfen
+        self.scan_generation = 0
+        
+        # Zähler der vom Benutzer gewählten Ordner, die Erkennung beim Start überschreibt keine neuere Auswahl
+        self.path_generation = 0
         
         self.setup_ui()
-        self.detect_wot_version()
+        self.process_log_queue()
+        self.process_ui_queue()
+        self.start_background_startup()
         
     def get_smart_zip_folder(self, wot_path):
         """Bestimme intelligenten Standard-Pfad für ZIP-Ordner"""
@@ -69,28 +199,8 @@ class WoTModInstaller:
     
     def smart_version_replacement(self, file_path, current_version):
         """Intelligente Versionserkennung und -ersetzung in Dateipfaden"""
-        import re
-        
-        # 1. Ersetze expliziten "version" Platzhalter
-        if "/version/" in file_path or "\\version\\" in file_path:
-            return file_path.replace("/version/", f"/{current_version}/").replace("\\version\\", f"\\{current_version}\\")
-        
-        # 2. Erkenne und ersetze existierende Versionsnummern im mods/ Ordner
-        # Vereinfachtes Pattern für bessere Kompatibilität
-        if "mods/" in file_path:
-            # Forward slash Pattern
-            pattern = r'mods/\d+\.\d+\.\d+\.\d+/'
-            if re.search(pattern, file_path):
-                return re.sub(pattern, f'mods/{current_version}/', file_path)
-        
-        if "mods\\" in file_path:
-            # Backslash Pattern (Windows)
-            pattern = r'mods\\\d+\.\d+\.\d+\.\d+\\'
-            if re.search(pattern, file_path):
-                return re.sub(pattern, f'mods\\{current_version}\\', file_path)
-        
-        # 3. Keine Änderung nötig
-        return file_path
+        # Gemeinsame, vorkompilierte Regeln ("version" Platzhalter und mods/x.x.x.x/)
+        return get_path_rewriter(current_version).rewrite(file_path)
         
     def load_config(self):
         """Lade Konfiguration aus JSON-Datei"""
@@ -109,6 +219,11 @@ class WoTModInstaller:
         try:
             self.config["wot_path"] = self.wot_path.get()
             self.config["zip_folder"] = self.zip_folder.get()
+            self.config["install_jobs"] = self.get_install_jobs()
+            self.config["incremental"] = self.incremental.get()
+            self.config["transactional"] = self.transactional.get()
+            self.config["content_store"] = self.use_content_store.get()
+            self.config["watch"] = self.watch_enabled.get()
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(self.config, f, indent=2, ensure_ascii=False)
         except Exception as e:
@@ -138,24 +253,38 @@ class WoTModInstaller:
         
         ttk.Label(version_frame, textvariable=self.current_version, font=("Arial", 10, "bold")).grid(row=0, column=0, sticky=tk.W)
         ttk.Button(version_frame, text="Neu erkennen", command=self.detect_wot_version).grid(row=0, column=1, padx=(10, 0))
+        ttk.Button(version_frame, text="Mods übernehmen", command=self.migrate_installed_mods).grid(row=0, column=2, padx=(10, 0))
+        ttk.Button(version_frame, text="Alte Versionen", command=self.show_cleanup_dialog).grid(row=0, column=3, padx=(10, 0))
         
         # ZIP-Ordner
         ttk.Label(main_frame, text="ZIP-Dateien Ordner:").grid(row=2, column=0, sticky=tk.W, pady=5)
         ttk.Entry(main_frame, textvariable=self.zip_folder, width=50).grid(row=2, column=1, sticky=(tk.W, tk.E), padx=(5, 0), pady=5)
         ttk.Button(main_frame, text="Durchsuchen", command=self.browse_zip_folder).grid(row=2, column=2, padx=(5, 0), pady=5)
         
+        # Optionen
+        ttk.Label(main_frame, text="Optionen:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        options_frame = ttk.Frame(main_frame)
+        options_frame.grid(row=3, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        
+        ttk.Label(options_frame, text="Parallele Installationen:").pack(side=tk.LEFT)
+        ttk.Spinbox(options_frame, from_=1, to=32, width=4, textvariable=self.install_jobs).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Checkbutton(options_frame, text="Nur geänderte Dateien schreiben", variable=self.incremental).pack(side=tk.LEFT, padx=(20, 0))
+        ttk.Checkbutton(options_frame, text="Alles oder nichts (transaktional)", variable=self.transactional).pack(side=tk.LEFT, padx=(20, 0))
+        ttk.Checkbutton(options_frame, text="Dateispeicher (Hardlinks)", variable=self.use_content_store).pack(side=tk.LEFT, padx=(20, 0))
+        ttk.Checkbutton(options_frame, text="Ordner überwachen", variable=self.watch_enabled, command=self.toggle_watch).pack(side=tk.LEFT, padx=(20, 0))
+        
         # Separator
-        ttk.Separator(main_frame, orient='horizontal').grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=20)
+        ttk.Separator(main_frame, orient='horizontal').grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=20)
         
         # Dateien-Liste
-        ttk.Label(main_frame, text="Verfügbare ZIP-Dateien:").grid(row=4, column=0, columnspan=3, sticky=tk.W, pady=(0, 5))
+        ttk.Label(main_frame, text="Verfügbare ZIP-Dateien:").grid(row=5, column=0, columnspan=3, sticky=tk.W, pady=(0, 5))
         
         # Listbox mit Scrollbar
         list_frame = ttk.Frame(main_frame)
-        list_frame.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        list_frame.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         list_frame.columnconfigure(0, weight=1)
         list_frame.rowconfigure(0, weight=1)
-        main_frame.rowconfigure(5, weight=1)
+        main_frame.rowconfigure(6, weight=1)
         
         self.file_listbox = tk.Listbox(list_frame, selectmode=tk.MULTIPLE, height=8)
         self.file_listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -166,34 +295,154 @@ class WoTModInstaller:
         
         # Buttons
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=6, column=0, columnspan=3, pady=10)
+        button_frame.grid(row=7, column=0, columnspan=3, pady=10)
         
         ttk.Button(button_frame, text="Liste aktualisieren", command=self.refresh_file_list).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="Alle auswählen", command=self.select_all_files).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="Auswahl aufheben", command=self.deselect_all_files).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="Rückgängig", command=self.rollback_last_install).pack(side=tk.LEFT, padx=(20, 0))
+        ttk.Button(button_frame, text="Deinstallieren", command=self.show_uninstall_dialog).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(button_frame, text="Plan speichern", command=self.save_install_plan).pack(side=tk.LEFT, padx=(20, 0))
+        ttk.Button(button_frame, text="Plan installieren", command=self.install_from_plan).pack(side=tk.LEFT, padx=(10, 0))
         ttk.Button(button_frame, text="Vorschau", command=self.preview_selected_mods).pack(side=tk.LEFT, padx=(20, 0))
+        ttk.Button(button_frame, text="Prüfen", command=self.verify_selected_mods).pack(side=tk.LEFT, padx=(10, 0))
         ttk.Button(button_frame, text="Installieren", command=self.install_selected_mods, style="Accent.TButton").pack(side=tk.LEFT, padx=(10, 0))
         
-        # Progress Bar
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-        self.progress.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
+        # Progress Bar (Fortschritt in Bytes) mit Durchsatz und Restzeit
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=8, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
+        progress_frame.columnconfigure(0, weight=1)
+        
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate', maximum=100)
+        self.progress.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        ttk.Label(progress_frame, textvariable=self.progress_text, font=("Consolas", 9)).grid(row=1, column=0, sticky=tk.W, pady=(2, 0))
         
         # Log-Bereich
-        ttk.Label(main_frame, text="Installation Log:").grid(row=8, column=0, columnspan=3, sticky=tk.W, pady=(10, 5))
+        ttk.Label(main_frame, text="Installation Log:").grid(row=9, column=0, columnspan=3, sticky=tk.W, pady=(10, 5))
         
         self.log_text = scrolledtext.ScrolledText(main_frame, height=8, wrap=tk.WORD)
-        self.log_text.grid(row=9, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
-        main_frame.rowconfigure(9, weight=1)
-        
-        # Initial laden
-        self.refresh_file_list()
+        self.log_text.grid(row=10, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        main_frame.rowconfigure(10, weight=1)
+    
+    def get_install_jobs(self):
+        """Lese die Anzahl paralleler Installationen aus der Oberfläche"""
+        try:
+            return max(1, int(self.install_jobs.get()))
+        except (tk.TclError, ValueError):
+            return 1
+    
+    def get_index_cache(self):
+        """Index-Cache für den aktuellen ZIP-Ordner (nur im Mainloop, Hintergrund-Threads erhalten ihn über InstallSettings)"""
+        zip_path = Path(self.zip_folder.get())
+        if self.index_cache is None or self.index_cache.zip_folder != zip_path:
+            self.index_cache = ArchiveIndexCache(zip_path)
+        return self.index_cache
+    
+    def get_content_store(self, zip_path):
+        """Dateispeicher im ZIP-Ordner, falls aktiviert"""
+        return ContentStore(zip_path) if self.use_content_store.get() else None
+    
+    def get_install_settings(self):
+        """Pfade, Version und Optionen für einen Hintergrund-Thread (im Mainloop aufrufen, auch der Index-Cache)"""
+        zip_path = Path(self.zip_folder.get())
+        return InstallSettings(
+            wot_base_path=Path(self.wot_path.get()),
+            zip_path=zip_path,
+            current_version=self.current_version.get(),
+            jobs=self.get_install_jobs(),
+            incremental=self.incremental.get(),
+            transactional=self.transactional.get(),
+            index_cache=self.get_index_cache(),
+            content_store=self.get_content_store(zip_path),
+        )
+    
+    def create_session(self, settings, **options):
+        """InstallSession mit den Einstellungen der Oberfläche"""
+        return InstallSession(
+            settings.wot_base_path,
+            settings.current_version,
+            log=self.log_message,
+            buffer_size=self.buffer_size,
+            incremental=settings.incremental,
+            index_cache=settings.index_cache,
+            transactional=settings.transactional,
+            content_store=settings.content_store,
+            **options,
+        )
     
     def log_message(self, message):
-        """Füge Nachricht zum Log hinzu"""
+        """Füge Nachricht zum Log hinzu (thread-sicher, Ausgabe erfolgt im Mainloop)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        self.log_queue.put(f"[{timestamp}] {message}\n")
+    
+    def process_log_queue(self):
+        """Übertrage gesammelte Log-Nachrichten gebündelt in das Log-Fenster"""
+        messages = []
+        try:
+            while True:
+                messages.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if messages:
+            self.log_text.insert(tk.END, "".join(messages))
+            
+            # Nur die letzten Zeilen behalten, damit das Textfeld schnell bleibt
+            line_count = int(self.log_text.index("end-1c").split(".")[0])
+            if line_count > self.LOG_MAX_LINES:
+                self.log_text.delete("1.0", f"{line_count - self.LOG_MAX_LINES}.0")
+            
+            self.log_text.see(tk.END)
+        
+        self.root.after(self.LOG_POLL_INTERVAL_MS, self.process_log_queue)
+    
+    def process_ui_queue(self):
+        """Führe Aufgaben aus Hintergrund-Threads im Mainloop aus"""
+        try:
+            while True:
+                self.ui_queue.get_nowait()()
+        except queue.Empty:
+            pass
+        
+        self.root.after(self.UI_POLL_INTERVAL_MS, self.process_ui_queue)
+    
+    def start_background_startup(self):
+        """Zeige die zuletzt bekannte Dateiliste und ermittle Ordner, Version und ZIP-Dateien im Hintergrund"""
+        cached_files = self.config.get("zip_files", [])
+        if cached_files:
+            self.file_listbox.insert(tk.END, *cached_files)
+            self.log_message(f"Zuletzt bekannte Liste: {len(cached_files)} ZIP-Dateien (wird aktualisiert)")
+        
+        self.scan_generation += 1
+        threading.Thread(target=self._startup_thread,
+                         args=(self.wot_path.get(), self.scan_generation, self.path_generation),
+                         daemon=True).start()
+    
+    def _startup_thread(self, wot_path, generation, path_generation):
+        """Startarbeiten im separaten Thread, die Oberfläche wird über die UI-Warteschlange aktualisiert"""
+        zip_folder = self.get_smart_zip_folder(wot_path)
+        version = self.find_wot_version(wot_path)
+        self.ui_queue.put(lambda: self.apply_startup_state(generation, path_generation, zip_folder, version))
+        self._scan_zip_folder_thread(Path(zip_folder), generation)
+        self.ui_queue.put(self.finish_startup)
+    
+    def apply_startup_state(self, generation, path_generation, zip_folder, version):
+        """Übernehme ZIP-Ordner und Version aus dem Start-Thread (außer der Benutzer hat inzwischen Ordner gewählt)"""
+        if path_generation != self.path_generation:
+            return
+        previous_zip_folder = self.zip_folder.get()
+        self.zip_folder.set(zip_folder)
+        self.apply_wot_version(*version)
+        
+        # "Liste aktualisieren" vor dem Ende des Starts: der Durchlauf des Start-Threads wird verworfen,
+        # die Liste muss dann für den erkannten ZIP-Ordner neu geladen werden
+        if generation != self.scan_generation and zip_folder != previous_zip_folder:
+            self.refresh_file_list()
+    
+    def finish_startup(self):
+        """Starte die Überwachung erst nach dem Start, damit sie den endgültigen ZIP-Ordner erfasst"""
+        if self.watch_enabled.get():
+            self.toggle_watch()
     
     def browse_wot_path(self):
         """Durchsuche nach World of Tanks Installationsordner"""
@@ -202,6 +451,7 @@ class WoTModInstaller:
             initialdir=self.wot_path.get()
         )
         if folder:
+            self.path_generation += 1
             self.wot_path.set(folder)
             
             # Aktualisiere automatisch den ZIP-Ordner basierend auf neuem WoT-Pfad
@@ -222,61 +472,90 @@ class WoTModInstaller:
             initialdir=self.zip_folder.get()
         )
         if folder:
+            self.path_generation += 1
             self.zip_folder.set(folder)
             self.refresh_file_list()
             self.save_config()
     
-    def detect_wot_version(self):
-        """Erkenne die aktuelle World of Tanks Version"""
+    def find_wot_version(self, wot_path):
+        """Ermittle Anzeige und Log-Meldung der aktuellen Version (ohne Zugriff auf die Oberfläche)"""
         try:
-            mods_path = Path(self.wot_path.get()) / "mods"
-            if not mods_path.exists():
-                self.current_version.set("Nicht gefunden - Mods-Ordner existiert nicht")
-                return
-            
-            # Suche nach Versionsordnern (Format: x.x.x.x)
-            version_pattern = re.compile(r'^\d+\.\d+\.\d+\.\d+$')
-            versions = []
-            
-            for item in mods_path.iterdir():
-                if item.is_dir() and version_pattern.match(item.name):
-                    versions.append(item.name)
-            
+            versions = find_game_versions(wot_path)
+            if versions is None:
+                return "Nicht gefunden - Mods-Ordner existiert nicht", None
             if versions:
-                # Sortiere Versionen und nimm die neueste
-                versions.sort(key=lambda x: [int(n) for n in x.split('.')], reverse=True)
-                latest_version = versions[0]
-                self.current_version.set(latest_version)
-                self.log_message(f"Version erkannt: {latest_version}")
-            else:
-                self.current_version.set("Keine Version gefunden")
-                self.log_message("Keine gültige Spielversion im mods-Ordner gefunden")
-                
+                return versions[0], f"Version erkannt: {versions[0]}"
+            return "Keine Version gefunden", "Keine gültige Spielversion im mods-Ordner gefunden"
         except Exception as e:
-            self.current_version.set(f"Fehler: {str(e)}")
-            self.log_message(f"Fehler beim Erkennen der Version: {e}")
+            return f"Fehler: {str(e)}", f"Fehler beim Erkennen der Version: {e}"
     
-    def refresh_file_list(self):
-        """Aktualisiere die Liste der ZIP-Dateien"""
-        self.file_listbox.delete(0, tk.END)
+    def detect_wot_version(self):
+        """Erkenne die aktuelle World of Tanks Version"""
+        self.apply_wot_version(*self.find_wot_version(self.wot_path.get()))
+    
+    def apply_wot_version(self, version, message):
+        """Zeige die erkannte Version an und merke sie für den nächsten Start"""
+        self.current_version.set(version)
+        if message:
+            self.log_message(message)
         
+        if GAME_VERSION_PATTERN.match(version) and self.config.get("wot_version") != version:
+            self.config["wot_version"] = version
+            self.save_config()
+    
+    def refresh_file_list(self):
+        """Aktualisiere die Liste der ZIP-Dateien (Verzeichnisdurchlauf im Hintergrund)"""
+        self.scan_generation += 1
+        threading.Thread(target=self._scan_zip_folder_thread, args=(Path(self.zip_folder.get()), self.scan_generation),
+                         daemon=True).start()
+    
+    def _scan_zip_folder_thread(self, zip_path, generation):
+        """Suche ZIP-Dateien im separaten Thread und bereinige danach den Index-Cache"""
         try:
-            zip_path = Path(self.zip_folder.get())
             if not zip_path.exists():
                 self.log_message(f"ZIP-Ordner existiert nicht: {zip_path}")
+                self.ui_queue.put(lambda: self.show_file_list(generation, []))
                 return
             
-            zip_files = list(zip_path.glob("*.zip"))
-            zip_files.sort()
-            
-            for zip_file in zip_files:
-                self.file_listbox.insert(tk.END, zip_file.name)
-            
+            zip_files = scan_zip_folder(zip_path)
+            names = [zip_file.name for zip_file in zip_files]
+            self.ui_queue.put(lambda: self.show_file_list(generation, names))
             self.log_message(f"{len(zip_files)} ZIP-Dateien gefunden")
             
+            # Index-Einträge gelöschter Archive entfernen (eigene Instanz, der Tk-Thread wird nicht blockiert)
+            index_cache = ArchiveIndexCache(zip_path)
+            index_cache.prune(zip_files)
+            index_cache.save()
+            
         except Exception as e:
             self.log_message(f"Fehler beim Laden der ZIP-Dateien: {e}")
     
+    def show_file_list(self, generation, names):
+        """Ersetze die Dateiliste, die Auswahl bleibt für weiterhin vorhandene Dateien erhalten"""
+        if generation != self.scan_generation:
+            return
+        selected = {self.file_listbox.get(index) for index in self.file_listbox.curselection()}
+        self.file_listbox.delete(0, tk.END)
+        self.fill_file_list(generation, names, 0, selected)
+    
+    def fill_file_list(self, generation, names, start, selected):
+        """Füge die Dateien blockweise ein, damit das Fenster auch bei sehr vielen ZIP-Dateien bedienbar bleibt"""
+        if generation != self.scan_generation:
+            return
+        chunk = names[start:start + self.FILE_LIST_CHUNK]
+        if chunk:
+            self.file_listbox.insert(tk.END, *chunk)
+        for offset, name in enumerate(chunk):
+            if name in selected:
+                self.file_listbox.selection_set(start + offset)
+        
+        if start + len(chunk) < len(names):
+            self.root.after(1, self.fill_file_list, generation, names, start + len(chunk), selected)
+        elif self.config.get("zip_files") != names:
+            # Liste für den nächsten Start merken
+            self.config["zip_files"] = names
+            self.save_config()
+    
     def select_all_files(self):
         """Wähle alle Dateien aus"""
         self.file_listbox.selection_set(0, tk.END)
@@ -287,6 +566,10 @@ class WoTModInstaller:
     
     def install_selected_mods(self):
         """Installiere ausgewählte Mods"""
+        if self.install_thread is not None and self.install_thread.is_alive():
+            messagebox.showwarning("Installation läuft", "Bitte warten Sie, bis die laufende Installation abgeschlossen ist.")
+            return
+
         selected_indices = self.file_listbox.curselection()
         if not selected_indices:
             messagebox.showwarning("Keine Auswahl", "Bitte wählen Sie mindestens eine ZIP-Datei aus.")
@@ -297,77 +580,462 @@ class WoTModInstaller:
             return
         
         # Starte Installation in separatem Thread
-        threading.Thread(target=self._install_mods_thread, args=(selected_indices,), daemon=True).start()
+        settings = self.get_install_settings()
+        zip_files = [settings.zip_path / self.file_listbox.get(index) for index in selected_indices]
+        self.start_install_thread(settings, zip_files)
+    
+    def start_install_thread(self, settings, zip_files, watch_files=None, plan=None):
+        """Starte die Installation im separaten Thread und zeige ihren Fortschritt an"""
+        self.active_session = None
+        self.progress['value'] = 0
+        self.progress_text.set("")
+        self.install_thread = threading.Thread(target=self._install_mods_thread,
+                                               args=(settings, zip_files, watch_files, plan), daemon=True)
+        self.install_thread.start()
+        self.update_progress_display()
+    
+    def update_progress_display(self):
+        """Aktualisiere Fortschrittsbalken, MB/s, Dateien/s und Restzeit (im Mainloop)"""
+        # Vor der Anzeige prüfen, damit nach Ende des Threads noch einmal der Endstand angezeigt wird
+        running = self.install_thread is not None and self.install_thread.is_alive()
+        
+        session = self.active_session
+        if session is not None:
+            snapshot = session.progress.snapshot()
+            if snapshot.total_bytes:
+                self.progress['value'] = min(100.0, snapshot.done_bytes * 100.0 / snapshot.total_bytes)
+            self.progress_text.set(format_progress(snapshot))
+        
+        if running:
+            self.root.after(self.PROGRESS_POLL_INTERVAL_MS, self.update_progress_display)
+    
+    def toggle_watch(self):
+        """Überwachung des ZIP-Ordners ein- bzw. ausschalten"""
+        if self.watch_after_id is not None:
+            self.root.after_cancel(self.watch_after_id)
+            self.watch_after_id = None
+        self.watch_generation += 1
+        self.watch_ready = []
+        if self.watch_enabled.get():
+            self.folder_watcher = None
+            self.log_message("Überwachung des ZIP-Ordners gestartet")
+            self.poll_watch()
+        else:
+            self.folder_watcher = None
+            self.log_message("Überwachung des ZIP-Ordners beendet")
+    
+    def poll_watch(self):
+        """Starte die Abfrage des ZIP-Ordners im Hintergrund, das Ergebnis kommt über die UI-Warteschlange"""
+        self.watch_after_id = None
+        if not self.watch_enabled.get():
+            return
+        self.watch_after_id = self.root.after(self.WATCH_POLL_INTERVAL_MS, self.poll_watch)
+        
+        # Während einer Installation nicht abfragen, Änderungen werden danach erkannt
+        if self.install_thread is not None and self.install_thread.is_alive():
+            return
+        # Ein langsames Laufwerk braucht länger als das Intervall: höchstens ein Durchlauf gleichzeitig
+        if self.watch_polling:
+            return
+        
+        self.watch_polling = True
+        threading.Thread(target=self._poll_watch_thread,
+                         args=(self.folder_watcher, Path(self.zip_folder.get()), self.watch_generation),
+                         daemon=True).start()
     
-    def _install_mods_thread(self, selected_indices):
-        """Installation im separaten Thread"""
+    def _poll_watch_thread(self, watcher, zip_path, generation):
+        """Verzeichnisdurchlauf der Überwachung im separaten Thread (scandir und stat blockieren das Fenster nicht)"""
+        ready = []
+        try:
+            if watcher is None or watcher.zip_folder != zip_path:
+                # Stand beim Start (bzw. nach Wechsel des Ordners) gilt als installiert
+                watcher = FolderWatcher(zip_path, self.WATCH_DEBOUNCE_SECONDS)
+            else:
+                ready = watcher.poll()
+        except OSError as e:
+            self.log_message(f"Fehler bei der Überwachung: {e}")
+        self.ui_queue.put(lambda: self.finish_watch_poll(generation, watcher, ready))
+    
+    def finish_watch_poll(self, generation, watcher, ready):
+        """Übernehme das Ergebnis der Abfrage und installiere neue oder geänderte ZIP-Dateien"""
+        self.watch_polling = False
+        if generation != self.watch_generation or not self.watch_enabled.get():
+            return
+        self.folder_watcher = watcher
+        self.watch_ready.extend(ready)
+        
+        # Inzwischen von Hand gestartete Installation: danach installieren
+        if self.install_thread is not None and self.install_thread.is_alive():
+            return
+        
+        ready, self.watch_ready = sorted(set(self.watch_ready)), []
+        version = self.current_version.get()
+        if not ready or not version or "Nicht gefunden" in version or "Fehler" in version:
+            return
+        
+        self.log_message(f"Neu oder geändert: {', '.join(zip_file.name for zip_file in ready)}")
+        self.refresh_file_list()
+        # Die Überwachung installiert immer inkrementell
+        self.start_install_thread(self.get_install_settings()._replace(incremental=True), None, watch_files=ready)
+    
+    def _install_mods_thread(self, settings, zip_files, watch_files=None, plan=None):
+        """Installation im separaten Thread (watch_files: von der Überwachung gefundene ZIP-Dateien)"""
         try:
-            self.progress.start()
             self.log_message("=== Installation gestartet ===")
             
-            current_version = self.current_version.get()
-            wot_base_path = Path(self.wot_path.get())  # Direkt in den WoT Hauptordner
-            zip_path = Path(self.zip_folder.get())
+            if plan is not None:
+                # Gespeicherter Plan: nur installieren, wenn alle Archive unverändert sind
+                zip_files = plan.zip_files(settings.zip_path)
+                problems = plan.check(settings.zip_path, settings.index_cache)
+                if problems:
+                    for problem in problems:
+                        self.log_message(f"✗ {problem}")
+                    self.log_message("Installationsplan abgelehnt: Archive fehlen oder wurden geändert")
+                    self.ui_queue.put(lambda: messagebox.showerror("Installationsplan",
+                        "Der Installationsplan passt nicht mehr zu den ZIP-Dateien.\n\nBitte prüfen Sie das Log für Details."))
+                    return
+            elif watch_files is not None:
+                # Spätere Archive mit gemeinsamen Zielpfaden erneut anwenden, damit weiterhin das letzte gewinnt
+                zip_files = with_later_winners(watch_files, scan_zip_folder(settings.zip_path),
+                                               settings.current_version, settings.index_cache)
             
-            success_count = 0
-            error_count = 0
+            # Gemeinsame Installations-Engine mit intelligenter Versionserkennung und -ersetzung
+            # (direkt in den WoT Hauptordner)
+            session = self.create_session(
+                settings,
+                profiler=PhaseProfiler() if self.profile else None,
+                pipeline=self.config.get("pipeline", True),
+                plan=plan,
+            )
+            self.active_session = session
             
-            for index in selected_indices:
-                zip_filename = self.file_listbox.get(index)
-                zip_file_path = zip_path / zip_filename
-                
-                try:
-                    self.log_message(f"Installiere: {zip_filename}")
-                    
-                    with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                        for member in zip_ref.namelist():
-                            # Überspringe Ordner
-                            if member.endswith('/') or member.endswith('\\'):
-                                continue
-                            
-                            # Intelligente Versionserkennung und -ersetzung
-                            target_path = self.smart_version_replacement(member, current_version)
-                            
-                            # Vollständiger Zielpfad (direkt in WoT Hauptordner)
-                            full_target_path = wot_base_path / target_path
-                            
-                            # Erstelle Zielverzeichnis falls notwendig
-                            full_target_path.parent.mkdir(parents=True, exist_ok=True)
-                            
-                            # Extrahiere Datei
-                            with zip_ref.open(member) as source:
-                                with open(full_target_path, 'wb') as target:
-                                    target.write(source.read())
-                            
-                            # Log-Ausgabe
-                            if target_path != member:
-                                self.log_message(f"  {member} → {target_path}")
-                            else:
-                                self.log_message(f"  → {target_path}")
-                    
-                    success_count += 1
-                    self.log_message(f"✓ {zip_filename} erfolgreich installiert")
-                    
-                except Exception as e:
-                    error_count += 1
-                    self.log_message(f"✗ Fehler bei {zip_filename}: {e}")
+            # Bei mehreren Jobs gewinnt bei gleichen Zielpfaden weiterhin das letzte Archiv der Liste
+            success_count, error_count = session.install_all(zip_files, settings.jobs)
             
             self.log_message(f"=== Installation abgeschlossen ===")
             self.log_message(f"Erfolgreich: {success_count}, Fehler: {error_count}")
+            if session.incremental:
+                self.log_message(f"Dateien geschrieben: {session.written_count}, unverändert: {session.skipped_count}")
+            if session.content_store is not None:
+                self.log_message(f"Aus dem Dateispeicher: {session.content_store.hits}, neu entpackt: {session.content_store.misses}")
+            if session.profiler is not None:
+                profile_path = Path(self.config_file).with_name("installer_profile.json")
+                trace_path = session.profiler.save(profile_path)
+                self.log_message(f"Zeitmessung gespeichert: {profile_path} (Trace: {trace_path})")
+            
+            # Automatische Installationen der Überwachung nur im Log melden
+            if watch_files is not None:
+                return
             
             if error_count == 0:
-                self.root.after(0, lambda: messagebox.showinfo("Installation abgeschlossen", 
+                self.ui_queue.put(lambda: messagebox.showinfo("Installation abgeschlossen", 
                     f"Alle {success_count} Mods wurden erfolgreich installiert!"))
             else:
-                self.root.after(0, lambda: messagebox.showwarning("Installation abgeschlossen", 
+                self.ui_queue.put(lambda: messagebox.showwarning("Installation abgeschlossen", 
                     f"Installation abgeschlossen.\nErfolgreich: {success_count}\nFehler: {error_count}\n\nBitte prüfen Sie das Log für Details."))
                     
         except Exception as e:
             self.log_message(f"Kritischer Fehler: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Installation Fehler", f"Kritischer Fehler bei der Installation:\n{e}"))
+            self.ui_queue.put(lambda: messagebox.showerror("Installation Fehler", f"Kritischer Fehler bei der Installation:\n{e}"))
+    
+    def save_install_plan(self):
+        """Speichere die ausgewählten ZIP-Dateien als Installationsplan"""
+        selected_indices = self.file_listbox.curselection()
+        if not selected_indices:
+            messagebox.showwarning("Keine Auswahl", "Bitte wählen Sie mindestens eine ZIP-Datei aus.")
+            return
+        
+        if not self.current_version.get() or "Nicht gefunden" in self.current_version.get() or "Fehler" in self.current_version.get():
+            messagebox.showerror("Version Fehler", "Keine gültige World of Tanks Version erkannt. Bitte überprüfen Sie den Installationspfad.")
+            return
+        
+        plan_path = filedialog.asksaveasfilename(title="Installationsplan speichern", defaultextension=".json",
+                                                 initialfile="wot_mod_plan.json",
+                                                 filetypes=[("Installationsplan", "*.json")])
+        if not plan_path:
+            return
         
+        zip_path = Path(self.zip_folder.get())
+        zip_files = [zip_path / self.file_listbox.get(index) for index in selected_indices]
+        index_cache = self.get_index_cache()
+        try:
+            plan = InstallPlan.compile(zip_files, self.current_version.get(), index_cache)
+            plan.save(plan_path)
+        except Exception as e:
+            messagebox.showerror("Installationsplan", f"Plan konnte nicht gespeichert werden:\n{e}")
+            return
         finally:
-            self.progress.stop()
+            index_cache.save()
+        
+        file_count = sum(len(archive.files) for archive in plan.archives)
+        self.log_message(f"Installationsplan gespeichert: {plan_path} ({len(plan.archives)} Archive, {file_count} Dateien)")
+    
+    def install_from_plan(self):
+        """Installiere einen gespeicherten Installationsplan (ohne erneute Planung)"""
+        if not self.current_version.get() or "Nicht gefunden" in self.current_version.get() or "Fehler" in self.current_version.get():
+            messagebox.showerror("Version Fehler", "Keine gültige World of Tanks Version erkannt. Bitte überprüfen Sie den Installationspfad.")
+            return
+        
+        if self.install_thread is not None and self.install_thread.is_alive():
+            messagebox.showwarning("Installation läuft", "Bitte warten Sie, bis die laufende Installation abgeschlossen ist.")
+            return
+        
+        plan_path = filedialog.askopenfilename(title="Installationsplan öffnen",
+                                               filetypes=[("Installationsplan", "*.json")])
+        if not plan_path:
+            return
+        
+        try:
+            plan = InstallPlan.load(plan_path)
+        except Exception as e:
+            messagebox.showerror("Installationsplan", f"Plan konnte nicht geladen werden:\n{e}")
+            return
+        
+        if plan.current_version != self.current_version.get():
+            messagebox.showerror("Installationsplan", f"Der Plan wurde für Version {plan.current_version} erstellt, "
+                                 f"installiert ist Version {self.current_version.get()}.")
+            return
+        
+        self.start_install_thread(self.get_install_settings(), None, plan=plan)
+    
+    def migrate_installed_mods(self):
+        """Übernehme installierte Mods älterer Versionsordner in die aktuelle Version"""
+        if not self.current_version.get() or "Nicht gefunden" in self.current_version.get() or "Fehler" in self.current_version.get():
+            messagebox.showerror("Version Fehler", "Keine gültige World of Tanks Version erkannt. Bitte überprüfen Sie den Installationspfad.")
+            return
+        
+        if self.install_thread is not None and self.install_thread.is_alive():
+            messagebox.showwarning("Installation läuft", "Bitte warten Sie, bis die laufende Installation abgeschlossen ist.")
+            return
+        
+        self.active_session = None
+        self.progress['value'] = 0
+        self.progress_text.set("")
+        self.install_thread = threading.Thread(target=self._migrate_mods_thread, args=(self.get_install_settings(),),
+                                               daemon=True)
+        self.install_thread.start()
+        self.update_progress_display()
+    
+    def _migrate_mods_thread(self, settings):
+        """Migration im separaten Thread: Hardlinks für vorhandene Dateien, nur bei Bedarf neu entpacken"""
+        try:
+            current_version = settings.current_version
+            wot_base_path = settings.wot_base_path
+            zip_path = settings.zip_path
+            
+            self.log_message(f"=== Migration auf Version {current_version} ===")
+            result = ManifestStore(wot_base_path).migrate(current_version, log=self.log_message, zip_folder=zip_path,
+                                                          index_cache=settings.index_cache)
+            
+            # Archive mit fehlenden, veränderten oder versionsabhängigen Dateien neu entpacken
+            reinstall_files = [zip_path / name for name in result.reinstall if (zip_path / name).exists()]
+            unavailable = [name for name in result.reinstall if not (zip_path / name).exists()]
+            error_count = 0
+            if reinstall_files:
+                self.log_message(f"Neu entpacken: {', '.join(zip_file.name for zip_file in reinstall_files)}")
+                session = self.create_session(settings)
+                self.active_session = session
+                _, error_count = session.install_all(reinstall_files, settings.jobs)
+            
+            self.log_message(f"=== Migration abgeschlossen ===")
+            self.log_message(f"Übernommen: {len(result.migrated)} Archiv(e), {result.files} Datei(en), "
+                             f"neu entpackt: {len(reinstall_files) - error_count}")
+            for name in unavailable:
+                self.log_message(f"Nicht gefunden (bitte neu installieren): {name}")
+            
+            if error_count == 0 and not unavailable:
+                self.ui_queue.put(lambda: messagebox.showinfo("Migration abgeschlossen", 
+                    f"{len(result.migrated) + len(reinstall_files)} Mods für Version {current_version} übernommen."))
+            else:
+                self.ui_queue.put(lambda: messagebox.showwarning("Migration abgeschlossen", 
+                    "Migration abgeschlossen, aber nicht alle Mods konnten übernommen werden.\n\nBitte prüfen Sie das Log für Details."))
+        
+        except Exception as e:
+            self.log_message(f"Kritischer Fehler: {e}")
+            self.ui_queue.put(lambda: messagebox.showerror("Migration Fehler", f"Kritischer Fehler bei der Migration:\n{e}"))
+    
+    def rollback_last_install(self):
+        """Mache die letzte transaktionale Installation rückgängig"""
+        if self.install_thread is not None and self.install_thread.is_alive():
+            messagebox.showwarning("Installation läuft", "Bitte warten Sie, bis die laufende Installation abgeschlossen ist.")
+            return
+        
+        transaction = InstallTransaction(Path(self.wot_path.get()))
+        state, _, _ = transaction.read_journal()
+        if state not in ("committing", "committed"):
+            messagebox.showinfo("Rückgängig", "Keine transaktionale Installation zum Rückgängigmachen gefunden.")
+            return
+        
+        if not messagebox.askyesno("Rückgängig", "Letzte transaktionale Installation rückgängig machen?"):
+            return
+        
+        try:
+            result = transaction.rollback()
+            self.log_message(f"Letzte Installation rückgängig gemacht: {result.restored} Dateien wiederhergestellt bzw. entfernt")
+            for target in result.skipped:
+                self.log_message(f"  Behalten (seitdem verändert): {target}")
+        except Exception as e:
+            self.log_message(f"Fehler beim Rückgängigmachen: {e}")
+            messagebox.showerror("Rückgängig", f"Fehler beim Rückgängigmachen:\n{e}")
+    
+    def show_uninstall_dialog(self):
+        """Zeige die installierten ZIP-Dateien (laut Manifest) zur Deinstallation an"""
+        store = ManifestStore(Path(self.wot_path.get()))
+        manifests = store.load_all()
+        if not manifests:
+            messagebox.showinfo("Deinstallieren", "Keine installierten ZIP-Dateien gefunden.")
+            return
+        
+        uninstall_window = tk.Toplevel(self.root)
+        uninstall_window.title("Mods deinstallieren")
+        uninstall_window.geometry("500x400")
+        
+        main_frame = ttk.Frame(uninstall_window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(main_frame, text="Installierte ZIP-Dateien:", font=("Arial", 10, "bold")).pack(anchor=tk.W, pady=(0, 10))
+        
+        archive_listbox = tk.Listbox(main_frame, selectmode=tk.EXTENDED)
+        archive_listbox.pack(fill=tk.BOTH, expand=True)
+        
+        archive_names = sorted(manifests, key=lambda name: manifests[name]["sequence"])
+        for name in archive_names:
+            archive_listbox.insert(tk.END, f"{name} ({len(manifests[name]['files'])} Dateien)")
+        
+        def uninstall_selected():
+            selected = [archive_names[index] for index in archive_listbox.curselection()]
+            if not selected:
+                messagebox.showwarning("Keine Auswahl", "Bitte wählen Sie mindestens eine ZIP-Datei aus.", parent=uninstall_window)
+                return
+            if not messagebox.askyesno("Deinstallieren", f"{len(selected)} Mod(s) deinstallieren?", parent=uninstall_window):
+                return
+            
+            for archive_name in selected:
+                try:
+                    result = store.uninstall(archive_name)
+                except Exception as e:
+                    self.log_message(f"✗ Fehler bei {archive_name}: {e}")
+                    continue
+                for file_path, reason in result.refused:
+                    self.log_message(f"  Nicht gelöscht: {file_path} ({reason})")
+                self.log_message(f"✓ {archive_name} deinstalliert: {len(result.removed)} Datei(en) gelöscht")
+            uninstall_window.destroy()
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Button(button_frame, text="Schließen", command=uninstall_window.destroy).pack(side=tk.RIGHT)
+        ttk.Button(button_frame, text="Deinstallieren", command=uninstall_selected).pack(side=tk.RIGHT, padx=(0, 10))
+        
+        uninstall_window.transient(self.root)
+        uninstall_window.grab_set()
+    
+    def show_cleanup_dialog(self):
+        """Dialog der alten Versionsordner: Anzahl zu behaltender Versionen und Probelauf wie --keep / --dry-run"""
+        if self.install_thread is not None and self.install_thread.is_alive():
+            messagebox.showwarning("Installation läuft", "Bitte warten Sie, bis die laufende Installation abgeschlossen ist.")
+            return
+        
+        wot_base_path = Path(self.wot_path.get())
+        cleanup_window = tk.Toplevel(self.root)
+        cleanup_window.title("Alte Versionsordner")
+        cleanup_window.geometry("500x400")
+        
+        main_frame = ttk.Frame(cleanup_window, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        keep = tk.IntVar(value=1)
+        dry_run = tk.BooleanVar(value=False)
+        stale = []
+        scan = {"generation": 0}  # Ergebnisse veralteter Durchläufe werden verworfen
+        
+        options_frame = ttk.Frame(main_frame)
+        options_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(options_frame, text="Neueste Versionen behalten:").pack(side=tk.LEFT)
+        keep_spinbox = ttk.Spinbox(options_frame, from_=1, to=99, width=4, textvariable=keep)
+        keep_spinbox.pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Checkbutton(options_frame, text="Nur anzeigen (Probelauf)", variable=dry_run).pack(side=tk.LEFT, padx=(20, 0))
+        
+        title = tk.StringVar(value="Ermittle Größe der Versionsordner...")
+        ttk.Label(main_frame, textvariable=title, font=("Arial", 10, "bold")).pack(anchor=tk.W, pady=(0, 10))
+        
+        folder_listbox = tk.Listbox(main_frame, selectmode=tk.EXTENDED, font=("Consolas", 9))
+        folder_listbox.pack(fill=tk.BOTH, expand=True)
+        
+        total = tk.StringVar()
+        
+        def get_keep():
+            try:
+                return max(1, int(keep.get()))
+            except (tk.TclError, ValueError):
+                return 1
+        
+        def start_scan():
+            scan["generation"] += 1
+            title.set("Ermittle Größe der Versionsordner...")
+            threading.Thread(target=self._scan_version_folders_thread,
+                             args=(wot_base_path, get_keep(), show_folders, scan["generation"]), daemon=True).start()
+        
+        def show_folders(folders, generation):
+            """Alte Versionsordner anzeigen (alle vorausgewählt, behaltene Versionen fehlen in der Liste)"""
+            if generation != scan["generation"] or not cleanup_window.winfo_exists():
+                return
+            stale[:] = [folder for folder in folders if not folder.keep]
+            kept = ", ".join(sorted({folder.version for folder in folders if folder.keep}))
+            if stale:
+                title.set(f"Alte Versionsordner (Version {kept} bleibt erhalten):")
+            else:
+                title.set("Keine alten Versionsordner gefunden.")
+            folder_listbox.delete(0, tk.END)
+            for folder in stale:
+                folder_listbox.insert(tk.END, f"{folder.path.parent.name + '/' + folder.version:<22} "
+                                              f"{format_size(folder.size):>10}  ({folder.files} Dateien)")
+            folder_listbox.selection_set(0, tk.END)
+            total.set(f"Zusammen: {format_size(sum(folder.size for folder in stale))}")
+        
+        def remove_selected():
+            selected = [stale[index] for index in folder_listbox.curselection()]
+            if not selected:
+                messagebox.showwarning("Keine Auswahl", "Bitte wählen Sie mindestens einen Ordner aus.", parent=cleanup_window)
+                return
+            size = format_size(sum(folder.size for folder in selected))
+            if dry_run.get():
+                # Probelauf: nur protokollieren, was gelöscht würde
+                for folder in selected:
+                    self.log_message(f"Probelauf: würde löschen {folder.path} ({format_size(folder.size)})")
+                self.log_message(f"Probelauf: {len(selected)} Ordner, würde freigeben: {size}")
+                return
+            if not messagebox.askyesno("Alte Versionen", f"{len(selected)} Ordner ({size}) löschen?", parent=cleanup_window):
+                return
+            cleanup_window.destroy()
+            
+            def remove_thread():
+                freed = remove_version_folders(selected, self.log_message)
+                self.log_message(f"Alte Versionsordner gelöscht, freigegeben: {format_size(freed)}")
+            threading.Thread(target=remove_thread, daemon=True).start()
+        
+        keep_spinbox.configure(command=start_scan)
+        keep_spinbox.bind("<Return>", lambda event: start_scan())
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Label(button_frame, textvariable=total).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Schließen", command=cleanup_window.destroy).pack(side=tk.RIGHT)
+        ttk.Button(button_frame, text="Löschen", command=remove_selected).pack(side=tk.RIGHT, padx=(0, 10))
+        
+        cleanup_window.transient(self.root)
+        cleanup_window.grab_set()
+        start_scan()
+    
+    def _scan_version_folders_thread(self, wot_base_path, keep, show_folders, generation):
+        """Versionsordner parallel vermessen (separater Thread)"""
+        try:
+            folders = find_version_folders(wot_base_path, keep)
+        except Exception as e:
+            self.log_message(f"Fehler beim Ermitteln der Versionsordner: {e}")
+            return
+        self.ui_queue.put(lambda: show_folders(folders, generation))
     
     def preview_selected_mods(self):
         """Zeige Vorschau für ausgewählte Mods"""
@@ -380,44 +1048,102 @@ class WoTModInstaller:
             messagebox.showerror("Version Fehler", "Keine gültige World of Tanks Version erkannt. Bitte überprüfen Sie den Installationspfad.")
             return
         
-        # Sammle Preview-Daten
-        preview_data = []
-        current_version = self.current_version.get()
-        wot_base_path = Path(self.wot_path.get())
+        # Vergleich mit dem WoT-Ordner läuft im Hintergrund, der Dialog zeigt die Ergebnisse sofort an
         zip_path = Path(self.zip_folder.get())
+        zip_files = [zip_path / self.file_listbox.get(index) for index in selected_indices]
+        self.show_preview_dialog(zip_files)
+    
+    def verify_selected_mods(self):
+        """Prüfe die installierten Dateien der ausgewählten (sonst aller) ZIP-Dateien"""
+        if not self.current_version.get() or "Nicht gefunden" in self.current_version.get() or "Fehler" in self.current_version.get():
+            messagebox.showerror("Version Fehler", "Keine gültige World of Tanks Version erkannt. Bitte überprüfen Sie den Installationspfad.")
+            return
+        
+        if self.install_thread is not None and self.install_thread.is_alive():
+            messagebox.showwarning("Installation läuft", "Bitte warten Sie, bis die laufende Installation abgeschlossen ist.")
+            return
         
-        for index in selected_indices:
-            zip_filename = self.file_listbox.get(index)
-            zip_file_path = zip_path / zip_filename
+        selected_indices = self.file_listbox.curselection() or range(self.file_listbox.size())
+        zip_path = Path(self.zip_folder.get())
+        zip_files = [zip_path / self.file_listbox.get(index) for index in selected_indices]
+        if not zip_files:
+            messagebox.showwarning("Keine ZIP-Dateien", "Im ZIP-Ordner wurden keine ZIP-Dateien gefunden.")
+            return
+        
+        self.install_thread = threading.Thread(target=self._verify_mods_thread,
+                                               args=(self.get_install_settings(), zip_files), daemon=True)
+        self.install_thread.start()
+    
+    def _verify_mods_thread(self, settings, zip_files):
+        """Prüfung im separaten Thread (CRC32 parallel über alle CPU-Kerne)"""
+        try:
+            self.log_message(f"=== Prüfung von {len(zip_files)} ZIP-Datei(en) ===")
+            index_cache = settings.index_cache
+            result = verify_installation(zip_files, settings.wot_base_path, settings.current_version, index_cache, 0,
+                                         self.buffer_size)
+            index_cache.save()
             
-            try:
-                file_data = {"name": zip_filename, "files": []}
-                
-                with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                    for member in zip_ref.namelist():
-                        if member.endswith('/') or member.endswith('\\'):
-                            continue  # Überspringe Ordner
-                            
-                        # Alle Dateien werden kopiert, aber "version" wird durch aktuelle Spielversion ersetzt
-                        if "/version/" in member or "\\version\\" in member:
-                            # Ersetze "version" durch aktuelle Spielversion
-                            target_path = member.replace("/version/", f"/{current_version}/").replace("\\version\\", f"\\{current_version}\\")
-                            file_data["files"].append({"source": member, "target": target_path})
-                        else:
-                            # Normale Datei - wird direkt kopiert (res/, mods/configs/, res_mods/, etc.)
-                            file_data["files"].append({"source": member, "target": member})
-                
-                preview_data.append(file_data)
-                
-            except Exception as e:
-                file_data = {"name": zip_filename, "error": str(e), "files": []}
-                preview_data.append(file_data)
-        
-        # Zeige Preview-Dialog
-        self.show_preview_dialog(preview_data)
-    
-    def show_preview_dialog(self, preview_data):
-        """Zeige Preview-Dialog mit den Installationsinformationen"""
+            for label, items in (("Fehlt", result.missing), ("Geändert", result.modified)):
+                for target_path, archive in items[:self.VERIFY_LOG_LIMIT]:
+                    self.log_message(f"{label}: {target_path} ({archive})")
+                if len(items) > self.VERIFY_LOG_LIMIT:
+                    self.log_message(f"{label}: ... und {len(items) - self.VERIFY_LOG_LIMIT} weitere")
+            for target_path, archive, error in result.errors:
+                self.log_message(f"Fehler: {target_path or archive}: {error}")
+            
+            summary = (f"OK: {len(result.ok)}\nFehlend: {len(result.missing)}\n"
+                       f"Geändert: {len(result.modified)}\nFehler: {len(result.errors)}")
+            self.log_message("=== Prüfung abgeschlossen === " + summary.replace("\n", ", "))
+            
+            if result.missing or result.modified or result.errors:
+                self.ui_queue.put(lambda: messagebox.showwarning("Prüfung abgeschlossen",
+                    f"Nicht alle Dateien entsprechen den ZIP-Dateien.\n\n{summary}\n\nBitte prüfen Sie das Log für Details."))
+            else:
+                self.ui_queue.put(lambda: messagebox.showinfo("Prüfung abgeschlossen",
+                    f"Alle {len(result.ok)} Dateien sind unverändert installiert."))
+        
+        except Exception as e:
+            self.log_message(f"Kritischer Fehler: {e}")
+            self.ui_queue.put(lambda: messagebox.showerror("Prüfung Fehler", f"Kritischer Fehler bei der Prüfung:\n{e}"))
+    
+    def iter_preview_lines(self, settings, zip_files, state, summary, cancelled):
+        """Erzeuge die Zeilen der Vorschau nacheinander: Konflikte, dann neue und geänderte Dateien"""
+        current_version = settings.current_version
+        index_cache = settings.index_cache
+        
+        conflicts = find_conflicts(zip_files, current_version, index_cache)
+        state["conflicts"] = len(conflicts)
+        yield from iter_conflict_report(conflicts)
+        
+        archive = None
+        entries = iter_install_diff(zip_files, settings.wot_base_path, current_version, index_cache, self.buffer_size)
+        for entry in entries:
+            if cancelled.is_set():
+                return
+            summary.add(entry)
+            if entry.archive != archive:
+                archive = entry.archive
+                yield f"\n{'=' * 60}\nZIP-Datei: {archive}\n{'=' * 60}\n"
+            if entry.status == DIFF_ERROR:
+                yield f"FEHLER: {entry.target_path or ''} {entry.error}\n"
+            elif entry.status != DIFF_IDENTICAL:
+                # Identische Dateien werden nur gezählt
+                label = "Neu" if entry.status == DIFF_NEW else "Geändert"
+                yield f"  {label:<9} {entry.target_path}  ({format_size(entry.file_size)})\n"
+                if str(entry.target_path) != entry.member:
+                    yield f"            ← {entry.member}\n"
+        index_cache.save()
+    
+    def _preview_thread(self, spool, settings, zip_files, state, summary, cancelled):
+        """Vorschau im separaten Thread: vergleicht und zählt bis zum Ende, die Zeilen landen in der Spool-Datei"""
+        try:
+            for line in self.iter_preview_lines(settings, zip_files, state, summary, cancelled):
+                spool.write(line)
+        except Exception as e:
+            spool.write(f"\nFEHLER: {e}\n")
+    
+    def show_preview_dialog(self, zip_files):
+        """Zeige Preview-Dialog, der sich füllt, während die Dateien verglichen werden"""
         # Erstelle neues Fenster
         preview_window = tk.Toplevel(self.root)
         preview_window.title("Installations-Vorschau")
@@ -428,9 +1154,10 @@ class WoTModInstaller:
         main_frame = ttk.Frame(preview_window, padding="10")
         main_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Info-Label
+        # Info-Label mit laufender Zusammenfassung
+        info_text = tk.StringVar(value=f"Vorschau für {len(zip_files)} ausgewählte ZIP-Datei(en): wird verglichen ...")
         info_label = ttk.Label(main_frame, 
-            text=f"Vorschau für {len(preview_data)} ausgewählte ZIP-Datei(en):",
+            textvariable=info_text,
             font=("Arial", 10, "bold"))
         info_label.pack(anchor=tk.W, pady=(0, 10))
         
@@ -441,38 +1168,71 @@ class WoTModInstaller:
         preview_text = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, font=("Consolas", 9))
         preview_text.pack(fill=tk.BOTH, expand=True)
         
-        # Fülle Textbereich mit Preview-Daten
-        for file_data in preview_data:
-            preview_text.insert(tk.END, f"\n{'=' * 60}\n")
-            preview_text.insert(tk.END, f"ZIP-Datei: {file_data['name']}\n")
-            preview_text.insert(tk.END, f"{'=' * 60}\n")
+        # Der Vergleich läuft unabhängig vom Scrollen weiter, nur die angezeigten Zeilen werden seitenweise gelesen
+        spool = LineSpool()
+        # budget: Zeilen, die das Textfeld noch aufnimmt, polling: Aktualisierung ist bereits geplant
+        state = {"conflicts": 0, "budget": self.PREVIEW_PAGE_SIZE, "polling": False}
+        summary = DiffSummary()
+        cancelled = threading.Event()
+        worker = threading.Thread(target=self._preview_thread,
+                                  args=(spool, self.get_install_settings(), zip_files, state, summary, cancelled),
+                                  daemon=True)
+        worker.start()
+        
+        def load_lines():
+            # Nur so viele Zeilen wie angefordert, der Rest bleibt in der Spool-Datei
+            page = spool.read_lines(state["budget"])
+            if page:
+                state["budget"] -= len(page)
+                preview_text.insert(tk.END, "".join(page))
+        
+        def show_lines():
+            state["polling"] = False
+            # Vor dem Leeren prüfen, damit nach Ende des Threads keine Zeile verloren geht
+            running = worker.is_alive()
+            if cancelled.is_set() or not preview_text.winfo_exists():
+                return
+            load_lines()
             
-            if "error" in file_data:
-                preview_text.insert(tk.END, f"FEHLER: {file_data['error']}\n")
+            status = summary.format()
+            if state["conflicts"]:
+                status += f"  ⚠ {state['conflicts']} Konflikt(e), das letzte Archiv gewinnt"
+            more = "  (weitere Dateien beim Scrollen)" if spool.pending() else ""
+            if running:
+                info_text.set(f"Vorschau für {len(zip_files)} ZIP-Datei(en), wird verglichen ... {status}{more}")
+                state["polling"] = True
+                self.root.after(self.UI_POLL_INTERVAL_MS, show_lines)
             else:
-                if len(file_data['files']) == 0:
-                    preview_text.insert(tk.END, "Keine installierbaren Dateien gefunden.\n")
-                else:
-                    preview_text.insert(tk.END, f"Zu installierende Dateien ({len(file_data['files'])}):\n\n")
-                    
-                    for file_info in file_data['files']:
-                        if file_info['source'] != file_info['target']:
-                            preview_text.insert(tk.END, f"  {file_info['source']}\n")
-                            preview_text.insert(tk.END, f"  → {file_info['target']}\n\n")
-                        else:
-                            preview_text.insert(tk.END, f"  {file_info['target']}\n\n")
-            
-            preview_text.insert(tk.END, "\n")
+                info_text.set(f"Vorschau für {len(zip_files)} ZIP-Datei(en): {status}{more}")
+        
+        def on_scroll(first, last):
+            preview_text.vbar.set(first, last)
+            # Nahe am Ende: nächste Seite freigeben
+            if state["budget"] == 0 and float(last) > 0.9:
+                state["budget"] = self.PREVIEW_PAGE_SIZE
+                if not state["polling"]:
+                    state["polling"] = True
+                    preview_window.after_idle(show_lines)
+        
+        preview_text.configure(yscrollcommand=on_scroll)
+        
+        def close():
+            cancelled.set()
+            spool.close()
+            preview_window.destroy()
+        
+        preview_window.protocol("WM_DELETE_WINDOW", close)
+        show_lines()
         
         # Buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=(10, 0))
         
         ttk.Button(button_frame, text="Schließen", 
-                  command=preview_window.destroy).pack(side=tk.RIGHT)
+                  command=close).pack(side=tk.RIGHT)
         
         ttk.Button(button_frame, text="Jetzt installieren", 
-                  command=lambda: [preview_window.destroy(), self.install_selected_mods()]).pack(side=tk.RIGHT, padx=(0, 10))
+                  command=lambda: [close(), self.install_selected_mods()]).pack(side=tk.RIGHT, padx=(0, 10))
         
         # Zentriere das Fenster
         preview_window.transient(self.root)
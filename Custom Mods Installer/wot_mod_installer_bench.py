@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+"""
+World of Tanks Mod Installer - Benchmarks
+Misst die Geschwindigkeit der Installationslogik mit synthetischen Daten.
+Ergebnisse werden als JSON ausgegeben und optional mit einer gespeicherten Baseline verglichen.
+"""
+
+import io
+import os
+import sys
+import time
+import json
+import queue
+import random
+import shutil
+import zipfile
+import builtins
+import pathlib
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from wot_mod_installer_core import (
+    PathRewriter, InstallSession, ArchiveIndexCache, find_conflicts, read_archive_entries, scan_zip_folder,
+    measure_directories,
+)
+from wot_mod_installer_cli import create_session, preview_mod_installation
+
+
+# Spielversion des synthetischen WoT-Ordners
+BENCH_VERSION = "1.2.3.4"
+
+# Standard-Schwellwerte für den Vergleich mit der Baseline (relative Abweichung)
+DEFAULT_THRESHOLDS = {"speed": 0.25, "memory": 0.25, "syscalls": 0.10}
+
+# Kennzahlen, bei denen größere Werte besser sind
+HIGHER_IS_BETTER = ("files_per_second", "mb_per_second", "entries_per_second", "reduction", "speedup")
+
+# Zeiten, die mit dem Schwellwert für Geschwindigkeit verglichen werden (kleinere Werte sind besser)
+LOWER_IS_BETTER = ("window_seconds", "list_seconds", "cached_list_seconds", "scandir_seconds")
+
+
+def reset_peak_rss():
+    """Setze den Spitzenwert des Arbeitsspeichers zurück (nur unter Linux möglich), True bei Erfolg"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb():
+    """Spitzenwert des Arbeitsspeichers (RSS) des Prozesses in KB, None falls nicht ermittelbar"""
+    if os.name == "nt":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        get_info = ctypes.WinDLL("psapi").GetProcessMemoryInfo
+        get_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+        if not get_info(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return None
+        return round(counters.PeakWorkingSetSize / 1024)
+
+    # Linux: VmHWM folgt reset_peak_rss(), ru_maxrss nicht
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS meldet Bytes, Linux KB
+    return round(peak / 1024) if sys.platform == "darwin" else peak
+
+
+class SyscallCounter:
+    """Zählt Dateisystem-Aufrufe (auch die von pathlib) während eines Benchmarks"""
+
+    # Zählername -> Funktion im os-Modul
+    NAMES = {"mkdir": "mkdir", "stat": "stat", "os_open": "open", "replace": "replace", "link": "link",
+             "remove": "remove", "scandir": "scandir"}
+
+    def __init__(self):
+        self.counts = dict.fromkeys(list(self.NAMES) + ["open"], 0)
+        self.patched = []
+
+    def wrap(self, name, func):
+        def counted(*args, **kwargs):
+            self.counts[name] += 1
+            return func(*args, **kwargs)
+        return counted
+
+    def __enter__(self):
+        try:
+            self.patch()
+        except BaseException:
+            # Bereits ersetzte Funktionen wiederherstellen, __exit__ wird in diesem Fall nicht aufgerufen
+            self.restore()
+            raise
+        return self
+
+    def patch(self):
+        # Python < 3.11 ruft os-Funktionen über pathlib._normal_accessor auf
+        targets = [os]
+        accessor = getattr(pathlib, "_normal_accessor", None)
+        if accessor is not None:
+            targets.append(accessor)
+        for target in targets:
+            for name, attribute in self.NAMES.items():
+                original = getattr(target, attribute, None)
+                if original is None:
+                    continue
+                self.patched.append((target, attribute, original))
+                setattr(target, attribute, self.wrap(name, original))
+
+        # open() der Standardbibliothek, zipfile verwendet io.open (mit Opener zusätzlich als os_open gezählt)
+        for target in (builtins, io):
+            self.patched.append((target, "open", target.open))
+            target.open = self.wrap("open", target.open)
+
+    def restore(self):
+        """Alle ersetzten Funktionen zurücksetzen (in umgekehrter Reihenfolge)"""
+        while self.patched:
+            target, name, original = self.patched.pop()
+            setattr(target, name, original)
+
+    def __exit__(self, *exc_info):
+        self.restore()
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+def generate_member_names(entry_count):
+    """Erzeuge eine synthetische namelist() mit typischen Mod-Pfaden"""
+    shapes = [
+        "mods/version/com.example.mod{i}.wotmod",
+        "mods/1.0.0.0/com.example/sub{d}/file{i}.py",
+        "mods/configs/example/config{i}.json",
+        "res_mods/configs/xvm/default/file{i}.xc",
+        "res/audioww/sound{i}.bnk",
+        "mods\\version\\legacy{i}.wotmod",
+        "mods/configs/example/dir{d}/",
+    ]
+    return [shapes[i % len(shapes)].format(i=i, d=i % 100) for i in range(entry_count)]
+
+
+def bench_rewrite(entry_count=100000, repeat=5):
+    """Durchsatz der Pfadersetzung für eine komplette namelist()"""
+    names = generate_member_names(entry_count)
+    rewriter = PathRewriter("1.2.3.4")
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rewriter.map_targets(names)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return {
+        "benchmark": "rewrite",
+        "entries": entry_count,
+        "seconds": round(best, 4),
+        "entries_per_second": round(entry_count / best),
+    }
+
+
+def bench_disk_usage(file_count=20000, dir_count=2000, folder_count=4, repeat=3):
+    """Größe alter Versionsordner: paralleler os.scandir-Durchlauf gegen rekursives Path.rglob mit stat"""
+    temp_dir = Path(tempfile.mkdtemp(prefix="wot_bench_"))
+    try:
+        folders = []
+        for folder_index in range(folder_count):
+            folder = temp_dir / "res_mods" / f"1.{folder_index}.0.0"
+            for index in range(file_count // folder_count):
+                file_path = folder / f"d{index % (dir_count // folder_count)}" / "configs" / f"f{index}.xml"
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                file_path.write_bytes(b"x" * (index % 512))
+            folders.append(folder)
+
+        def path_walk():
+            return {folder: sum(path.stat().st_size for path in folder.rglob("*") if path.is_file())
+                    for folder in folders}
+
+        def scandir_walk():
+            return measure_directories(folders)
+
+        timings = {}
+        for name, run in (("path_seconds", path_walk), ("scandir_seconds", scandir_walk)):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = round(best, 4)
+
+        with SyscallCounter() as path_calls:
+            path_walk()
+        with SyscallCounter() as scandir_calls:
+            scandir_walk()
+
+        return {
+            "benchmark": "disk_usage",
+            "files": file_count,
+            "directories": dir_count,
+            **timings,
+            "speedup": round(timings["path_seconds"] / max(timings["scandir_seconds"], 1e-9), 1),
+            "path_calls": path_calls.counts,
+            "syscalls": scandir_calls.counts,
+        }
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def create_many_small_files_archive(zip_file_path, file_count, dir_count):
+    """Erzeuge eine Mod-ZIP mit vielen kleinen Dateien in wenigen Ordnern"""
+    with zipfile.ZipFile(zip_file_path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for i in range(file_count):
+            zip_ref.writestr(f"res_mods/configs/xvm/dir{i % dir_count}/file{i}.xc", f"config {i}")
+
+
+def bench_directory_planning(file_count=5000, dir_count=20):
+    """Vergleiche mkdir/stat-Aufrufe: mkdir pro Datei gegen einmalige Ordnerplanung"""
+    temp_dir = Path(tempfile.mkdtemp(prefix="wot_bench_"))
+    try:
+        zip_file_path = temp_dir / "many_small_files.zip"
+        create_many_small_files_archive(zip_file_path, file_count, dir_count)
+        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+            names = zip_ref.namelist()
+
+        # Bisheriges Verhalten: parent.mkdir(parents=True, exist_ok=True) für jede Datei
+        per_file_base = temp_dir / "per_file"
+        with SyscallCounter() as per_file:
+            for name in names:
+                (per_file_base / name).parent.mkdir(parents=True, exist_ok=True)
+
+        # Planung: eindeutige Zielordner einmalig anlegen
+        session = InstallSession(temp_dir / "planned", "1.2.3.4", log=lambda message: None)
+        session.wot_base_path.mkdir()
+        with SyscallCounter() as planned:
+            _, parent_dirs = session.plan_install([zip_file_path])
+            session.create_directories(parent_dirs)
+
+        return {
+            "benchmark": "directory_planning",
+            "files": file_count,
+            "directories": dir_count,
+            "per_file_calls": per_file.counts,
+            "planned_calls": planned.counts,
+            "reduction": round(per_file.total / max(planned.total, 1), 1),
+        }
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def write_random_member(zip_ref, name, size, compress_type, chunk_size=1024 * 1024):
+    """Schreibe einen großen ZIP-Eintrag blockweise (nicht komprimierbare Daten)"""
+    info = zipfile.ZipInfo(name)
+    info.compress_type = compress_type
+    with zip_ref.open(info, 'w', force_zip64=size >= 2 ** 31) as target:
+        written = 0
+        while written < size:
+            chunk = os.urandom(min(chunk_size, size - written))
+            target.write(chunk)
+            written += len(chunk)
+
+
+def generate_mod_archives(zip_folder, small_files=5000, large_files=3, large_size=32 * 1024 * 1024, seed=1):
+    """Erzeuge synthetische Mod-ZIPs mit typischen Formen, gibt die Archivpfade zurück"""
+    zip_folder = Path(zip_folder)
+    zip_folder.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+
+    # Tausende kleiner Konfigurationsdateien (XVM-artig, komprimiert, wie üblich nach Ordnern sortiert)
+    configs_zip = zip_folder / "bench_configs.zip"
+    with zipfile.ZipFile(configs_zip, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for i in sorted(range(small_files), key=lambda i: (i % 4, i % 50)):
+            extension = "xml" if i % 3 == 0 else "xc"
+            text = "".join(f"<entry id='{i}' value='{rng.random():.6f}'/>\n" for _ in range(rng.randint(2, 40)))
+            zip_ref.writestr(f"res_mods/configs/xvm/skin{i % 4}/dir{i % 50}/file{i}.{extension}", text)
+
+    # Wenige große .wotmod Pakete (ungepackt gespeichert, wie bei den meisten Mods)
+    packages_zip = zip_folder / "bench_packages.zip"
+    with zipfile.ZipFile(packages_zip, 'w', zipfile.ZIP_STORED) as zip_ref:
+        for i in range(large_files):
+            write_random_member(zip_ref, f"mods/version/com.example.package{i}.wotmod", large_size, zipfile.ZIP_STORED)
+
+    # Gemischtes Archiv: Platzhalter, fester Versionsordner, komprimierte und gespeicherte Einträge, Ordner
+    mixed_zip = zip_folder / "bench_mixed.zip"
+    with zipfile.ZipFile(mixed_zip, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr("mods/version/", "")
+        zip_ref.writestr("mods/version/com.example.mixed.wotmod", b"wotmod-data " * (256 * 1024))
+        zip_ref.writestr("mods/configs/com.example/", "")
+        for i in range(200):
+            zip_ref.writestr(f"mods/configs/com.example/settings{i}.json", json.dumps({"id": i, "enabled": True}))
+            zip_ref.writestr(f"mods/1.0.0.0/com.example/legacy/module{i}.py", f"VALUE = {i}\n" * 20)
+        for i in range(20):
+            zip_ref.writestr(f"res/audioww/sound{i}.bnk", os.urandom(64 * 1024), compress_type=zipfile.ZIP_STORED)
+        zip_ref.writestr("mods\\version\\com.example.backslash.wotmod", b"x" * 4096)
+
+    return [configs_zip, packages_zip, mixed_zip]
+
+
+def archive_totals(zip_files):
+    """Anzahl Dateien und unkomprimierte Bytes aller Archive"""
+    files, total_bytes = 0, 0
+    for zip_file_path in zip_files:
+        for entry in read_archive_entries(zip_file_path):
+            if not entry.filename.endswith(("/", "\\")):
+                files += 1
+                total_bytes += entry.file_size
+    return files, total_bytes
+
+
+def create_game_folder(base_path):
+    """Leerer WoT-Ordner mit aktuellem Versionsordner"""
+    game_path = Path(tempfile.mkdtemp(prefix="game_", dir=base_path))
+    (game_path / "mods" / BENCH_VERSION).mkdir(parents=True)
+    return game_path
+
+
+def measure(name, run, files, total_bytes, repeat=3, prepare=None):
+    """Bester Lauf aus mehreren Wiederholungen, danach ein Lauf mit Speicher- und Syscall-Messung"""
+    # Spitzen-RSS der Läufe ohne tracemalloc (ohne Zurücksetzen: Spitzenwert des Prozesses bis hierher)
+    rss_reset = reset_peak_rss()
+    best = None
+    for _ in range(repeat):
+        argument = prepare() if prepare else None
+        start = time.perf_counter()
+        run(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    peak_rss = peak_rss_kb()
+
+    # Instrumentierter Lauf getrennt, damit die Messung die Zeiten nicht verfälscht
+    argument = prepare() if prepare else None
+    tracemalloc.start()
+    try:
+        with SyscallCounter() as syscalls:
+            run(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "benchmark": name,
+        "files": files,
+        "bytes": total_bytes,
+        "seconds": round(best, 4),
+        "files_per_second": round(files / best),
+        "mb_per_second": round(total_bytes / best / (1024 * 1024), 1),
+        "peak_memory_kb": round(peak / 1024),
+        "peak_rss_kb": peak_rss,
+        "peak_rss_reset": rss_reset,
+        "syscalls": syscalls.counts,
+    }
+
+
+def bench_scenarios(small_files=5000, large_files=3, large_size_mb=32, repeat=3, jobs=1, pipeline=True):
+    """Installation (CLI und GUI-Worker), Vorschau und Auflistung gegen einen temporären WoT-Ordner"""
+    temp_dir = Path(tempfile.mkdtemp(prefix="wot_bench_"))
+    try:
+        zip_folder = temp_dir / "zips"
+        zip_files = generate_mod_archives(zip_folder, small_files, large_files, large_size_mb * 1024 * 1024)
+        files, total_bytes = archive_totals(zip_files)
+
+        def prepare_game_folder():
+            # Jeder Lauf in einen frischen WoT-Ordner (alte Läufe werden vorher entfernt)
+            for old_game in temp_dir.glob("game_*"):
+                shutil.rmtree(old_game, ignore_errors=True)
+            return create_game_folder(temp_dir)
+
+        def run_cli_install(game_path):
+            # Wie main() der Kommandozeile: eine Session für alle Archive, jede Datei wird ausgegeben (verworfen)
+            with contextlib.redirect_stdout(io.StringIO()):
+                session = create_session(game_path, BENCH_VERSION, index_cache=ArchiveIndexCache(zip_folder))
+                session.install_all(zip_files)
+
+        def run_gui_worker(game_path):
+            # Wie _install_mods_thread(): Log über eine Warteschlange, Index-Cache, parallele Jobs
+            log_queue = queue.Queue()
+            session = InstallSession(game_path, BENCH_VERSION, log=log_queue.put,
+                                     index_cache=ArchiveIndexCache(zip_folder), pipeline=pipeline)
+            session.install_all(zip_files, jobs)
+
+        def run_preview(game_path):
+            # Ohne Argument gegen einen leeren Ordner (alles neu), sonst gegen eine fertige Installation
+            with contextlib.redirect_stdout(io.StringIO()):
+                preview_mod_installation(zip_files, game_path or temp_dir, BENCH_VERSION)
+                find_conflicts(zip_files, BENCH_VERSION)
+
+        installed = []
+
+        def prepare_installed_game():
+            # Einmal installieren, alle Läufe vergleichen gegen denselben Ordner (stat und CRC32)
+            if not installed:
+                game_path = create_game_folder(temp_dir)
+                InstallSession(game_path, BENCH_VERSION, log=lambda message: None).install_all(zip_files)
+                installed.append(game_path)
+            return installed[0]
+
+        def run_listing(argument):
+            index_cache = ArchiveIndexCache(zip_folder)
+            for zip_file_path in scan_zip_folder(zip_folder):
+                read_archive_entries(zip_file_path, index_cache)
+            index_cache.save()
+
+        return [
+            measure("cli_install", run_cli_install, files, total_bytes, repeat, prepare_game_folder),
+            measure("gui_worker", run_gui_worker, files, total_bytes, repeat, prepare_game_folder),
+            measure("preview", run_preview, files, total_bytes, repeat),
+            measure("preview_installed", run_preview, files, total_bytes, repeat, prepare_installed_game),
+            measure("listing", run_listing, files, total_bytes, repeat),
+        ]
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def bench_gui_startup(zip_count=2000, repeat=3, timeout=60.0):
+    """Start der GUI: Zeit bis das Fenster bedienbar ist und bis Version und Dateiliste aktuell sind"""
+    # Erst hier importieren, die übrigen Benchmarks laufen auch ohne Tk
+    import tkinter as tk
+    from wot_mod_installer import WoTModInstaller
+
+    temp_dir = Path(tempfile.mkdtemp(prefix="wot_bench_"))
+    old_cwd = os.getcwd()
+    try:
+        game_path = create_game_folder(temp_dir)
+        zip_folder = game_path / "Custom_Mods"
+        zip_folder.mkdir()
+        for index in range(zip_count):
+            with zipfile.ZipFile(zip_folder / f"mod_{index:05d}.zip", 'w') as zip_ref:
+                zip_ref.writestr(f"mods/version/mod_{index:05d}.wotmod", b"x")
+
+        def start_gui():
+            start = time.perf_counter()
+            app = WoTModInstaller()
+            try:
+                app.root.update()
+                window_seconds = time.perf_counter() - start
+
+                deadline = start + timeout
+                while (app.file_listbox.size() != zip_count or app.current_version.get() != BENCH_VERSION
+                       or app.zip_folder.get() != str(zip_folder)):
+                    if time.perf_counter() > deadline:
+                        raise TimeoutError("Dateiliste wurde nicht rechtzeitig gefüllt")
+                    app.root.update()
+                    time.sleep(0.001)
+                return window_seconds, time.perf_counter() - start
+            finally:
+                app.root.destroy()
+
+        # Die GUI liest und schreibt installer_config.json im aktuellen Verzeichnis
+        os.chdir(temp_dir)
+        config_path = temp_dir / "installer_config.json"
+        cold_runs, cached_runs = [], []
+        try:
+            for _ in range(repeat):
+                # Ohne gemerkte Version und Liste, danach mit den vom ersten Start gespeicherten Werten
+                with open(config_path, 'w', encoding='utf-8') as f:
+                    json.dump({"wot_path": str(game_path)}, f)
+                cold_runs.append(start_gui())
+                cached_runs.append(start_gui())
+        except tk.TclError as e:
+            return {"benchmark": "gui_startup", "skipped": f"Tk nicht verfügbar: {e}"}
+
+        return {
+            "benchmark": "gui_startup",
+            "files": zip_count,
+            "window_seconds": round(min(window for window, _ in cold_runs), 4),
+            "list_seconds": round(min(listed for _, listed in cold_runs), 4),
+            "cached_list_seconds": round(min(listed for _, listed in cached_runs), 4),
+        }
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def compare_with_baseline(results, baseline):
+    """Vergleiche Ergebnisse mit der Baseline, gibt eine Liste der Verschlechterungen zurück"""
+    thresholds = dict(DEFAULT_THRESHOLDS, **baseline.get("thresholds", {}))
+    baseline_results = {result["benchmark"]: result for result in baseline.get("results", [])}
+    regressions = []
+
+    def check(name, metric, current, reference, threshold, higher_is_better):
+        if not reference:
+            return
+        change = (current - reference) / reference
+        if (higher_is_better and change < -threshold) or (not higher_is_better and change > threshold):
+            regressions.append({
+                "benchmark": name, "metric": metric, "baseline": reference, "current": current,
+                "change": round(change, 3), "threshold": threshold,
+            })
+
+    for result in results:
+        reference = baseline_results.get(result["benchmark"])
+        if reference is None:
+            continue
+        name = result["benchmark"]
+        for metric in HIGHER_IS_BETTER:
+            if metric in result and metric in reference:
+                check(name, metric, result[metric], reference[metric], thresholds["speed"], True)
+        for metric in LOWER_IS_BETTER:
+            if metric in result and metric in reference:
+                check(name, metric, result[metric], reference[metric], thresholds["speed"], False)
+        if "peak_memory_kb" in result and "peak_memory_kb" in reference:
+            check(name, "peak_memory_kb", result["peak_memory_kb"], reference["peak_memory_kb"],
+                  thresholds["memory"], False)
+        # RSS nur vergleichbar, wenn beide Messungen den Spitzenwert gleich behandeln (zurückgesetzt oder nicht)
+        if (result.get("peak_rss_kb") and reference.get("peak_rss_kb")
+                and result.get("peak_rss_reset") == reference.get("peak_rss_reset")):
+            check(name, "peak_rss_kb", result["peak_rss_kb"], reference["peak_rss_kb"], thresholds["memory"], False)
+        for syscall, count in result.get("syscalls", {}).items():
+            reference_count = reference.get("syscalls", {}).get(syscall)
+            if reference_count is not None:
+                check(name, f"syscalls.{syscall}", count, reference_count, thresholds["syscalls"], False)
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="World of Tanks Mod Installer - Benchmarks")
+    parser.add_argument("--entries", type=int, default=100000,
+                        help="Anzahl synthetischer ZIP-Einträge (Standard: 100000)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Anzahl Wiederholungen, der beste Lauf zählt (Standard: 5)")
+    parser.add_argument("--files", type=int, default=5000,
+                        help="Anzahl kleiner Dateien für den Ordner-Benchmark (Standard: 5000)")
+    parser.add_argument("--small-files", type=int, default=5000,
+                        help="Anzahl kleiner Konfigurationsdateien im synthetischen Mod-Archiv (Standard: 5000)")
+    parser.add_argument("--large-files", type=int, default=3,
+                        help="Anzahl großer .wotmod Pakete (Standard: 3)")
+    parser.add_argument("--large-size", type=int, default=32,
+                        help="Größe eines .wotmod Pakets in MB (Standard: 32)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Parallele Installationen im GUI-Worker-Benchmark (Standard: 1)")
+    parser.add_argument("--no-pipeline", action="store_true",
+                        help="GUI-Worker-Benchmark ohne überlappendes Entpacken und Schreiben")
+    parser.add_argument("--startup-zips", type=int, default=2000,
+                        help="Anzahl ZIP-Dateien im Ordner für den GUI-Start-Benchmark (Standard: 2000)")
+    parser.add_argument("--only", nargs="+",
+                        choices=["rewrite", "directory_planning", "scenarios", "gui_startup", "disk_usage"],
+                        help="Nur die angegebenen Benchmarks ausführen")
+    parser.add_argument("--baseline",
+                        help="Mit gespeicherter Baseline (JSON) vergleichen, Rückgabewert 1 bei Verschlechterung")
+    parser.add_argument("--save-baseline",
+                        help="Ergebnisse als neue Baseline (mit Standard-Schwellwerten) speichern")
+
+    args = parser.parse_args()
+    selected = set(args.only or ["rewrite", "directory_planning", "scenarios", "gui_startup", "disk_usage"])
+
+    results = []
+    if "rewrite" in selected:
+        results.append(bench_rewrite(args.entries, args.repeat))
+    if "directory_planning" in selected:
+        results.append(bench_directory_planning(args.files))
+    if "scenarios" in selected:
+        results.extend(bench_scenarios(args.small_files, args.large_files, args.large_size,
+                                       min(args.repeat, 3), args.jobs, not args.no_pipeline))
+    if "gui_startup" in selected:
+        results.append(bench_gui_startup(args.startup_zips, min(args.repeat, 3)))
+    if "disk_usage" in selected:
+        results.append(bench_disk_usage(args.files * 4, repeat=min(args.repeat, 3)))
+
+    output = {"python": sys.version.split()[0], "platform": sys.platform, "cpus": os.cpu_count(), "results": results}
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            output["regressions"] = compare_with_baseline(results, json.load(f))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({"python": output["python"], "platform": output["platform"], "cpus": output["cpus"],
+                       "thresholds": DEFAULT_THRESHOLDS, "results": results}, f, indent=2)
+
+    print(json.dumps(output, indent=2))
+    return 1 if output.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -4,14 +4,20 @@ World of Tanks Mod Installer - Kommandozeilenversion
 Einfaches Script zum automatischen Installieren von WoT Mods
 """
 
-import os
-import zipfile
-import shutil
 from pathlib import Path
-import re
 import argparse
+import time
+import json
 from datetime import datetime
 
+from wot_mod_installer_core import (
+    DEFAULT_BUFFER_SIZE, DIFF_CHANGED, DIFF_ERROR, DIFF_IDENTICAL, DIFF_NEW, InstallSession, FleetInstallSession,
+    InstallProgress, InstallTransaction, InstallPlan, ManifestStore, ArchiveIndexCache, ContentStore, PhaseProfiler,
+    FolderWatcher, DiffSummary, find_conflicts, format_progress, format_size, find_game_versions, iter_conflict_report,
+    iter_install_diff, scan_zip_folder, verify_installation, with_later_winners, find_version_folders,
+    remove_version_folders,
+)
+
 
 def log_message(message):
     """Ausgabe mit Zeitstempel"""
@@ -19,112 +25,369 @@ def log_message(message):
     print(f"[{timestamp}] {message}")
 
 
-def detect_wot_version(wot_path):
+def emit_json(event, **fields):
+    """Ein Ereignis als JSON-Zeile ausgeben (--json)"""
+    print(json.dumps(dict(event=event, time=datetime.now().isoformat(timespec="seconds"), **fields),
+                     ensure_ascii=False), flush=True)
+
+
+def detect_wot_version(wot_path, log=log_message, error_log=print):
     """Erkenne die aktuelle World of Tanks Version"""
     try:
-        mods_path = Path(wot_path) / "mods"
-        if not mods_path.exists():
-            print(f"Fehler: Mods-Ordner nicht gefunden: {mods_path}")
+        versions = find_game_versions(wot_path)
+        if versions is None:
+            error_log(f"Fehler: Mods-Ordner nicht gefunden: {Path(wot_path) / 'mods'}")
             return None
         
-        # Suche nach Versionsordnern (Format: x.x.x.x)
-        version_pattern = re.compile(r'^\d+\.\d+\.\d+\.\d+$')
-        versions = []
-        
-        for item in mods_path.iterdir():
-            if item.is_dir() and version_pattern.match(item.name):
-                versions.append(item.name)
-        
         if versions:
-            # Sortiere Versionen und nimm die neueste
-            versions.sort(key=lambda x: [int(n) for n in x.split('.')], reverse=True)
+            # Neueste Version (Liste ist absteigend sortiert)
             latest_version = versions[0]
-            log_message(f"Version erkannt: {latest_version}")
+            log(f"Version erkannt: {latest_version}")
             return latest_version
         else:
-            print("Fehler: Keine gültige Spielversion im mods-Ordner gefunden")
+            error_log("Fehler: Keine gültige Spielversion im mods-Ordner gefunden")
             return None
             
     except Exception as e:
-        print(f"Fehler beim Erkennen der Version: {e}")
+        error_log(f"Fehler beim Erkennen der Version: {e}")
         return None
 
 
-def preview_mod_installation(zip_file_path, wot_base_path, current_version):
-    """Zeige eine Vorschau was installiert werden würde, ohne zu installieren"""
-    try:
-        print(f"\nVorschau für: {zip_file_path.name}")
-        print("=" * 50)
-        
-        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-            for member in zip_ref.namelist():
-                if member.endswith('/') or member.endswith('\\'):
-                    continue  # Überspringe Ordner
-                    
-                # Alle Dateien werden kopiert, aber "version" wird durch aktuelle Spielversion ersetzt
-                if "/version/" in member or "\\version\\" in member:
-                    # Ersetze "version" durch aktuelle Spielversion
-                    target_path = member.replace("/version/", f"/{current_version}/").replace("\\version\\", f"\\{current_version}\\")
-                    print(f"  {member} → {target_path}")
-                else:
-                    # Normale Datei - wird direkt kopiert (res/, mods/configs/, res_mods/, etc.)
-                    print(f"  {member}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"Fehler bei Vorschau von {zip_file_path.name}: {e}")
-        return False
+def preview_mod_installation(zip_files, wot_base_path, current_version, index_cache=None,
+                             buffer_size=DEFAULT_BUFFER_SIZE, json_lines=False):
+    """Zeige was eine Installation ändern würde (neu/geändert), ohne zu installieren"""
+    summary = DiffSummary()
+    archive = None
+    # Ausgabe sofort pro Eintrag, auch bei sehr vielen Dateien
+    for entry in iter_install_diff(zip_files, wot_base_path, current_version, index_cache, buffer_size):
+        summary.add(entry)
+        if json_lines:
+            emit_json("preview", target=str(wot_base_path), archive=entry.archive, member=entry.member,
+                      path=str(entry.target_path) if entry.target_path is not None else None,
+                      status=entry.status, size=entry.file_size, message=entry.error)
+            continue
+        if entry.archive != archive:
+            archive = entry.archive
+            print(f"\nVorschau für: {archive}")
+            print("=" * 50)
+        if entry.status == DIFF_ERROR:
+            print(f"  FEHLER    {entry.target_path or entry.archive}: {entry.error}")
+        elif entry.status != DIFF_IDENTICAL:
+            label = "NEU      " if entry.status == DIFF_NEW else "GEÄNDERT "
+            # Versionsordner ersetzt: Quellpfad im Archiv mit anzeigen
+            source = f"  ← {entry.member}" if str(entry.target_path) != entry.member else ""
+            print(f"  {label} {entry.target_path}  ({format_size(entry.file_size)}){source}")
+    
+    if json_lines:
+        emit_json("preview_summary", target=str(wot_base_path), version=current_version,
+                  new=summary.counts[DIFF_NEW], changed=summary.counts[DIFF_CHANGED],
+                  identical=summary.counts[DIFF_IDENTICAL], errors=summary.counts[DIFF_ERROR],
+                  bytes_to_write=summary.bytes_to_write)
+    else:
+        print(f"\n{summary.format()}")
+    return summary.counts[DIFF_ERROR] == 0
+
+
+def verify_mod_installation(zip_files, wot_base_path, current_version, index_cache=None, jobs=0,
+                            buffer_size=DEFAULT_BUFFER_SIZE, show_progress=False, json_lines=False):
+    """Prüfe installierte Dateien gegen die ZIP-Dateien, gibt die Anzahl der Abweichungen zurück"""
+    progress = InstallProgress(callback=print_progress, interval=0.5) if show_progress else None
+    result = verify_installation(zip_files, wot_base_path, current_version, index_cache, jobs, buffer_size,
+                                 progress)
+    if show_progress:
+        print()
+    problems = len(result.missing) + len(result.modified) + len(result.errors)
+    
+    if json_lines:
+        for status, items in (("ok", result.ok), ("missing", result.missing), ("modified", result.modified)):
+            for target_path, archive in items:
+                emit_json("verify", target=str(wot_base_path), path=str(target_path), archive=archive,
+                          status=status)
+        for target_path, archive, error in result.errors:
+            emit_json("verify", target=str(wot_base_path), path=str(target_path) if target_path else None,
+                      archive=archive, status="error", message=error)
+        emit_json("verify_summary", target=str(wot_base_path), version=current_version, ok=len(result.ok),
+                  missing=len(result.missing), modified=len(result.modified), errors=len(result.errors))
+        return problems
+    
+    for target_path, archive in result.missing:
+        print(f"  FEHLT     {target_path}  ({archive})")
+    for target_path, archive in result.modified:
+        print(f"  GEÄNDERT  {target_path}  ({archive})")
+    for target_path, archive, error in result.errors:
+        print(f"  FEHLER    {target_path or archive}: {error}")
+    print(f"OK: {len(result.ok)}, fehlend: {len(result.missing)}, geändert: {len(result.modified)}, "
+          f"Fehler: {len(result.errors)}")
+    return problems
+
+
+# Breite der Fortschrittszeile (zum Überschreiben mit Leerzeichen)
+PROGRESS_LINE_WIDTH = 110
+
+
+def print_progress(snapshot):
+    """Fortschrittszeile überschreiben (ohne Zeilenumbruch)"""
+    print(f"\r{format_progress(snapshot):<{PROGRESS_LINE_WIDTH}}", end="", flush=True)
+
+
+def log_above_progress(message):
+    """Log-Ausgabe, die eine laufende Fortschrittszeile vorher löscht"""
+    print(f"\r{'':<{PROGRESS_LINE_WIDTH}}\r", end="")
+    log_message(message)
+
+
+def list_installed_mods(wot_path, json_lines=False):
+    """Liste die installierten ZIP-Dateien aus den Manifesten auf"""
+    manifests = ManifestStore(wot_path).load_all()
+    if json_lines:
+        for name in sorted(manifests, key=lambda name: manifests[name]["sequence"]):
+            emit_json("installed", target=str(wot_path), archive=name, files=len(manifests[name]["files"]),
+                      version=manifests[name]["version"])
+        return 0
+    if not manifests:
+        print("Keine installierten ZIP-Dateien gefunden.")
+        return 0
+    
+    print(f"\nInstallierte ZIP-Dateien ({len(manifests)}):")
+    for name in sorted(manifests, key=lambda name: manifests[name]["sequence"]):
+        manifest = manifests[name]
+        print(f"  {name} ({len(manifest['files'])} Dateien, Version {manifest['version']})")
+    return 0
+
+
+def emit_conflicts(conflicts):
+    """Ein Ereignis pro Zielpfad, den mehrere Archive schreiben (das letzte Archiv gewinnt)"""
+    for items in conflicts:
+        emit_json("conflict", path=str(items[-1].target_path), winner=items[-1].archive,
+                  identical=len({(item.file_size, item.CRC) for item in items}) == 1,
+                  archives=[{"archive": item.archive, "member": item.member, "size": item.file_size}
+                            for item in items])
+
+
+def uninstall_mods(wot_path, archive_names, yes=False, json_lines=False):
+    """Lösche die Dateien der angegebenen Archive anhand ihrer Manifeste"""
+    store = ManifestStore(wot_path)
+    installed = store.load_all()
+    for archive_name in archive_names:
+        if archive_name not in installed:
+            message = f"Kein Manifest für {archive_name} gefunden (siehe --installed)"
+            if json_lines:
+                emit_json("error", target=str(wot_path), archive=archive_name, message=message)
+            else:
+                print(f"Fehler: {message}")
+            return 1
+    
+    # Vorab prüfen, was gelöscht würde
+    if not json_lines:
+        print(f"\n=== DEINSTALLATION ===")
+    for archive_name in archive_names:
+        result = store.uninstall(archive_name, dry_run=True)
+        if json_lines:
+            emit_json("uninstall_plan", target=str(wot_path), archive=archive_name, remove=len(result.removed),
+                      keep=len(result.refused), missing=len(result.missing))
+        else:
+            print(f"{archive_name}: {len(result.removed)} Datei(en) werden gelöscht, "
+                  f"{len(result.refused)} bleiben erhalten, {len(result.missing)} fehlen bereits")
+    
+    if not yes:
+        response = input(f"\nMöchten Sie {len(archive_names)} Mod(s) deinstallieren? (j/N): ")
+        if response.lower() not in ['j', 'ja', 'y', 'yes']:
+            print("Deinstallation abgebrochen.")
+            return 0
+    
+    error_count = 0
+    for archive_name in archive_names:
+        try:
+            result = store.uninstall(archive_name)
+        except Exception as e:
+            if json_lines:
+                emit_json("error", target=str(wot_path), archive=archive_name, message=str(e))
+            else:
+                log_message(f"✗ Fehler bei {archive_name}: {e}")
+            error_count += 1
+            continue
+        if json_lines:
+            emit_json("uninstall", target=str(wot_path), archive=archive_name, removed=len(result.removed),
+                      missing=len(result.missing),
+                      refused=[{"path": file_path, "reason": reason} for file_path, reason in result.refused])
+            continue
+        for file_path, reason in result.refused:
+            print(f"  Nicht gelöscht: {file_path} ({reason})")
+        log_message(f"✓ {archive_name} deinstalliert: {len(result.removed)} Datei(en) gelöscht")
+    
+    return 0 if error_count == 0 else 1
+
+
+def cleanup_version_folders(wot_path, keep=1, jobs=0, dry_run=False, yes=False, json_lines=False):
+    """Liste die Versionsordner mit Größe und lösche alle außer den neuesten keep Versionen"""
+    folders = find_version_folders(wot_path, keep, jobs)
+    stale = [folder for folder in folders if not folder.keep]
+    stale_size = sum(folder.size for folder in stale)
+    
+    if json_lines:
+        for folder in folders:
+            emit_json("version_folder", target=str(wot_path), version=folder.version, path=str(folder.path),
+                      size=folder.size, files=folder.files, keep=folder.keep)
+    else:
+        print(f"\n=== VERSIONSORDNER {wot_path} ===")
+        if not folders:
+            print("Keine Versionsordner gefunden.")
+        for folder in folders:
+            action = "behalten" if folder.keep else "löschen"
+            print(f"  {folder.path.parent.name + '/' + folder.version:<22} {format_size(folder.size):>10}  "
+                  f"{folder.files:>7} Dateien  [{action}]")
+        print(f"Alte Versionsordner: {len(stale)}, zusammen {format_size(stale_size)}")
+    
+    if not stale or dry_run:
+        if json_lines:
+            emit_json("cleanup", target=str(wot_path), removed=0, freed=0, would_free=stale_size, dry_run=dry_run)
+        return 0
+    
+    if not yes:
+        response = input(f"\nMöchten Sie {len(stale)} Ordner ({format_size(stale_size)}) löschen? (j/N): ")
+        if response.lower() not in ['j', 'ja', 'y', 'yes']:
+            print("Bereinigung abgebrochen.")
+            return 0
+    
+    if json_lines:
+        log = lambda message: emit_json("log", target=str(wot_path), message=message)
+    else:
+        log = log_message
+    freed = remove_version_folders(stale, log)
+    if json_lines:
+        emit_json("cleanup", target=str(wot_path), removed=len(stale), freed=freed, dry_run=False)
+    else:
+        print(f"Freigegeben: {format_size(freed)}")
+    return 0 if freed == stale_size else 1
+
+
+def migrate_mods(wot_path, zip_folder, current_version, buffer_size, args):
+    """Übernehme installierte Mods in den aktuellen Versionsordner, entpacke nur wo nötig neu"""
+    if args.json:
+        log = lambda message: emit_json("log", target=str(wot_path), message=message)
+    else:
+        log = log_message
+        print(f"\n=== Migration auf Version {current_version} ===")
+    result = ManifestStore(wot_path).migrate(current_version, move=args.migrate_move, log=log, zip_folder=zip_folder)
+    
+    # Archive mit fehlenden, veränderten oder versionsabhängigen Dateien neu entpacken (falls die ZIP-Datei noch
+    # vorhanden ist)
+    reinstall_files = [zip_folder / name for name in result.reinstall if (zip_folder / name).exists()]
+    unavailable = [name for name in result.reinstall if not (zip_folder / name).exists()]
+    error_count = 0
+    if reinstall_files:
+        log(f"Neu entpacken: {', '.join(zip_file.name for zip_file in reinstall_files)}")
+        show_progress = args.progress and not args.json
+        session = create_session(wot_path, current_version, buffer_size, args.incremental,
+                                 show_progress=show_progress, transactional=args.transactional,
+                                 content_store=ContentStore(zip_folder) if args.store else None,
+                                 json_lines=args.json)
+        _, error_count = session.install_all(reinstall_files, args.jobs)
+        if show_progress:
+            print()
+    
+    if args.json:
+        emit_json("migrate_summary", target=str(wot_path), version=current_version,
+                  migrated=result.migrated, files=result.files,
+                  reinstalled=len(reinstall_files) - error_count, errors=error_count, unavailable=unavailable)
+    else:
+        print(f"\n=== Migration abgeschlossen ===")
+        print(f"Übernommen: {len(result.migrated)} Archiv(e), {result.files} Datei(en)")
+        print(f"Neu entpackt: {len(reinstall_files) - error_count}")
+        for name in unavailable:
+            print(f"Nicht gefunden (bitte neu installieren): {name}")
+    
+    return 0 if error_count == 0 and not unavailable else 1
 
 
-def install_mod(zip_file_path, wot_base_path, current_version):
-    """Installiere eine einzelne Mod-ZIP-Datei"""
+def watch_zip_folder(wot_path, zip_folder, current_version, buffer_size, index_cache, args):
+    """Überwache den ZIP-Ordner und installiere neue oder geänderte Archive inkrementell (Strg+C beendet)"""
+    if args.json:
+        log = lambda message: emit_json("log", target=str(wot_path), message=message)
+    else:
+        log = log_message
+    show_progress = args.progress and not args.json
+    watcher = FolderWatcher(zip_folder, args.debounce)
+    log(f"Überwache {zip_folder} ({len(watcher.known)} ZIP-Dateien bekannt, Strg+C zum Beenden)")
+    
     try:
-        log_message(f"Installiere: {zip_file_path.name}")
-        
-        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-            for member in zip_ref.namelist():
-                # Überspringe Ordner
-                if member.endswith('/') or member.endswith('\\'):
-                    continue
-                
-                # Alle Dateien werden kopiert, aber "version" wird durch aktuelle Spielversion ersetzt
-                if "/version/" in member or "\\version\\" in member:
-                    # Ersetze "version" durch aktuelle Spielversion
-                    target_path = member.replace("/version/", f"/{current_version}/").replace("\\version\\", f"\\{current_version}\\")
-                else:
-                    # Normale Datei - wird direkt kopiert (res/, mods/configs/, res_mods/, etc.)
-                    target_path = member
-                
-                # Vollständiger Zielpfad (direkt in WoT Hauptordner)
-                full_target_path = wot_base_path / target_path
-                
-                # Erstelle Zielverzeichnis falls notwendig
-                full_target_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Extrahiere Datei
-                with zip_ref.open(member) as source:
-                    with open(full_target_path, 'wb') as target:
-                        target.write(source.read())
-                
-                # Log-Ausgabe
-                if target_path != member:
-                    print(f"  {member} → {target_path}")
-                else:
-                    print(f"  → {target_path}")
-        
-        log_message(f"✓ {zip_file_path.name} erfolgreich installiert")
-        return True
-        
-    except Exception as e:
-        log_message(f"✗ Fehler bei {zip_file_path.name}: {e}")
-        return False
+        while True:
+            time.sleep(args.watch_interval)
+            ready = watcher.poll()
+            if not ready:
+                continue
+            
+            # Spätere Archive mit gemeinsamen Zielpfaden erneut anwenden, damit weiterhin das letzte gewinnt
+            zip_files = with_later_winners(ready, scan_zip_folder(zip_folder), current_version, index_cache)
+            if args.json:
+                emit_json("watch", target=str(wot_path), ready=[zip_file.name for zip_file in ready],
+                          archives=[zip_file.name for zip_file in zip_files])
+            else:
+                log_message(f"Neu oder geändert: {', '.join(zip_file.name for zip_file in ready)}")
+            
+            session = create_session(wot_path, current_version, buffer_size, True, index_cache, show_progress,
+                                     args.transactional, ContentStore(zip_folder) if args.store else None,
+                                     json_lines=args.json)
+            success_count, error_count = session.install_all(zip_files, args.jobs)
+            if show_progress:
+                print()
+            if args.json:
+                for zip_file, result in zip(zip_files, session.results):
+                    emit_json("archive", target=str(wot_path), archive=zip_file.name, success=result)
+                emit_json("summary", target=str(wot_path), version=current_version, success=success_count,
+                          errors=error_count, written=session.written_count, skipped=session.skipped_count)
+            else:
+                log_message(f"Erfolgreich: {success_count}, Fehler: {error_count}, "
+                            f"Dateien geschrieben: {session.written_count}, unverändert: {session.skipped_count}")
+    except KeyboardInterrupt:
+        log("Überwachung beendet.")
+    return 0
+
+
+def create_session(wot_base_path, current_version, buffer_size=DEFAULT_BUFFER_SIZE, incremental=False,
+                   index_cache=None, show_progress=False, transactional=False, content_store=None,
+                   profiler=None, pipeline=True, label=None, json_lines=False, plan=None):
+    """Erstelle eine Installations-Session mit den Einstellungen der Kommandozeile"""
+    if json_lines:
+        # Ein JSON-Objekt pro Meldung bzw. geschriebener Datei
+        progress = None
+        log = lambda message: emit_json("log", target=str(wot_base_path), message=message)
+        file_log = lambda message: emit_json("file", target=str(wot_base_path), message=message.strip())
+    elif show_progress:
+        # Fortschrittszeile statt einer Zeile pro Datei
+        progress = InstallProgress(callback=print_progress, interval=0.5)
+        log = log_above_progress
+        file_log = lambda message: None
+    else:
+        progress = None
+        log = log_message
+        file_log = print
+    if label is not None and not json_lines:
+        # Mehrere Ziele: Meldungen mit dem Namen des WoT Ordners kennzeichnen
+        log = lambda message, log=log: log(f"[{label}] {message}")
+        file_log = lambda message, file_log=file_log: file_log(f"[{label}] {message}")
+    return InstallSession(
+        wot_base_path,
+        current_version,
+        log=log,
+        file_log=file_log,
+        buffer_size=buffer_size,
+        incremental=incremental,
+        index_cache=index_cache,
+        progress=progress,
+        transactional=transactional,
+        content_store=content_store,
+        profiler=profiler,
+        pipeline=pipeline,
+        plan=plan,
+    )
 
 
 def main():
     parser = argparse.ArgumentParser(description="World of Tanks Mod Installer")
-    parser.add_argument("--wot-path", default="G:\\Games\\World_of_Tanks_EU", 
-                        help="Pfad zur World of Tanks Installation")
+    parser.add_argument("--wot-path", nargs="+", default=["G:\\Games\\World_of_Tanks_EU"],
+                        help="Pfad zur World of Tanks Installation (mehrere Pfade: jede Datei wird einmal "
+                             "entpackt und in alle Installationen geschrieben)")
     parser.add_argument("--zip-folder", default=".", 
                         help="Ordner mit den ZIP-Dateien")
     parser.add_argument("--zip-files", nargs="*", 
@@ -133,85 +396,378 @@ def main():
                         help="Nur verfügbare ZIP-Dateien auflisten")
     parser.add_argument("--preview", action="store_true", 
                         help="Vorschau anzeigen ohne zu installieren")
+    parser.add_argument("--verify", action="store_true",
+                        help="Installierte Dateien mit Größe und CRC32 aus den ZIP-Dateien vergleichen")
+    parser.add_argument("--save-plan", metavar="DATEI",
+                        help="Auswahl als Installationsplan (Archive mit Fingerabdruck, Zielpfade, Größen, CRC32) "
+                             "speichern statt zu installieren")
+    parser.add_argument("--plan", metavar="DATEI",
+                        help="Gespeicherten Installationsplan installieren (ohne erneute Planung, abgelehnt "
+                             "wenn sich ein Archiv geändert hat)")
+    parser.add_argument("--conflicts", action="store_true",
+                        help="Nur Zielpfade anzeigen, die von mehreren ZIP-Dateien geschrieben werden")
+    parser.add_argument("--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE // 1024,
+                        help="Puffergröße beim Entpacken in KB (Standard: 1024)")
+    parser.add_argument("--jobs", type=int,
+                        help="Anzahl parallel installierter ZIP-Dateien (0 = Anzahl CPU-Kerne, Standard: 1, "
+                             "bei --verify und --cleanup Standard: 0)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Nur neue oder geänderte Dateien schreiben (Größe/CRC32-Vergleich)")
+    parser.add_argument("--progress", action="store_true",
+                        help="Fortschrittszeile mit MB/s, Dateien/s und Restzeit statt einer Zeile pro Datei")
+    parser.add_argument("--no-index-cache", action="store_true",
+                        help="ZIP-Inhaltsverzeichnisse nicht zwischenspeichern")
+    parser.add_argument("--transactional", action="store_true",
+                        help="Alles oder nichts: erst in ein Staging-Verzeichnis entpacken, "
+                             "dann per Umbenennen übernehmen")
+    parser.add_argument("--store", action="store_true",
+                        help="Entpackte Dateien einmalig im ZIP-Ordner speichern und per Hardlink bereitstellen")
+    parser.add_argument("--profile", metavar="DATEI",
+                        help="Zeiten pro Phase und Archiv als JSON speichern (zusätzlich <Name>.trace.json "
+                             "im Chrome-Trace-Format)")
+    parser.add_argument("--watch", action="store_true",
+                        help="ZIP-Ordner überwachen und neue oder geänderte ZIP-Dateien inkrementell installieren")
+    parser.add_argument("--watch-interval", type=float, default=2.0,
+                        help="Abfrageintervall der Überwachung in Sekunden (Standard: 2)")
+    parser.add_argument("--debounce", type=float, default=3.0,
+                        help="Wartezeit in Sekunden, bis eine neue ZIP-Datei als vollständig gilt (Standard: 3)")
+    parser.add_argument("--no-pipeline", action="store_true",
+                        help="Große Dateien nicht überlappend entpacken und schreiben")
+    parser.add_argument("--rollback", action="store_true",
+                        help="Letzte transaktionale Installation rückgängig machen")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Installierte Mods älterer Versionsordner per Hardlink in den aktuellen "
+                             "Versionsordner übernehmen")
+    parser.add_argument("--migrate-move", action="store_true",
+                        help="Wie --migrate, aber die Dateien verschieben statt zu verlinken")
+    parser.add_argument("--installed", action="store_true",
+                        help="Installierte ZIP-Dateien auflisten (laut Manifest)")
+    parser.add_argument("--uninstall", nargs="+", metavar="ZIP",
+                        help="Dateien der angegebenen installierten ZIP-Dateien löschen")
+    parser.add_argument("--cleanup", action="store_true",
+                        help="Versionsordner in mods/ und res_mods/ mit Größe auflisten und alle außer den neuesten "
+                             "--keep löschen (nach Rückfrage)")
+    parser.add_argument("--keep", type=int, default=1,
+                        help="Bei --cleanup: Anzahl der neuesten Versionen, die erhalten bleiben (Standard: 1)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Bei --cleanup nur anzeigen, was gelöscht würde")
+    parser.add_argument("-y", "--yes", action="store_true",
+                        help="Ohne Rückfrage installieren, deinstallieren bzw. aufräumen")
+    parser.add_argument("--json", action="store_true",
+                        help="Alle Ausgaben als JSON-Zeilen (ein Objekt pro Ereignis, für Automatisierung; "
+                             "Installation, Deinstallation und Bereinigung erfordern --yes)")
     
     args = parser.parse_args()
     
-    # Validiere World of Tanks Pfad
-    wot_path = Path(args.wot_path)
-    if not wot_path.exists():
-        print(f"Fehler: World of Tanks Pfad existiert nicht: {wot_path}")
+    def fail(message):
+        """Fehlermeldung (bei --json als Ereignis), gibt den Rückgabewert 1 zurück"""
+        if args.json:
+            emit_json("error", message=message)
+        else:
+            print(f"Fehler: {message}")
         return 1
     
-    # Erkenne aktuelle Version
-    current_version = detect_wot_version(wot_path)
-    if not current_version:
-        return 1
+    def confirmation_missing():
+        """Installation, Deinstallation und Bereinigung fragen nach, mit --json geht das nur mit --yes"""
+        return args.json and not args.yes
+    
+    if args.buffer_size <= 0:
+        return fail(f"Ungültige Puffergröße: {args.buffer_size}")
+    buffer_size = args.buffer_size * 1024
+    
+    if args.jobs is None:
+        # Prüfung und Bereinigung lesen nur und nutzen standardmäßig alle Kerne
+        args.jobs = 0 if args.verify or args.cleanup else 1
+    if args.jobs < 0:
+        return fail(f"Ungültige Anzahl Jobs: {args.jobs}")
+    
+    # Validiere World of Tanks Pfade
+    wot_paths = [Path(path) for path in args.wot_path]
+    for wot_path in wot_paths:
+        if not wot_path.exists():
+            return fail(f"World of Tanks Pfad existiert nicht: {wot_path}")
+    wot_path = wot_paths[0]
+    
+    # Diese Funktionen arbeiten mit genau einer Installation
+    if len(wot_paths) > 1:
+        single_target_options = [option for option, used in [
+            ("--rollback", args.rollback), ("--installed", args.installed), ("--uninstall", args.uninstall),
+            ("--migrate", args.migrate or args.migrate_move), ("--watch", args.watch), ("--store", args.store),
+            ("--profile", args.profile),
+        ] if used]
+        if single_target_options:
+            return fail(f"{', '.join(single_target_options)} ist nur mit einem WoT-Pfad möglich")
+    
+    if args.rollback:
+        transaction = InstallTransaction(wot_path)
+        state, _, _ = transaction.read_journal()
+        if state not in ("committing", "committed"):
+            return fail("Keine transaktionale Installation zum Rückgängigmachen gefunden.")
+        result = transaction.rollback()
+        if args.json:
+            emit_json("rollback", target=str(wot_path), restored=result.restored, skipped=result.skipped)
+        else:
+            print(f"Letzte Installation rückgängig gemacht: {result.restored} Dateien wiederhergestellt bzw. entfernt")
+            for target in result.skipped:
+                print(f"  Behalten (seitdem verändert): {target}")
+        return 0
+    
+    if args.installed:
+        return list_installed_mods(wot_path, args.json)
+    
+    if args.uninstall:
+        if confirmation_missing():
+            return fail("--json erfordert bei --uninstall --yes (keine Rückfrage möglich)")
+        return uninstall_mods(wot_path, args.uninstall, args.yes, args.json)
+    
+    if args.cleanup:
+        if args.keep < 1:
+            return fail(f"Ungültige Anzahl zu behaltender Versionen: {args.keep}")
+        if confirmation_missing() and not args.dry_run:
+            return fail("--json erfordert bei --cleanup --yes (keine Rückfrage möglich)")
+        return max(cleanup_version_folders(target_path, args.keep, args.jobs, args.dry_run, args.yes, args.json)
+                   for target_path in wot_paths)
+    
+    # Erkenne aktuelle Version (pro Installation)
+    versions = []
+    for target_path in wot_paths:
+        if args.json:
+            current_version = detect_wot_version(
+                target_path,
+                log=lambda message: emit_json("log", target=str(target_path), message=message),
+                error_log=lambda message: emit_json("error", target=str(target_path), message=message))
+        else:
+            current_version = detect_wot_version(target_path)
+        if not current_version:
+            return 1
+        versions.append(current_version)
+    current_version = versions[0]
+    targets = list(zip(wot_paths, versions))
     
     # Validiere ZIP-Ordner
     zip_folder = Path(args.zip_folder)
     if not zip_folder.exists():
-        print(f"Fehler: ZIP-Ordner existiert nicht: {zip_folder}")
-        return 1
+        return fail(f"ZIP-Ordner existiert nicht: {zip_folder}")
+    
+    if args.migrate or args.migrate_move:
+        return migrate_mods(wot_path, zip_folder, current_version, buffer_size, args)
     
-    # Finde ZIP-Dateien
-    if args.zip_files:
+    # Finde ZIP-Dateien (bei einem Installationsplan stehen Archive und Reihenfolge fest)
+    plan = None
+    if args.plan:
+        if args.zip_files or args.watch or args.save_plan:
+            return fail("--plan ist nicht mit --zip-files, --watch oder --save-plan kombinierbar")
+        try:
+            plan = InstallPlan.load(args.plan)
+        except Exception as e:
+            return fail(f"Installationsplan kann nicht geladen werden: {e}")
+        for target_path, target_version in targets:
+            if target_version != plan.current_version:
+                return fail(f"Installationsplan gilt für Version {plan.current_version}, "
+                            f"{target_path} hat Version {target_version}")
+        zip_files = plan.zip_files(zip_folder)
+    elif args.zip_files:
         zip_files = [zip_folder / filename for filename in args.zip_files]
         # Validiere dass alle Dateien existieren
         for zip_file in zip_files:
             if not zip_file.exists():
-                print(f"Fehler: ZIP-Datei nicht gefunden: {zip_file}")
-                return 1
+                return fail(f"ZIP-Datei nicht gefunden: {zip_file}")
     else:
-        zip_files = list(zip_folder.glob("*.zip"))
-        zip_files.sort()
+        zip_files = scan_zip_folder(zip_folder)
+    
+    # Index-Cache der ZIP-Inhaltsverzeichnisse (ungültig sobald sich ein Archiv ändert)
+    index_cache = None if args.no_index_cache else ArchiveIndexCache(zip_folder)
+    if index_cache is not None and not args.zip_files and plan is None:
+        index_cache.prune(zip_files)
+    
+    if plan is not None:
+        problems = plan.check(zip_folder, index_cache)
+        if problems:
+            return fail(f"Installationsplan abgelehnt, Archive geändert: {'; '.join(problems)}")
+    
+    if args.watch:
+        return watch_zip_folder(wot_path, zip_folder, current_version, buffer_size, index_cache, args)
     
     if not zip_files:
+        if args.json:
+            return fail("Keine ZIP-Dateien gefunden.")
         print("Keine ZIP-Dateien gefunden.")
         return 1
     
     # Liste ZIP-Dateien auf
-    print(f"\nGefundene ZIP-Dateien ({len(zip_files)}):")
-    for i, zip_file in enumerate(zip_files, 1):
-        print(f"  {i:2d}. {zip_file.name}")
+    if args.json:
+        emit_json("archives", folder=str(zip_folder), archives=[zip_file.name for zip_file in zip_files])
+    else:
+        print(f"\nGefundene ZIP-Dateien ({len(zip_files)}):")
+        for i, zip_file in enumerate(zip_files, 1):
+            print(f"  {i:2d}. {zip_file.name}")
     
     if args.list_only:
+        if index_cache is not None:
+            index_cache.save()
+        return 0
+    
+    if args.save_plan:
+        if len(set(versions)) > 1:
+            return fail("--save-plan erfordert WoT-Installationen mit derselben Version")
+        try:
+            plan = InstallPlan.compile(zip_files, current_version, index_cache)
+            plan.save(args.save_plan)
+        except Exception as e:
+            return fail(f"Installationsplan kann nicht gespeichert werden: {e}")
+        finally:
+            if index_cache is not None:
+                index_cache.save()
+        file_count = sum(len(archive.files) for archive in plan.archives)
+        if args.json:
+            emit_json("plan", path=str(args.save_plan), version=current_version, archives=len(plan.archives),
+                      files=file_count)
+        else:
+            print(f"\nInstallationsplan gespeichert: {args.save_plan} "
+                  f"({len(plan.archives)} Archive, {file_count} Dateien, Version {current_version})")
         return 0
     
     if args.preview:
-        print(f"\n=== VORSCHAU (keine Installation) ===")
-        for zip_file in zip_files:
-            preview_mod_installation(zip_file, wot_path, current_version)
+        preview_ok = True
+        for target_path, target_version in targets:
+            if len(targets) > 1 and not args.json:
+                print(f"\n=== VORSCHAU für {target_path} (Version {target_version}) ===")
+            elif not args.json:
+                print(f"\n=== VORSCHAU (keine Installation) ===")
+            preview_ok &= preview_mod_installation(zip_files, target_path, target_version, index_cache, buffer_size,
+                                                   args.json)
+        conflicts = find_conflicts(zip_files, current_version, index_cache)
+        if args.json:
+            emit_json("conflicts", conflicts=len(conflicts))
+        else:
+            print(f"\n=== KONFLIKTE ===")
+            print("".join(iter_conflict_report(conflicts)), end="")
+        if index_cache is not None:
+            index_cache.save()
+        return 0 if preview_ok else 1
+    
+    if args.verify:
+        show_progress = args.progress and not args.json
+        problems = 0
+        for target_path, target_version in targets:
+            if not args.json:
+                print(f"\n=== PRÜFUNG {target_path} (Version {target_version}) ===")
+            problems += verify_mod_installation(zip_files, target_path, target_version, index_cache, args.jobs,
+                                                buffer_size, show_progress, args.json)
+        if index_cache is not None:
+            index_cache.save()
+        return 0 if problems == 0 else 1
+    
+    # Konfliktprüfung über alle ausgewählten Archive (gleicher Zielpfad in mehreren ZIP-Dateien)
+    # Welche Archive kollidieren, hängt nicht von der Version ab: eine Prüfung gilt für alle Ziele
+    # Ein Installationsplan wurde bereits geprüft, seine Reihenfolge steht fest
+    if plan is None or args.conflicts:
+        conflicts = find_conflicts(zip_files, current_version, index_cache)
+    else:
+        conflicts = []
+    if index_cache is not None:
+        index_cache.save()
+    
+    if args.conflicts:
+        if args.json:
+            emit_conflicts(conflicts)
+        else:
+            print(f"\n=== KONFLIKTE ===")
+            print("".join(iter_conflict_report(conflicts)), end="")
         return 0
     
+    if confirmation_missing():
+        return fail("--json erfordert bei der Installation --yes (keine Rückfrage möglich)")
+    
     # Bestätigung
-    print(f"\nWorld of Tanks Pfad: {wot_path}")
-    print(f"Aktuelle Version: {current_version}")
-    print(f"Zielordner für mods: {wot_path / 'mods' / current_version}")
-    print(f"Zielordner für res_mods: {wot_path / 'res_mods' / current_version}")
-    
-    response = input(f"\nMöchten Sie {len(zip_files)} Mod(s) installieren? (j/N): ")
-    if response.lower() not in ['j', 'ja', 'y', 'yes']:
-        print("Installation abgebrochen.")
-        return 0
+    if args.json:
+        emit_json("start", targets=[{"target": str(target_path), "version": target_version}
+                                    for target_path, target_version in targets],
+                  conflicts=len(conflicts))
+    else:
+        for target_path, target_version in targets:
+            print(f"\nWorld of Tanks Pfad: {target_path}")
+            print(f"Aktuelle Version: {target_version}")
+            print(f"Zielordner für mods: {target_path / 'mods' / target_version}")
+            print(f"Zielordner für res_mods: {target_path / 'res_mods' / target_version}")
+        if conflicts:
+            print(f"Achtung: {len(conflicts)} Zielpfad(e) werden von mehreren ZIP-Dateien geschrieben, "
+                  f"das letzte Archiv gewinnt (Details mit --conflicts)")
+    
+    if not args.yes:
+        response = input(f"\nMöchten Sie {len(zip_files)} Mod(s) installieren? (j/N): ")
+        if response.lower() not in ['j', 'ja', 'y', 'yes']:
+            print("Installation abgebrochen.")
+            return 0
     
     # Installation
-    wot_base_path = wot_path  # Direkt in den WoT Hauptordner
-    success_count = 0
-    error_count = 0
+    if not args.json:
+        print(f"\n=== Installation gestartet ===")
+    show_progress = args.progress and not args.json
+    
+    # Bei mehreren Jobs gewinnt bei gleichen Zielpfaden weiterhin das letzte Archiv der Liste
+    if len(targets) == 1:
+        content_store = ContentStore(zip_folder) if args.store else None
+        profiler = PhaseProfiler() if args.profile else None
+        session = create_session(wot_path, current_version, buffer_size, args.incremental, index_cache,
+                                 show_progress, args.transactional, content_store, profiler, not args.no_pipeline,
+                                 json_lines=args.json, plan=plan)
+        session.install_all(zip_files, args.jobs)
+        sessions = [session]
+    else:
+        # Mehrere Installationen: jeder Eintrag wird einmal entpackt und in alle Ziele geschrieben
+        content_store = profiler = None
+        sessions = [create_session(target_path, target_version, buffer_size, args.incremental, index_cache,
+                                   show_progress, args.transactional, label=target_path.name or str(target_path),
+                                   json_lines=args.json, plan=plan)
+                    for target_path, target_version in targets]
+        if args.json:
+            fleet_log = lambda message: emit_json("log", message=message)
+        else:
+            fleet_log = log_above_progress if show_progress else log_message
+        progress = InstallProgress(callback=print_progress, interval=0.5) if show_progress else None
+        FleetInstallSession(sessions, fleet_log, progress).install_all(zip_files, args.jobs)
     
-    print(f"\n=== Installation gestartet ===")
+    if show_progress:
+        print()
     
-    for zip_file in zip_files:
-        if install_mod(zip_file, wot_base_path, current_version):
-            success_count += 1
+    total_errors = 0
+    for session in sessions:
+        success_count = sum(1 for result in session.results if result)
+        error_count = len(session.results) - success_count
+        total_errors += error_count
+        
+        if args.json:
+            for zip_file, result in zip(zip_files, session.results):
+                emit_json("archive", target=str(session.wot_base_path), archive=zip_file.name, success=result)
+            emit_json("summary", target=str(session.wot_base_path), version=session.current_version,
+                      success=success_count, errors=error_count,
+                      written=session.written_count, skipped=session.skipped_count)
+            continue
+        
+        if len(sessions) > 1:
+            print(f"\n=== Installation abgeschlossen: {session.wot_base_path} ===")
         else:
-            error_count += 1
+            print(f"\n=== Installation abgeschlossen ===")
+        print(f"Erfolgreich: {success_count}")
+        print(f"Fehler: {error_count}")
+        if args.incremental:
+            print(f"Dateien geschrieben: {session.written_count}")
+            print(f"Dateien unverändert: {session.skipped_count}")
     
-    print(f"\n=== Installation abgeschlossen ===")
-    print(f"Erfolgreich: {success_count}")
-    print(f"Fehler: {error_count}")
+    if content_store is not None:
+        if args.json:
+            emit_json("content_store", hits=content_store.hits, misses=content_store.misses)
+        else:
+            print(f"Aus dem Dateispeicher: {content_store.hits}, neu entpackt: {content_store.misses}")
+    if profiler is not None:
+        trace_path = profiler.save(args.profile)
+        if args.json:
+            emit_json("profile", path=str(args.profile), trace=str(trace_path))
+        else:
+            print(f"Zeitmessung gespeichert: {args.profile} (Trace: {trace_path})")
     
-    return 0 if error_count == 0 else 1
+    return 0 if total_errors == 0 else 1
 
 
 if __name__ == "__main__":
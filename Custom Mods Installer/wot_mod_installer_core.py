@@ -0,0 +1,2397 @@
+#!/usr/bin/env python3
+"""
+World of Tanks Mod Installer - Gemeinsame Installationslogik
+Wird von der GUI- und der Kommandozeilenversion verwendet.
+"""
+
+import io
+import os
+import re
+import mmap
+import struct
+import zipfile
+import shutil
+import zlib
+import json
+import hashlib
+import time
+import queue
+import itertools
+import threading
+import contextlib
+from collections import namedtuple, OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+# Standard-Puffergröße für das blockweise Entpacken (1 MB)
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Ordner für Verwaltungsdaten des Installers (im WoT- bzw. ZIP-Ordner)
+STATE_DIR_NAME = ".wot_mod_installer"
+
+# Einträge ab dieser Größe werden überlappend entpackt und geschrieben
+PIPELINE_MIN_SIZE = 8 * 1024 * 1024
+
+# Höchstens so viele Blöcke sind zwischen Entpacken und Schreiben unterwegs (Speicherbedarf)
+PIPELINE_DEPTH = 4
+
+# ZIP-Dateien in ZIP-Dateien werden bis zu dieser Tiefe direkt aus dem äußeren Archiv installiert
+NESTED_ARCHIVE_MAX_DEPTH = 3
+
+# Format der Einträge im Index-Cache (ältere Einträge werden neu eingelesen)
+ARCHIVE_INDEX_FORMAT = 2
+
+# Format der Installationspläne (Format 1 wird weiterhin gelesen, unbekannte Formate werden abgelehnt)
+PLAN_FORMAT = 2
+
+# Zieldateien ab dieser Größe werden vor dem Schreiben in voller Größe angelegt (weniger Fragmentierung)
+PREALLOCATE_MIN_SIZE = 8 * 1024 * 1024
+
+# Änderungszeit aller Dateien im Dateispeicher (1.1.1980, Beginn der ZIP-Zeitrechnung)
+STORE_BLOB_MTIME_NS = 315532800 * 1000000000
+
+# Dateien belegen ganze Cluster (NTFS Standard: 4 KB), auch bei der Speicherplatzprüfung
+ALLOCATION_UNIT = 4096
+
+
+class DiskSpaceError(OSError):
+    """Auf dem Ziellaufwerk ist nicht genug Platz für die Installation"""
+
+
+def preallocate_file(target, file_size):
+    """Reserviere den Platz einer großen Zieldatei vor dem Schreiben, gibt True zurück, wenn die Datei verlängert wurde"""
+    if file_size < PREALLOCATE_MIN_SIZE:
+        return False
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(target.fileno(), 0, file_size)
+            return True
+        if os.name == "nt":
+            # SetEndOfFile belegt unter NTFS die Cluster am Stück, ohne Nullen zu schreiben
+            target.truncate(file_size)
+            return True
+    except OSError:
+        # Nicht unterstützt (z.B. Netzlaufwerk): ohne Reservierung schreiben
+        pass
+    return False
+
+
+def trim_preallocated(target):
+    """Kürze eine vorab reservierte Zieldatei nach einem Fehler auf die tatsächlich geschriebenen Bytes"""
+    try:
+        # Position der Datei im OS, ohne den noch gepufferten Rest (der wird beim Schließen angehängt)
+        os.ftruncate(target.fileno(), getattr(target, "raw", target).tell())
+    except (OSError, ValueError):
+        # Datei bereits geschlossen: sie bleibt wie ohne Reservierung unvollständig
+        pass
+
+
+@contextlib.contextmanager
+def preallocated(target, file_size):
+    """Reserviere den Platz einer Zieldatei beim Schreiben, ohne nach einem Fehler Nullen am Ende zu hinterlassen"""
+    extended = preallocate_file(target, file_size)
+    try:
+        yield
+    except BaseException:
+        if extended:
+            trim_preallocated(target)
+        raise
+
+
+def open_unshared(name, flags, dir_fd=None):
+    """Opener für Zieldateien: eine per Hardlink geteilte Datei wird ersetzt statt überschrieben"""
+    # Erst ohne Kürzen öffnen, sonst wäre der Inhalt der anderen Links bereits verloren
+    fd = os.open(name, flags & ~os.O_TRUNC, 0o666, dir_fd=dir_fd)
+    try:
+        stat = os.fstat(fd)
+        if stat.st_nlink > 1:
+            # Dateispeicher und Migration teilen Inhalte per Hardlink: nur diesen Link lösen
+            os.close(fd)
+            fd = None
+            os.unlink(name, dir_fd=dir_fd)
+            return os.open(name, flags, 0o666, dir_fd=dir_fd)
+        if stat.st_size:
+            os.ftruncate(fd, 0)
+    except BaseException:
+        if fd is not None:
+            os.close(fd)
+        raise
+    return fd
+
+
+def open_target_file(target_file_path):
+    """Öffne eine Zieldatei zum Schreiben (ohne andere Hardlinks derselben Datei zu verändern)"""
+    return open(target_file_path, 'wb', opener=open_unshared)
+
+
+def member_size(zip_ref, member):
+    """Unkomprimierte Größe eines ZIP-Elements (ZipInfo oder Name)"""
+    if isinstance(member, zipfile.ZipInfo):
+        return member.file_size
+    return zip_ref.getinfo(member).file_size
+
+
+def extract_member(zip_ref, member, target_file_path, buffer_size=DEFAULT_BUFFER_SIZE, dir_handles=None,
+                   progress=None):
+    """Entpacke ein ZIP-Element blockweise in die Zieldatei (konstanter Speicherbedarf)"""
+    with zip_ref.open(member) as source:
+        target = dir_handles.open_file(target_file_path) if dir_handles else open_target_file(target_file_path)
+        with target, preallocated(target, member_size(zip_ref, member)):
+            if progress is None:
+                shutil.copyfileobj(source, target, buffer_size)
+                return
+            read = source.read
+            write = target.write
+            while True:
+                chunk = read(buffer_size)
+                if not chunk:
+                    break
+                write(chunk)
+                progress.add_bytes(len(chunk))
+
+
+def extract_member_to_targets(zip_ref, member, target_file_paths, buffer_size=DEFAULT_BUFFER_SIZE, progress=None):
+    """Entpacke ein ZIP-Element einmal in mehrere Zieldateien, gibt {Position: Fehler} fehlgeschlagener Ziele zurück"""
+    failed = {}
+    targets = {}
+    extended = set()
+    complete = False
+    try:
+        for position, target_file_path in enumerate(target_file_paths):
+            try:
+                try:
+                    targets[position] = open_target_file(target_file_path)
+                except FileNotFoundError:
+                    # Ordner fehlt (z.B. Archiv seit der Planung geändert): nachträglich anlegen
+                    Path(target_file_path).parent.mkdir(parents=True, exist_ok=True)
+                    targets[position] = open_target_file(target_file_path)
+            except OSError as e:
+                failed[position] = e
+                continue
+            if preallocate_file(targets[position], member_size(zip_ref, member)):
+                extended.add(position)
+
+        with zip_ref.open(member) as source:
+            # Ein Fehler beim Schreiben betrifft nur dieses Ziel, die übrigen werden fertig geschrieben
+            while targets:
+                chunk = source.read(buffer_size)
+                if not chunk:
+                    break
+                for position, target in list(targets.items()):
+                    try:
+                        target.write(chunk)
+                    except OSError as e:
+                        failed[position] = e
+                        del targets[position]
+                        if position in extended:
+                            trim_preallocated(target)
+                        target.close()
+                if progress is not None:
+                    progress.add_bytes(len(chunk) * len(targets))
+        complete = True
+    finally:
+        for position, target in targets.items():
+            if not complete and position in extended:
+                trim_preallocated(target)
+            try:
+                target.close()
+            except OSError as e:
+                failed[position] = e
+    return failed
+
+
+def extract_member_pipelined(zip_ref, member, target_file_path, executor, buffer_size=DEFAULT_BUFFER_SIZE,
+                             dir_handles=None, progress=None, depth=PIPELINE_DEPTH):
+    """Wie extract_member, aber ein Worker-Thread entpackt, während dieser Thread schreibt"""
+    chunks = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        """Übergib einen Block oder Fehler, gibt False zurück, wenn der Schreiber bereits beendet wurde"""
+        while True:
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                # Schreiber wurde mit einem Fehler beendet
+                if stop.is_set():
+                    return False
+
+    def produce():
+        # zlib und CRC32 geben den GIL frei, dadurch überlappen Entpacken und Schreiben
+        try:
+            with zip_ref.open(member) as source:
+                while True:
+                    chunk = source.read(buffer_size)
+                    if not put(chunk) or not chunk:
+                        return
+        except BaseException as e:
+            # Nach einem Schreibfehler wird dieser Fehler nicht mehr abgeholt, der des Schreibers zählt
+            put(e)
+
+    # Zieldatei zuerst öffnen, damit ein fehlender Ordner wie bei extract_member gemeldet wird
+    target = dir_handles.open_file(target_file_path) if dir_handles else open_target_file(target_file_path)
+    with target, preallocated(target, member_size(zip_ref, member)):
+        producer = executor.submit(produce)
+        try:
+            write = target.write
+            while True:
+                chunk = chunks.get()
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                if not chunk:
+                    break
+                write(chunk)
+                if progress is not None:
+                    progress.add_bytes(len(chunk))
+        finally:
+            stop.set()
+            producer.result()
+
+
+def extract_member_profiled(zip_ref, member, target_file_path, profiler, buffer_size=DEFAULT_BUFFER_SIZE,
+                            dir_handles=None, progress=None):
+    """Wie extract_member, misst aber Entpacken und Schreiben getrennt"""
+    clock = time.perf_counter
+    start = clock()
+    decompress_time = 0.0
+    with zip_ref.open(member) as source:
+        decompress_time += clock() - start
+        target = dir_handles.open_file(target_file_path) if dir_handles else open_target_file(target_file_path)
+        with target, preallocated(target, member_size(zip_ref, member)):
+            while True:
+                before_read = clock()
+                chunk = source.read(buffer_size)
+                decompress_time += clock() - before_read
+                if not chunk:
+                    break
+                target.write(chunk)
+                if progress is not None:
+                    progress.add_bytes(len(chunk))
+    end = clock()
+
+    # Alles außer Entpacken (Öffnen, Schreiben, Schließen) zählt als Schreiben
+    write_time = end - start - decompress_time
+    profiler.add_time("decompress", decompress_time)
+    profiler.add_time("write", write_time)
+    profiler.add_event("extract", start, end, {
+        "file": member.filename,
+        "decompress_ms": round(decompress_time * 1000, 3),
+        "write_ms": round(write_time * 1000, 3),
+    })
+
+
+def format_size(size):
+    """Größe in Bytes lesbar formatieren"""
+    if size < 1024:
+        return f"{size} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+
+
+def format_duration(seconds):
+    """Dauer als h:mm:ss bzw. m:ss formatieren"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+# Momentaufnahme des Installationsfortschritts
+ProgressSnapshot = namedtuple("ProgressSnapshot", [
+    "done_bytes", "total_bytes", "done_files", "total_files",
+    "elapsed", "bytes_per_second", "files_per_second", "eta",
+])
+
+
+class InstallProgress:
+    """Fortschritt einer Installation anhand der unkomprimierten Bytes (thread-sicher)"""
+
+    def __init__(self, callback=None, interval=0.5):
+        self.callback = callback
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.start(0, 0)
+
+    def start(self, total_bytes, total_files):
+        """Setze die Gesamtmenge der Installation"""
+        with self.lock:
+            self.total_bytes = total_bytes
+            self.total_files = total_files
+            self.done_bytes = 0
+            self.done_files = 0
+            self.start_time = time.monotonic()
+            self.last_report = 0.0
+
+    def add_bytes(self, count):
+        """Geschriebene Bytes melden"""
+        with self.lock:
+            self.done_bytes += count
+        self.report()
+
+    def file_done(self, skipped_bytes=0):
+        """Eine Datei ist fertig (übersprungene Dateien zählen mit ihrer Größe)"""
+        with self.lock:
+            self.done_files += 1
+            self.done_bytes += skipped_bytes
+        self.report()
+
+    def snapshot(self):
+        """Aktueller Fortschritt mit Durchsatz und geschätzter Restzeit"""
+        with self.lock:
+            done_bytes, total_bytes = self.done_bytes, self.total_bytes
+            done_files, total_files = self.done_files, self.total_files
+            elapsed = time.monotonic() - self.start_time
+        bytes_per_second = done_bytes / elapsed if elapsed > 0 else 0.0
+        files_per_second = done_files / elapsed if elapsed > 0 else 0.0
+        eta = (total_bytes - done_bytes) / bytes_per_second if bytes_per_second > 0 else None
+        return ProgressSnapshot(done_bytes, total_bytes, done_files, total_files,
+                                elapsed, bytes_per_second, files_per_second, eta)
+
+    def report(self, force=False):
+        """Rufe den Callback höchstens alle interval Sekunden auf"""
+        if self.callback is None:
+            return
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_report < self.interval:
+                return
+            self.last_report = now
+        self.callback(self.snapshot())
+
+
+def format_progress(snapshot):
+    """Kompakte Fortschrittszeile: Prozent, Datenmenge, MB/s, Dateien/s und Restzeit"""
+    percent = min(100.0, snapshot.done_bytes * 100.0 / snapshot.total_bytes) if snapshot.total_bytes else 100.0
+    eta = format_duration(snapshot.eta) if snapshot.eta is not None else "--:--"
+    return (f"{percent:5.1f}% | {format_size(snapshot.done_bytes)} / {format_size(snapshot.total_bytes)} | "
+            f"{snapshot.bytes_per_second / (1024 * 1024):.1f} MB/s | "
+            f"{snapshot.files_per_second:.0f} Dateien/s | "
+            f"{snapshot.done_files}/{snapshot.total_files} Dateien | Rest {eta}")
+
+
+class DirectoryHandles:
+    """Offene Verzeichnis-Handles, über die Zieldateien relativ geöffnet werden (falls vom OS unterstützt)"""
+
+    # Unter Windows gibt es kein dir_fd, dort wird mit vollständigen Pfaden geschrieben
+    SUPPORTED = os.open in os.supports_dir_fd and hasattr(os, "O_DIRECTORY")
+
+    def __init__(self, max_handles=64):
+        self.max_handles = max_handles
+        self.handles = OrderedDict()
+
+    def get_handle(self, directory):
+        """Verzeichnis-Handle aus dem Cache (zuletzt benutzte bleiben offen)"""
+        fd = self.handles.get(directory)
+        if fd is not None:
+            self.handles.move_to_end(directory)
+            return fd
+
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        self.handles[directory] = fd
+        if len(self.handles) > self.max_handles:
+            _, oldest_fd = self.handles.popitem(last=False)
+            os.close(oldest_fd)
+        return fd
+
+    def open_file(self, target_file_path):
+        """Öffne eine Zieldatei zum Schreiben"""
+        if not self.SUPPORTED:
+            return open_target_file(target_file_path)
+        fd = self.get_handle(str(target_file_path.parent))
+        return open(target_file_path.name, 'wb', opener=lambda name, flags: open_unshared(name, flags, fd))
+
+    def close(self):
+        """Schließe alle Verzeichnis-Handles"""
+        while self.handles:
+            _, fd = self.handles.popitem()
+            os.close(fd)
+
+
+def file_crc32(file_path, buffer_size=DEFAULT_BUFFER_SIZE):
+    """Berechne die CRC32-Prüfsumme einer Datei blockweise"""
+    crc = 0
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(buffer_size), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc & 0xFFFFFFFF
+
+
+def file_crc32_mapped(file_path, buffer_size=DEFAULT_BUFFER_SIZE, progress=None):
+    """CRC32 einer Datei über eine Speicherabbildung (ohne Kopie in Python-Puffer)"""
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 0
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, OverflowError):
+            # Nicht abbildbar (z.B. Netzlaufwerk oder 32-Bit Python): blockweise lesen
+            return file_crc32(file_path, buffer_size)
+        with mapped:
+            crc = 0
+            # zlib.crc32 gibt den GIL frei, mehrere Dateien werden dadurch wirklich parallel geprüft
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, buffer_size):
+                    chunk = view[offset:offset + buffer_size]
+                    crc = zlib.crc32(chunk, crc)
+                    if progress is not None:
+                        progress.add_bytes(len(chunk))
+                    chunk.release()
+            finally:
+                view.release()
+    return crc & 0xFFFFFFFF
+
+
+def get_state_dir(base_path):
+    """Ordner für Verwaltungsdaten des Installers (im WoT- bzw. ZIP-Ordner)"""
+    return Path(base_path) / STATE_DIR_NAME
+
+
+class FileStateIndex:
+    """Merkt sich Größe, Änderungszeit und CRC32 der installierten Dateien"""
+
+    def __init__(self, wot_base_path):
+        self.state_file = get_state_dir(wot_base_path) / "file_state.json"
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """Lade den gespeicherten Dateistatus"""
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+        except Exception:
+            # Defekter Status: beim nächsten Vergleich wird neu geprüft
+            self.entries = {}
+
+    def save(self):
+        """Speichere den Dateistatus"""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.state_file.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, separators=(',', ':'))
+        os.replace(temp_file, self.state_file)
+
+    def known_crc(self, key, stat):
+        """CRC32 der Datei, falls sie seit dem letzten Eintrag unverändert ist"""
+        entry = self.entries.get(key)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def record(self, key, target_file_path, crc):
+        """Speichere den aktuellen Status einer Zieldatei"""
+        try:
+            stat = os.stat(target_file_path)
+        except OSError:
+            return
+        self.entries[key] = [stat.st_size, stat.st_mtime_ns, crc]
+
+
+# Inhaltsverzeichnis-Eintrag eines Archivs (gleiche Attributnamen wie zipfile.ZipInfo)
+ArchiveEntry = namedtuple("ArchiveEntry", ["filename", "file_size", "CRC", "compress_type", "compress_size"])
+
+
+class ArchiveWindow(io.RawIOBase):
+    """Unkomprimiert gespeicherter ZIP-Eintrag als frei positionierbare Datei (Ausschnitt der äußeren ZIP-Datei)"""
+
+    def __init__(self, file_path, start, length):
+        super().__init__()
+        # Eigenes Handle: unabhängig von der Leseposition des äußeren ZipFile
+        self.file = open(file_path, 'rb')
+        self.start = start
+        self.length = length
+        self.position = 0
+
+    @classmethod
+    def for_member(cls, file_path, archive_offset, info):
+        """Ausschnitt der Daten eines Eintrags (archive_offset: Beginn des Archivs in der Datei)"""
+        window = cls(file_path, 0, 0)
+        try:
+            # Lokaler Header: Name und Extra-Feld können sich vom zentralen Verzeichnis unterscheiden
+            window.file.seek(archive_offset + info.header_offset)
+            header = window.file.read(30)
+            if len(header) != 30 or header[:4] != b"PK\x03\x04":
+                raise zipfile.BadZipFile(f"Ungültiger lokaler Header: {info.filename}")
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            window.start = archive_offset + info.header_offset + 30 + name_length + extra_length
+            window.length = info.compress_size
+        except BaseException:
+            window.close()
+            raise
+        return window
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = min(len(buffer), self.length - self.position)
+        if count <= 0:
+            return 0
+        self.file.seek(self.start + self.position)
+        count = self.file.readinto(memoryview(buffer)[:count])
+        self.position += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.length
+        if offset < 0:
+            raise ValueError(f"Negative Position: {offset}")
+        self.position = offset
+        return offset
+
+    def tell(self):
+        return self.position
+
+    def close(self):
+        if not self.closed:
+            self.file.close()
+        super().close()
+
+
+def is_nested_archive(member):
+    """Prüfe ob ein ZIP-Eintrag selbst eine Mod-ZIP-Datei ist (.wotmod Pakete bleiben unverändert)"""
+    return member.lower().endswith(".zip")
+
+
+def list_archive_members(zip_ref, stack, file_path=None, archive_offset=0, depth=0):
+    """Dateien eines Archivs als (ZipFile, ZipInfo), verschachtelte ZIP-Dateien an ihrer Stelle aufgelöst"""
+    # Innere Archive bleiben bis zum Schließen von stack geöffnet, ihre Pfade gelten wie die des äußeren
+    members = []
+    for info in zip_ref.infolist():
+        if is_directory_member(info.filename):
+            continue
+        if depth >= NESTED_ARCHIVE_MAX_DEPTH or not is_nested_archive(info.filename):
+            members.append((zip_ref, info))
+            continue
+
+        if file_path is not None and info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1:
+            # Unkomprimiert: direkt aus der äußeren Datei lesen, Positionieren ohne erneutes Entpacken
+            window = stack.enter_context(ArchiveWindow.for_member(file_path, archive_offset, info))
+            inner_path, inner_offset = file_path, window.start
+            source = window
+        else:
+            # Komprimiert: zipfile entpackt beim Zurückspringen erneut (blockweise, ohne temporäre Datei)
+            inner_path, inner_offset = None, 0
+            source = stack.enter_context(zip_ref.open(info))
+        try:
+            inner_ref = stack.enter_context(zipfile.ZipFile(source, 'r'))
+        except zipfile.BadZipFile:
+            # Keine gültige ZIP-Datei: wie bisher als normale Datei installieren
+            members.append((zip_ref, info))
+            continue
+        members.extend(list_archive_members(inner_ref, stack, inner_path, inner_offset, depth + 1))
+    return members
+
+
+def read_archive_entries(zip_file_path, index_cache=None):
+    """Lese das Inhaltsverzeichnis einer ZIP-Datei samt verschachtelter ZIP-Dateien (Index-Cache falls vorhanden)"""
+    if index_cache is not None:
+        return index_cache.get_entries(zip_file_path)
+    with contextlib.ExitStack() as stack:
+        zip_ref = stack.enter_context(zipfile.ZipFile(zip_file_path, 'r'))
+        return [ArchiveEntry(info.filename, info.file_size, info.CRC, info.compress_type, info.compress_size)
+                for _, info in list_archive_members(zip_ref, stack, zip_file_path)]
+
+
+def scan_zip_folder(zip_folder):
+    """Finde alle ZIP-Dateien eines Ordners sortiert nach Namen (ein Verzeichnisdurchlauf)"""
+    with os.scandir(zip_folder) as it:
+        zip_files = [Path(entry.path) for entry in it
+                     if entry.name.lower().endswith(".zip") and entry.is_file()]
+    zip_files.sort()
+    return zip_files
+
+
+# Versionsordner der Spielinstallation (Format: x.x.x.x)
+GAME_VERSION_PATTERN = re.compile(r'^\d+\.\d+\.\d+\.\d+$')
+
+
+def find_game_versions(wot_path):
+    """Versionsordner im mods-Ordner, neueste zuerst (None, wenn es keinen mods-Ordner gibt)"""
+    try:
+        with os.scandir(Path(wot_path) / "mods") as it:
+            versions = [entry.name for entry in it if GAME_VERSION_PATTERN.match(entry.name) and entry.is_dir()]
+    except FileNotFoundError:
+        return None
+    versions.sort(key=lambda x: [int(n) for n in x.split('.')], reverse=True)
+    return versions
+
+
+def scan_directory(directory):
+    """Ein Ordner ohne Rekursion: (Größe der Dateien, Anzahl Dateien, Unterordner), Symlinks werden nicht verfolgt"""
+    size = files = 0
+    subdirs = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        # Unter Windows liefert scandir die Größe ohne zusätzlichen Systemaufruf
+                        size += entry.stat(follow_symlinks=False).st_size
+                        files += 1
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return size, files, subdirs
+
+
+def measure_directories(directories, jobs=0):
+    """Größe und Anzahl Dateien mehrerer Ordner, alle Unterordner parallel per os.scandir: Ordner -> (Größe, Dateien)"""
+    totals = {directory: [0, 0] for directory in directories}
+    # Verzeichniszugriffe warten meist auf das Laufwerk: standardmäßig mehr Threads als CPU-Kerne
+    workers = jobs if jobs and jobs > 0 else min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Jeder Unterordner ist eine eigene Aufgabe, die Zuordnung zum Ausgangsordner bleibt erhalten
+        pending = {executor.submit(scan_directory, directory): directory for directory in directories}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                root = pending.pop(future)
+                size, files, subdirs = future.result()
+                totals[root][0] += size
+                totals[root][1] += files
+                for subdir in subdirs:
+                    pending[executor.submit(scan_directory, subdir)] = root
+    return {directory: tuple(total) for directory, total in totals.items()}
+
+
+# Versionsordner in mods/ bzw. res_mods/ mit Größe, keep: bleibt bei der Bereinigung erhalten
+VersionFolder = namedtuple("VersionFolder", ["version", "path", "size", "files", "keep"])
+
+
+def find_version_folders(wot_path, keep=1, jobs=0):
+    """Alle Versionsordner in mods/ und res_mods/ mit Größe, neueste zuerst (die neuesten keep bleiben erhalten)"""
+    wot_path = Path(wot_path)
+    folders = []
+    for parent in ("mods", "res_mods"):
+        try:
+            with os.scandir(wot_path / parent) as it:
+                folders.extend((entry.name, Path(entry.path)) for entry in it
+                               if GAME_VERSION_PATTERN.match(entry.name) and entry.is_dir(follow_symlinks=False))
+        except FileNotFoundError:
+            continue
+
+    versions = sorted({version for version, _ in folders}, key=lambda x: [int(n) for n in x.split('.')],
+                      reverse=True)
+    kept = set(versions[:max(keep, 1)])
+    # Die erkannte Spielversion (neuester Ordner in mods/) wird nie gelöscht
+    current = find_game_versions(wot_path)
+    if current:
+        kept.add(current[0])
+
+    sizes = measure_directories([path for _, path in folders], jobs)
+    # Neueste Version zuerst, je Version mods/ vor res_mods/
+    folders.sort(key=lambda folder: folder[1].parent.name)
+    folders.sort(key=lambda folder: [int(n) for n in folder[0].split('.')], reverse=True)
+    return [VersionFolder(version, path, *sizes[path], version in kept) for version, path in folders]
+
+
+def remove_version_folders(folders, log=print):
+    """Lösche Versionsordner, gibt die freigegebenen Bytes zurück"""
+    freed = 0
+    for folder in folders:
+        try:
+            shutil.rmtree(folder.path)
+        except OSError as e:
+            log(f"✗ Fehler beim Löschen von {folder.path}: {e}")
+            continue
+        freed += folder.size
+        log(f"Gelöscht: {folder.path} ({format_size(folder.size)})")
+    return freed
+
+
+class ArchiveIndexCache:
+    """Zwischenspeicher der ZIP-Inhaltsverzeichnisse, gültig solange Größe und Änderungszeit gleich bleiben"""
+
+    def __init__(self, zip_folder):
+        self.zip_folder = Path(zip_folder)
+        self.cache_file = get_state_dir(zip_folder) / "archive_index.json"
+        self.archives = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Lade den gespeicherten Index"""
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    self.archives = json.load(f)
+        except Exception:
+            # Defekter Cache: Archive werden neu eingelesen
+            self.archives = {}
+
+    def save(self):
+        """Speichere den Index, falls er sich geändert hat"""
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                temp_file = self.cache_file.with_suffix(".tmp")
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.archives, f, separators=(',', ':'))
+                os.replace(temp_file, self.cache_file)
+                self.dirty = False
+            except OSError:
+                # Schreibgeschützter ZIP-Ordner: Cache gilt nur für diese Sitzung
+                pass
+
+    def cache_key(self, zip_file_path):
+        """Schlüssel eines Archivs (relativ zum ZIP-Ordner, sonst absolut)"""
+        zip_file_path = Path(zip_file_path)
+        if zip_file_path.parent == self.zip_folder:
+            return zip_file_path.name
+        return os.path.normcase(os.path.abspath(zip_file_path))
+
+    def get_entries(self, zip_file_path):
+        """Inhaltsverzeichnis eines Archivs, bei Änderung wird es neu eingelesen"""
+        stat = os.stat(zip_file_path)
+        key = self.cache_key(zip_file_path)
+
+        cached = self.archives.get(key)
+        if (cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns
+                and cached.get("format") == ARCHIVE_INDEX_FORMAT):
+            return [ArchiveEntry(*entry) for entry in cached["entries"]]
+
+        entries = read_archive_entries(zip_file_path)
+        with self.lock:
+            self.archives[key] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "format": ARCHIVE_INDEX_FORMAT,
+                "entries": [list(entry) for entry in entries],
+            }
+            self.dirty = True
+        return entries
+
+    def prune(self, zip_files):
+        """Entferne Archive aus dem Index, die nicht mehr im Ordner liegen"""
+        keep = {self.cache_key(zip_file) for zip_file in zip_files}
+        with self.lock:
+            for key in [key for key in self.archives if key not in keep]:
+                del self.archives[key]
+                self.dirty = True
+
+
+class PathRewriter:
+    """Vorkompilierte Regeln zur Ersetzung der Spielversion in Dateipfaden"""
+
+    # Existierende Versionsnummern im mods/ Ordner (z.B. mods/1.2.3.4/)
+    FORWARD_VERSION_PATTERN = re.compile(r'mods/\d+\.\d+\.\d+\.\d+/')
+    BACKSLASH_VERSION_PATTERN = re.compile(r'mods\\\d+\.\d+\.\d+\.\d+\\')
+
+    def __init__(self, current_version):
+        self.current_version = current_version
+        self.forward_placeholder = f"/{current_version}/"
+        self.backslash_placeholder = f"\\{current_version}\\"
+        # Ersetzung als Text (nicht als Regex-Vorlage, "\1" wäre sonst eine Gruppenreferenz)
+        forward_folder = f"mods/{current_version}/"
+        backslash_folder = f"mods\\{current_version}\\"
+        self.forward_folder = lambda match: forward_folder
+        self.backslash_folder = lambda match: backslash_folder
+
+    def rewrite(self, file_path):
+        """Intelligente Versionserkennung und -ersetzung für einen Dateipfad"""
+        # 1. Ersetze expliziten "version" Platzhalter
+        if "/version/" in file_path or "\\version\\" in file_path:
+            return (file_path.replace("/version/", self.forward_placeholder)
+                    .replace("\\version\\", self.backslash_placeholder))
+
+        # 2. Erkenne und ersetze existierende Versionsnummern im mods/ Ordner
+        if "mods/" in file_path:
+            new_path, count = self.FORWARD_VERSION_PATTERN.subn(self.forward_folder, file_path)
+            if count:
+                return new_path
+        if "mods\\" in file_path:
+            new_path, count = self.BACKSLASH_VERSION_PATTERN.subn(self.backslash_folder, file_path)
+            if count:
+                return new_path
+
+        # 3. Keine Änderung nötig
+        return file_path
+
+    def map_targets(self, names):
+        """Ordne alle Dateien einer namelist() in einem Durchlauf ihren Zielpfaden zu (ohne Ordner)"""
+        rewrite = self.rewrite
+        return [(name, rewrite(name)) for name in names
+                if not (name.endswith('/') or name.endswith('\\'))]
+
+
+@lru_cache(maxsize=8)
+def get_path_rewriter(current_version):
+    """Gemeinsamer PathRewriter pro Spielversion"""
+    return PathRewriter(current_version)
+
+
+def is_directory_member(member):
+    """Prüfe ob ein ZIP-Eintrag ein Ordner ist"""
+    return member.endswith('/') or member.endswith('\\')
+
+
+def target_key(target_path):
+    """Normalisierter Schlüssel für einen Zielpfad (unter Windows ohne Groß-/Kleinschreibung)"""
+    return os.path.normcase(os.path.normpath(target_path))
+
+
+class InstallTransaction:
+    """Entpackt in ein Staging-Verzeichnis und übernimmt die Dateien per Umbenennen (mit Journal für Rollback)"""
+
+    def __init__(self, wot_base_path):
+        self.wot_base_path = Path(wot_base_path)
+        self.transaction_dir = get_state_dir(wot_base_path) / "transaction"
+        self.staging_dir = self.transaction_dir / "staging"
+        self.backup_dir = self.transaction_dir / "backup"
+        self.journal_file = self.transaction_dir / "journal.jsonl"
+
+        # Zielpfad-Schlüssel -> (Zieldatei, Staging-Datei, CRC32)
+        self.staged = {}
+        self.created_dirs = []
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def read_journal(self):
+        """Lese das Journal: (Status, Kopfzeile, Schritte)"""
+        state, header, steps = None, {}, []
+        if not self.journal_file.exists():
+            return state, header, steps
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Unvollständige letzte Zeile nach einem Absturz
+                    break
+                if "state" in record:
+                    state = record["state"]
+                    if "created_dirs" in record:
+                        header = record
+                else:
+                    steps.append(record)
+        return state, header, steps
+
+    def begin(self, log=print):
+        """Starte eine neue Transaktion (eine abgebrochene Übernahme wird vorher zurückgerollt)"""
+        state, _, _ = self.read_journal()
+        if state == "committing":
+            log("Unvollständige Installation gefunden, wird zurückgerollt...")
+            self.rollback()
+
+        # Die vorherige Transaktion kann ab jetzt nicht mehr rückgängig gemacht werden
+        shutil.rmtree(self.transaction_dir, ignore_errors=True)
+        self.staging_dir.mkdir(parents=True)
+        self.backup_dir.mkdir()
+
+    def is_staged(self, key):
+        """Wurde der Zielpfad in dieser Transaktion bereits bereitgestellt?"""
+        return key in self.staged
+
+    def stage_path(self, key, full_target_path, crc):
+        """Staging-Datei für einen Zielpfad (ein späteres Archiv ersetzt eine frühere Version)"""
+        staged_path = self.staging_dir / str(next(self.counter))
+        with self.lock:
+            previous = self.staged.get(key)
+            self.staged[key] = (full_target_path, staged_path, crc)
+        if previous is not None:
+            try:
+                os.remove(previous[1])
+            except OSError:
+                pass
+        return staged_path
+
+    def add_created_dirs(self, directories):
+        """Merke neu angelegte Zielordner (werden beim Rollback entfernt, falls leer)"""
+        self.created_dirs.extend(str(directory) for directory in directories)
+
+    def commit(self, on_committed=None, manifests=None):
+        """Übernehme alle Dateien per Umbenennen, bei einem Fehler wird zurückgerollt
+
+        manifests: Archivname -> bisheriges Manifest (None, falls neu), wird beim Rollback wiederhergestellt
+        """
+        try:
+            with open(self.journal_file, 'w', encoding='utf-8') as journal:
+                journal.write(json.dumps({"state": "committing", "created_dirs": self.created_dirs,
+                                          "manifests": manifests or {}}) + "\n")
+                for key, (full_target_path, staged_path, crc) in self.staged.items():
+                    backup_path = None
+                    if os.path.lexists(full_target_path):
+                        backup_path = self.backup_dir / staged_path.name
+
+                    # Umbenennen erhält Größe und Änderungszeit: daran erkennt der Rollback spätere Änderungen
+                    stat = os.stat(staged_path)
+
+                    # Write-Ahead: erst protokollieren, dann umbenennen
+                    journal.write(json.dumps({
+                        "key": key,
+                        "target": str(full_target_path),
+                        "staged": str(staged_path),
+                        "backup": str(backup_path) if backup_path else None,
+                        "size": stat.st_size,
+                        "mtime_ns": stat.st_mtime_ns,
+                    }) + "\n")
+                    journal.flush()
+
+                    if backup_path is not None:
+                        os.replace(full_target_path, backup_path)
+                    os.replace(staged_path, full_target_path)
+                    if on_committed is not None:
+                        on_committed(key, full_target_path, crc)
+
+                journal.write(json.dumps({"state": "committed"}) + "\n")
+        except Exception:
+            self.rollback()
+            raise
+
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        return len(self.staged)
+
+    def abort(self):
+        """Verwerfe die Transaktion, der WoT Ordner bleibt unverändert"""
+        shutil.rmtree(self.transaction_dir, ignore_errors=True)
+        self.remove_created_dirs(self.created_dirs)
+
+    @staticmethod
+    def is_unchanged(step):
+        """Ist die übernommene Zieldatei seitdem unverändert (keine spätere Installation, keine Bearbeitung)?"""
+        try:
+            stat = os.stat(step["target"])
+        except FileNotFoundError:
+            return True
+        # Journale ohne Größe und Änderungszeit (ältere Versionen) gelten als unverändert
+        return stat.st_size == step.get("size", stat.st_size) and stat.st_mtime_ns == step.get("mtime_ns", stat.st_mtime_ns)
+
+    def rollback(self):
+        """Mache die letzte (auch teilweise) Übernahme anhand des Journals rückgängig
+
+        Seit der Übernahme veränderte Dateien (z.B. von einer späteren Installation) bleiben erhalten.
+        """
+        state, header, steps = self.read_journal()
+        if state not in ("committing", "committed"):
+            return RollbackResult(0, [])
+
+        restored = 0
+        skipped = []
+        undone_keys = []
+        for step in reversed(steps):
+            target = step["target"]
+            if step["backup"] is not None:
+                # Fehlt das Backup, wurde die ursprüngliche Datei nie verschoben
+                if not os.path.lexists(step["backup"]):
+                    continue
+                if not self.is_unchanged(step):
+                    skipped.append(target)
+                    continue
+                # Ursprüngliche Datei zurückholen
+                os.replace(step["backup"], target)
+            elif not os.path.lexists(step["staged"]) and os.path.lexists(target):
+                if not self.is_unchanged(step):
+                    skipped.append(target)
+                    continue
+                # Neu hinzugefügte Datei entfernen (nur falls sie bereits übernommen wurde)
+                os.remove(target)
+            else:
+                continue
+            restored += 1
+            if "key" in step:
+                undone_keys.append(step["key"])
+
+        self.restore_state(header.get("manifests", {}), undone_keys)
+        self.remove_created_dirs(header.get("created_dirs", []))
+        shutil.rmtree(self.transaction_dir, ignore_errors=True)
+        return RollbackResult(restored, skipped[::-1])
+
+    def restore_state(self, manifests, undone_keys):
+        """Stelle die Manifeste vor der Transaktion wieder her und vergiss den Status zurückgerollter Dateien"""
+        manifest_store = ManifestStore(self.wot_base_path)
+        for archive_name, manifest in manifests.items():
+            if manifest is None:
+                manifest_store.remove(archive_name)
+            else:
+                manifest_store.save(archive_name, manifest["version"], manifest["sequence"], manifest["files"])
+
+        if not undone_keys:
+            return
+        file_state = FileStateIndex(self.wot_base_path)
+        if not file_state.state_file.exists():
+            return
+        for key in undone_keys:
+            file_state.entries.pop(key, None)
+        file_state.save()
+
+    @staticmethod
+    def remove_created_dirs(directories):
+        """Entferne leere, neu angelegte Ordner (tiefste zuerst)"""
+        for directory in sorted(directories, key=lambda d: len(Path(d).parts), reverse=True):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+
+
+# Ergebnis eines Rollbacks: Anzahl wiederhergestellter bzw. entfernter Dateien, seitdem veränderte Zielpfade
+RollbackResult = namedtuple("RollbackResult", "restored skipped")
+
+# Ergebnis einer Deinstallation: gelöschte, bereits fehlende und nicht gelöschte Dateien (Pfad, Grund)
+UninstallResult = namedtuple("UninstallResult", "removed missing refused")
+
+# Ergebnis einer Versionsmigration: übernommene Archive, verlinkte/verschobene Dateien, neu zu installierende Archive
+MigrationResult = namedtuple("MigrationResult", "migrated files reinstall")
+
+# Versionsordner direkt unter mods bzw. res_mods (werden beim Aufräumen nie entfernt)
+VERSION_DIR_PATTERN = re.compile(r'\d+(?:\.\d+)+')
+
+
+def version_target_path(file_path, old_version, new_version):
+    """Zielpfad im neuen Versionsordner, None falls der Pfad nicht versionsabhängig ist"""
+    parts = file_path.replace("\\", "/").split("/")
+    if len(parts) > 2 and parts[0] in ("mods", "res_mods") and parts[1] == old_version:
+        parts[1] = new_version
+        return "/".join(parts)
+    return None
+
+
+def place_file(source_path, target_path, move=False):
+    """Übernehme eine Datei per Hardlink (bzw. Umbenennen), Kopie nur falls Hardlinks nicht möglich sind"""
+    if move:
+        os.replace(source_path, target_path)
+        return
+
+    temp_path = target_path.with_name(target_path.name + ".tmp")
+    try:
+        os.link(source_path, temp_path)
+    except FileExistsError:
+        os.remove(temp_path)
+        os.link(source_path, temp_path)
+    except OSError:
+        # z.B. FAT32 oder anderes Laufwerk
+        shutil.copy2(source_path, temp_path)
+    os.replace(temp_path, target_path)
+
+
+class ManifestStore:
+    """Manifeste der installierten ZIP-Dateien: Zielpfad, Größe und CRC32 jeder Datei"""
+
+    def __init__(self, wot_base_path):
+        self.wot_base_path = Path(wot_base_path)
+        self.manifest_dir = get_state_dir(wot_base_path) / "manifests"
+
+    def manifest_path(self, archive_name):
+        """Manifest-Datei eines Archivs"""
+        return self.manifest_dir / f"{archive_name}.json"
+
+    def save(self, archive_name, version, sequence, files):
+        """Speichere das Manifest eines Archivs (ersetzt ein älteres Manifest desselben Archivs)"""
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {"archive": archive_name, "version": version, "sequence": sequence, "files": files}
+        manifest_path = self.manifest_path(archive_name)
+        temp_file = manifest_path.with_suffix(".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        os.replace(temp_file, manifest_path)
+
+    def load(self, archive_name):
+        """Manifest eines Archivs, None falls es nicht installiert ist"""
+        try:
+            with open(self.manifest_path(archive_name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # Defektes Manifest: wie nicht installiert behandeln
+            return None
+
+    def remove(self, archive_name):
+        """Lösche das Manifest eines Archivs (die installierten Dateien bleiben unverändert)"""
+        try:
+            os.remove(self.manifest_path(archive_name))
+        except FileNotFoundError:
+            pass
+
+    def load_all(self):
+        """Lade alle Manifeste: Archivname -> Manifest"""
+        manifests = {}
+        try:
+            entries = list(os.scandir(self.manifest_dir))
+        except FileNotFoundError:
+            return manifests
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                manifests[manifest["archive"]] = manifest
+            except (OSError, ValueError, KeyError):
+                pass
+        return manifests
+
+    def installed_archives(self):
+        """Namen der installierten Archive (in Installationsreihenfolge)"""
+        manifests = self.load_all()
+        return sorted(manifests, key=lambda name: manifests[name]["sequence"])
+
+    def is_protected_dir(self, directory):
+        """WoT-Hauptordner, mods/res_mods und deren Versionsordner bleiben immer erhalten"""
+        try:
+            parts = directory.relative_to(self.wot_base_path).parts
+        except ValueError:
+            return True
+        return len(parts) <= 1 or (len(parts) == 2 and VERSION_DIR_PATTERN.fullmatch(parts[1]) is not None)
+
+    def uninstall(self, archive_name, dry_run=False):
+        """Lösche genau die Dateien eines Archivs, die seitdem kein anderes Archiv überschrieben hat"""
+        manifests = self.load_all()
+        manifest = manifests.get(archive_name)
+        if manifest is None:
+            raise KeyError(archive_name)
+
+        # Zielpfade, die ein später installiertes Archiv geschrieben hat
+        newer_owners = {}
+        for other in manifests.values():
+            if other["archive"] != archive_name and other["sequence"] > manifest["sequence"]:
+                for file_path, _, _ in other["files"]:
+                    newer_owners[target_key(file_path)] = other["archive"]
+
+        removed, missing, refused = [], [], []
+        for file_path, file_size, crc in manifest["files"]:
+            owner = newer_owners.get(target_key(file_path))
+            if owner is not None:
+                refused.append((file_path, f"überschrieben von {owner}"))
+                continue
+
+            full_path = self.wot_base_path / file_path
+            try:
+                stat = os.stat(full_path)
+            except FileNotFoundError:
+                missing.append(file_path)
+                continue
+            # Gleiche Größe reicht nicht: auch von Hand ersetzte Dateien gleicher Größe bleiben erhalten
+            if stat.st_size != file_size or file_crc32(full_path) != crc:
+                refused.append((file_path, "seit der Installation verändert"))
+                continue
+
+            if not dry_run:
+                os.remove(full_path)
+            removed.append(file_path)
+
+        if not dry_run:
+            self.prune_directories(removed)
+            self.remove(archive_name)
+
+        return UninstallResult(removed, missing, refused)
+
+    def planned_targets(self, zip_file_path, new_version, index_cache=None):
+        """Zielpfade einer Neuinstallation des Archivs für die neue Version, None falls die ZIP-Datei fehlt"""
+        try:
+            entries = read_archive_entries(zip_file_path, index_cache)
+        except (OSError, zipfile.BadZipFile):
+            return None
+        targets = get_path_rewriter(new_version).map_targets([entry.filename for entry in entries])
+        return {target_key(target_path.replace("\\", "/")) for _, target_path in targets}
+
+    def migrate(self, new_version, move=False, log=print, zip_folder=None, index_cache=None):
+        """Übernehme installierte Dateien älterer Versionsordner in den neuen Versionsordner ohne neu zu entpacken"""
+        manifests = self.load_all()
+
+        archive_names = sorted(manifests, key=lambda name: manifests[name]["sequence"])
+
+        # Zielpfade, die bereits für die neue Version installiert wurden, bleiben unangetastet
+        current_targets = set()
+        # Alter Zielpfad -> Archiv, das ihn zuletzt geschrieben hat (nur dieses übernimmt die Datei)
+        old_owners = {}
+        for archive_name in archive_names:
+            manifest = manifests[archive_name]
+            for file_path, _, _ in manifest["files"]:
+                if manifest["version"] == new_version:
+                    current_targets.add(target_key(file_path))
+                else:
+                    old_owners[target_key(file_path)] = archive_name
+
+        migrated, reinstall = [], []
+        file_count = 0
+        for archive_name in archive_names:
+            manifest = manifests[archive_name]
+            old_version = manifest["version"]
+            if old_version == new_version:
+                continue
+
+            files, plan = [], []
+            complete = True
+            for file_path, file_size, crc in manifest["files"]:
+                new_path = version_target_path(file_path, old_version, new_version)
+                if new_path is None:
+                    # Nicht versionsabhängig (z.B. mods/configs): bleibt wo es ist
+                    files.append([file_path, file_size, crc])
+                    continue
+                files.append([new_path, file_size, crc])
+                if target_key(new_path) in current_targets or old_owners.get(target_key(file_path)) != archive_name:
+                    continue
+
+                # Fehlende oder veränderte Dateien: Archiv muss neu entpackt werden
+                source_path = self.wot_base_path / file_path
+                try:
+                    stat = os.stat(source_path)
+                except FileNotFoundError:
+                    complete = False
+                    break
+                if stat.st_size != file_size:
+                    complete = False
+                    break
+                plan.append((source_path, self.wot_base_path / new_path))
+
+            if complete and zip_folder is not None:
+                # Versionsabhängig: eine Neuinstallation legt Dateien anders ab als das Umbenennen des
+                # Versionsordners (z.B. Platzhalter außerhalb von mods/<Version>/ wie res_mods/configs/version/)
+                planned = self.planned_targets(Path(zip_folder) / archive_name, new_version, index_cache)
+                if planned is not None and any(target_key(file_path.replace("\\", "/")) not in planned
+                                               for file_path, _, _ in files):
+                    log(f"{archive_name}: Zielpfade für Version {new_version} weichen ab, wird neu entpackt")
+                    complete = False
+
+            if not complete:
+                reinstall.append(archive_name)
+                continue
+
+            for directory in {target_path.parent for _, target_path in plan}:
+                directory.mkdir(parents=True, exist_ok=True)
+            for source_path, target_path in plan:
+                place_file(source_path, target_path, move)
+            if move:
+                self.prune_directories([source_path.relative_to(self.wot_base_path) for source_path, _ in plan])
+
+            # Reihenfolge bleibt erhalten, damit Überschreibungen bei der Deinstallation stimmen
+            self.save(archive_name, new_version, manifest["sequence"], files)
+            migrated.append(archive_name)
+            file_count += len(plan)
+            log(f"✓ {archive_name}: {len(plan)} Datei(en) von {old_version} übernommen")
+
+        return MigrationResult(migrated, file_count, reinstall)
+
+    def prune_directories(self, removed_files):
+        """Entferne leer gewordene Ordner der gelöschten Dateien (tiefste zuerst)"""
+        directories = set()
+        for file_path in removed_files:
+            directory = (self.wot_base_path / file_path).parent
+            while directory not in directories and not self.is_protected_dir(directory):
+                directories.add(directory)
+                directory = directory.parent
+
+        for directory in sorted(directories, key=lambda d: len(d.parts), reverse=True):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                # Nicht leer (z.B. Dateien anderer Mods) oder gesperrt
+                pass
+
+
+class ContentStore:
+    """Inhaltsadressierter Dateispeicher: jede entpackte Datei nur einmal, Bereitstellung per Hardlink"""
+
+    def __init__(self, zip_folder):
+        self.store_dir = get_state_dir(zip_folder) / "store"
+        self.created_dirs = set()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def blob_path(self, info):
+        """Speicherpfad eines ZIP-Eintrags (Schlüssel: CRC32 und Größe aus dem ZIP-Verzeichnis)"""
+        key = f"{info.CRC:08x}-{info.file_size}"
+        return self.store_dir / key[:2] / key
+
+    def lookup(self, info):
+        """Gespeicherte Datei, falls vorhanden und unverändert"""
+        blob_path = self.blob_path(info)
+        try:
+            stat = os.stat(blob_path)
+        except FileNotFoundError:
+            return None
+        # Über einen Hardlink direkt veränderte Dateien erkennt man an Größe bzw. Änderungszeit
+        if stat.st_size != info.file_size or stat.st_mtime_ns != STORE_BLOB_MTIME_NS:
+            return None
+        return blob_path
+
+    def add(self, zip_ref, info, buffer_size=DEFAULT_BUFFER_SIZE, progress=None):
+        """Entpacke einen ZIP-Eintrag in den Speicher"""
+        blob_path = self.blob_path(info)
+        if blob_path.parent not in self.created_dirs:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            self.created_dirs.add(blob_path.parent)
+
+        # Eindeutige temporäre Datei, falls parallele Installationen denselben Inhalt speichern
+        temp_path = blob_path.with_name(f"{blob_path.name}.{threading.get_ident()}.tmp")
+        extract_member(zip_ref, info, temp_path, buffer_size, progress=progress)
+        # Feste Änderungszeit: gleicher Inhalt aus Archiven mit verschiedenen Zeitstempeln bleibt ein Treffer
+        os.utime(temp_path, ns=(STORE_BLOB_MTIME_NS, STORE_BLOB_MTIME_NS))
+        os.replace(temp_path, blob_path)
+        return blob_path
+
+    def deploy(self, zip_ref, info, target_path, buffer_size=DEFAULT_BUFFER_SIZE, progress=None):
+        """Stelle einen ZIP-Eintrag per Hardlink aus dem Speicher bereit, gibt True bei einem Treffer zurück"""
+        blob_path = self.lookup(info)
+        hit = blob_path is not None
+        if not hit:
+            blob_path = self.add(zip_ref, info, buffer_size, progress)
+
+        # Hardlink, über Laufwerksgrenzen hinweg eine Kopie
+        place_file(blob_path, target_path)
+
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return hit
+
+
+# Ein Eintrag im Konfliktbericht: welches Archiv schreibt welchen Zielpfad
+ConflictEntry = namedtuple("ConflictEntry", ["archive", "member", "target_path", "file_size", "CRC"])
+
+
+def find_conflicts(zip_files, current_version, index_cache=None):
+    """Finde Zielpfade, die von mehreren Archiven geschrieben werden (ein Durchlauf über einen Hash-Index)"""
+    rewriter = get_path_rewriter(current_version)
+    first_seen = {}
+    conflicts = {}
+
+    for zip_file_path in zip_files:
+        archive = Path(zip_file_path).name
+        try:
+            entries = [entry for entry in read_archive_entries(zip_file_path, index_cache)
+                       if not is_directory_member(entry.filename)]
+        except Exception:
+            # Defekte Archive werden von Vorschau bzw. Installation gemeldet
+            continue
+
+        targets = rewriter.map_targets([entry.filename for entry in entries])
+        for entry, (member, target_path) in zip(entries, targets):
+            key = target_key(target_path)
+            # Einfache Tupel im Index, ConflictEntry/Listen nur für tatsächliche Mehrfachtreffer
+            item = (archive, member, target_path, entry.file_size, entry.CRC)
+            first = first_seen.setdefault(key, item)
+            if first is not item:
+                if key not in conflicts:
+                    conflicts[key] = [ConflictEntry(*first)]
+                conflicts[key].append(ConflictEntry(*item))
+
+    # Nur Konflikte zwischen verschiedenen Archiven, Reihenfolge = Installationsreihenfolge
+    return [items for key, items in sorted(conflicts.items())
+            if len({item.archive for item in items}) > 1]
+
+
+def with_later_winners(changed_files, zip_files, current_version, index_cache=None):
+    """Ergänze geänderte Archive um spätere Archive, die gemeinsame Zielpfade wieder überschreiben müssen"""
+    changed = {Path(zip_file_path).name for zip_file_path in changed_files}
+    selected = set(changed)
+    for items in find_conflicts(zip_files, current_version, index_cache):
+        archives = [item.archive for item in items]
+        first_changed = next((i for i, archive in enumerate(archives) if archive in changed), None)
+        if first_changed is not None:
+            # Das letzte Archiv gewinnt: alle danach folgenden Archive erneut anwenden
+            selected.update(archives[first_changed + 1:])
+    return [Path(zip_file_path) for zip_file_path in zip_files if Path(zip_file_path).name in selected]
+
+
+class FolderWatcher:
+    """Erkennt neue oder geänderte ZIP-Dateien per Polling über Größe und Änderungszeit (ohne externe Abhängigkeiten)"""
+
+    def __init__(self, zip_folder, debounce=3.0, clock=time.monotonic):
+        self.zip_folder = Path(zip_folder)
+        self.debounce = debounce
+        self.clock = clock
+        # Stand beim Start gilt als installiert
+        self.known = self.scan()
+        # Name -> (Signatur, seit wann unverändert)
+        self.pending = {}
+
+    def scan(self):
+        """Signaturen (Größe, Änderungszeit) aller ZIP-Dateien in einem Verzeichnisdurchlauf"""
+        signatures = {}
+        with os.scandir(self.zip_folder) as it:
+            for entry in it:
+                if entry.name.lower().endswith(".zip") and entry.is_file():
+                    # Unter Windows liefert scandir die Werte ohne zusätzlichen Systemaufruf
+                    stat = entry.stat()
+                    signatures[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return signatures
+
+    def poll(self):
+        """ZIP-Dateien, die hinzugekommen oder geändert sind und seit der Wartezeit unverändert blieben"""
+        now = self.clock()
+        try:
+            current = self.scan()
+        except OSError:
+            return []
+
+        # Gelöschte Archive vergessen
+        for name in [name for name in self.known if name not in current]:
+            del self.known[name]
+        for name in [name for name in self.pending if name not in current]:
+            del self.pending[name]
+
+        ready = []
+        for name, signature in current.items():
+            if self.known.get(name) == signature:
+                self.pending.pop(name, None)
+                continue
+            pending = self.pending.get(name)
+            if pending is None or pending[0] != signature:
+                # Neu oder noch in Bearbeitung (z.B. Kopiervorgang): Wartezeit neu starten
+                self.pending[name] = (signature, now)
+            elif now - pending[1] >= self.debounce:
+                ready.append(name)
+
+        for name in ready:
+            self.known[name] = current[name]
+            del self.pending[name]
+        return sorted(self.zip_folder / name for name in ready)
+
+
+def iter_conflict_report(conflicts):
+    """Zeilen des Konfliktberichts (das letzte Archiv gewinnt)"""
+    if not conflicts:
+        yield "Keine Konflikte: kein Zielpfad wird von mehreren ZIP-Dateien geschrieben.\n"
+        return
+
+    yield f"Konflikte: {len(conflicts)} Zielpfad(e) werden von mehreren ZIP-Dateien geschrieben\n"
+    for items in conflicts:
+        identical = len({(item.file_size, item.CRC) for item in items}) == 1
+        yield f"\n  {items[-1].target_path}{'  (identischer Inhalt)' if identical else ''}\n"
+        for item in items[:-1]:
+            yield f"      {item.archive}  ({format_size(item.file_size)})\n"
+        yield f"    → {items[-1].archive}  ({format_size(items[-1].file_size)})  [gewinnt]\n"
+
+
+# Ergebnis der Prüfung installierter Dateien: Listen von (Zielpfad, Archiv) bzw. (Zielpfad, Archiv, Fehler)
+VerifyResult = namedtuple("VerifyResult", ["ok", "missing", "modified", "errors"])
+
+
+def verify_installation(zip_files, wot_base_path, current_version, index_cache=None, jobs=0,
+                        buffer_size=DEFAULT_BUFFER_SIZE, progress=None):
+    """Vergleiche alle Zieldateien der Archive mit Größe und CRC32 aus den Archiven (parallel, per mmap)"""
+    wot_base_path = Path(wot_base_path)
+    rewriter = get_path_rewriter(current_version)
+    errors = []
+
+    # Zielpfad -> erwarteter Inhalt, bei mehreren Archiven gewinnt wie bei der Installation das letzte
+    expected = {}
+    for zip_file_path in zip_files:
+        archive = Path(zip_file_path).name
+        try:
+            entries = [entry for entry in read_archive_entries(zip_file_path, index_cache)
+                       if not is_directory_member(entry.filename)]
+        except Exception as e:
+            errors.append((None, archive, str(e)))
+            continue
+        targets = rewriter.map_targets([entry.filename for entry in entries])
+        for entry, (_, target_path) in zip(entries, targets):
+            expected[target_key(target_path)] = (target_path, entry.file_size, entry.CRC, archive)
+
+    items = sorted(expected.values())
+    if progress is not None:
+        progress.start(sum(item[1] for item in items), len(items))
+
+    def check(item):
+        # stat und CRC32 im Worker, damit auch langsame Laufwerke parallel abgefragt werden
+        target_path, file_size, crc, _ = item
+        full_target_path = wot_base_path / target_path
+        try:
+            try:
+                stat = os.stat(full_target_path)
+            except FileNotFoundError:
+                return "missing", None
+            if stat.st_size != file_size:
+                return "modified", None
+            actual = file_crc32_mapped(full_target_path, buffer_size, progress)
+            return ("ok" if actual == crc else "modified"), None
+        except OSError as e:
+            return "error", str(e)
+        finally:
+            if progress is not None:
+                progress.file_done()
+
+    ok, missing, modified = [], [], []
+    groups = {"ok": ok, "missing": missing, "modified": modified}
+    with ThreadPoolExecutor(max_workers=resolve_jobs(jobs)) as executor:
+        for (target_path, _, _, archive), (status, error) in zip(items, executor.map(check, items)):
+            if status == "error":
+                errors.append((target_path, archive, error))
+            else:
+                groups[status].append((target_path, archive))
+
+    if progress is not None:
+        progress.report(force=True)
+    return VerifyResult(ok, missing, modified, errors)
+
+
+# Vorschau: Wirkung eines Archiv-Eintrags auf den WoT-Ordner
+DIFF_NEW = "new"
+DIFF_CHANGED = "changed"
+DIFF_IDENTICAL = "identical"
+DIFF_ERROR = "error"
+
+DiffEntry = namedtuple("DiffEntry", ["status", "archive", "member", "target_path", "file_size", "error"])
+
+
+class DiffSummary:
+    """Zählt die Einträge einer Vorschau pro Status und die zu schreibende Datenmenge"""
+
+    def __init__(self):
+        self.counts = {DIFF_NEW: 0, DIFF_CHANGED: 0, DIFF_IDENTICAL: 0, DIFF_ERROR: 0}
+        self.bytes_to_write = 0
+
+    def add(self, entry):
+        """Eintrag mitzählen (gibt ihn unverändert zurück)"""
+        self.counts[entry.status] += 1
+        if entry.status in (DIFF_NEW, DIFF_CHANGED):
+            self.bytes_to_write += entry.file_size
+        return entry
+
+    def format(self):
+        """Kurze Zusammenfassung für Log und Dialog"""
+        text = (f"Neu: {self.counts[DIFF_NEW]}, geändert: {self.counts[DIFF_CHANGED]}, "
+                f"identisch: {self.counts[DIFF_IDENTICAL]}, zu schreiben: {format_size(self.bytes_to_write)}")
+        if self.counts[DIFF_ERROR]:
+            text += f", Fehler: {self.counts[DIFF_ERROR]}"
+        return text
+
+
+def classify_target(full_target_path, key, file_size, crc, file_state, buffer_size=DEFAULT_BUFFER_SIZE):
+    """Neu, geändert oder identisch: erst stat, CRC32 nur bei gleicher Größe und unbekanntem Dateistatus"""
+    try:
+        stat = os.stat(full_target_path)
+    except FileNotFoundError:
+        return DIFF_NEW
+    if stat.st_size != file_size:
+        return DIFF_CHANGED
+    actual = file_state.known_crc(key, stat)
+    if actual is None:
+        actual = file_crc32_mapped(full_target_path, buffer_size)
+    return DIFF_IDENTICAL if actual == crc else DIFF_CHANGED
+
+
+def iter_install_diff(zip_files, wot_base_path, current_version, index_cache=None, buffer_size=DEFAULT_BUFFER_SIZE):
+    """Erzeuge für jeden Zielpfad der Archive einen DiffEntry, sobald er klassifiziert ist (schreibt nichts)"""
+    wot_base_path = Path(wot_base_path)
+    rewriter = get_path_rewriter(current_version)
+    # Nur lesen: Dateien, die seit der letzten inkrementellen Installation unverändert sind, brauchen keine CRC32
+    file_state = FileStateIndex(wot_base_path)
+
+    # Erst alle Inhaltsverzeichnisse: wie bei der Installation zählt pro Zielpfad nur der Eintrag des letzten Archivs
+    archives = []
+    owners = {}
+    for zip_file_path in zip_files:
+        archive = Path(zip_file_path).name
+        try:
+            entries = [entry for entry in read_archive_entries(zip_file_path, index_cache)
+                       if not is_directory_member(entry.filename)]
+        except Exception as e:
+            archives.append((archive, None, str(e)))
+            continue
+        items = [(entry, member, target_path) for entry, (member, target_path)
+                 in zip(entries, rewriter.map_targets([entry.filename for entry in entries]))]
+        for entry_index, (_, _, target_path) in enumerate(items):
+            owners[target_key(target_path)] = (len(archives), entry_index)
+        archives.append((archive, items, None))
+
+    for archive_index, (archive, items, error) in enumerate(archives):
+        if error is not None:
+            yield DiffEntry(DIFF_ERROR, archive, None, None, 0, error)
+            continue
+        for entry_index, (entry, member, target_path) in enumerate(items):
+            key = target_key(target_path)
+            if owners[key] != (archive_index, entry_index):
+                # Ein späteres Archiv überschreibt diesen Zielpfad
+                continue
+            try:
+                status = classify_target(wot_base_path / target_path, key, entry.file_size, entry.CRC, file_state,
+                                         buffer_size)
+            except OSError as e:
+                yield DiffEntry(DIFF_ERROR, archive, member, target_path, entry.file_size, str(e))
+                continue
+            yield DiffEntry(status, archive, member, target_path, entry.file_size, None)
+
+
+def archive_fingerprint(entries):
+    """Fingerabdruck der Metadaten: SHA-256 über Namen, Größen und CRC32 aller Einträge (nicht über die Bytes)"""
+    # Geänderte Dateiinhalte fallen über ihren CRC32 auf, ein Inhaltsverzeichnis mit falschem CRC32 scheitert
+    # spätestens beim Entpacken an der CRC-Prüfung von zipfile
+    digest = hashlib.sha256()
+    for entry in entries:
+        digest.update(f"{entry.filename}\0{entry.file_size}\0{entry.CRC}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Archiv eines Installationsplans, files: [ZIP-Eintrag, Zielpfad, Größe, CRC32] in der Reihenfolge des Archivs
+PlannedArchive = namedtuple("PlannedArchive", ["name", "size", "fingerprint", "files"])
+
+
+class InstallPlan:
+    """Kompilierte Installation (Lockfile): Archive mit Fingerabdruck und Zielpfad jeder Datei"""
+
+    def __init__(self, current_version, archives):
+        self.current_version = current_version
+        self.archives = list(archives)
+        self.by_name = {archive.name: archive for archive in self.archives}
+
+    @classmethod
+    def compile(cls, zip_files, current_version, index_cache=None):
+        """Plane die Installation der Archive für eine Spielversion (defekte Archive lösen einen Fehler aus)"""
+        rewriter = get_path_rewriter(current_version)
+        archives = []
+        for zip_file_path in zip_files:
+            zip_file_path = Path(zip_file_path)
+            try:
+                entries = [entry for entry in read_archive_entries(zip_file_path, index_cache)
+                           if not is_directory_member(entry.filename)]
+                size = zip_file_path.stat().st_size
+            except Exception as e:
+                raise ValueError(f"{zip_file_path.name}: {e}") from e
+            targets = rewriter.map_targets([entry.filename for entry in entries])
+            files = [[member, target_path, entry.file_size, entry.CRC]
+                     for entry, (member, target_path) in zip(entries, targets)]
+            archives.append(PlannedArchive(zip_file_path.name, size, archive_fingerprint(entries), files))
+        return cls(current_version, archives)
+
+    def save(self, plan_path):
+        """Speichere den Plan als JSON"""
+        plan = {
+            "format": PLAN_FORMAT,
+            "version": self.current_version,
+            "archives": [{"name": archive.name, "size": archive.size, "fingerprint": archive.fingerprint,
+                          "files": archive.files} for archive in self.archives],
+        }
+        plan_path = Path(plan_path)
+        temp_file = plan_path.with_name(plan_path.name + ".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(temp_file, plan_path)
+
+    @classmethod
+    def load(cls, plan_path):
+        """Lade einen gespeicherten Plan"""
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
+        if plan.get("format") not in (1, PLAN_FORMAT):
+            raise ValueError(f"Unbekanntes Format des Installationsplans: {plan.get('format')}")
+        # Format 1 speicherte denselben Fingerabdruck unter "sha256"
+        fingerprint_key = "sha256" if plan["format"] == 1 else "fingerprint"
+        return cls(plan["version"], [PlannedArchive(archive["name"], archive["size"], archive[fingerprint_key],
+                                                    archive["files"]) for archive in plan["archives"]])
+
+    def zip_files(self, zip_folder):
+        """Pfade der Archive im ZIP-Ordner, in der geplanten Reihenfolge"""
+        return [Path(zip_folder) / archive.name for archive in self.archives]
+
+    def check(self, zip_folder, index_cache=None):
+        """Vergleiche die Archive im ZIP-Ordner mit ihren Fingerabdrücken, gibt die Abweichungen zurück"""
+        problems = []
+        for archive, zip_file_path in zip(self.archives, self.zip_files(zip_folder)):
+            try:
+                # Größe zuerst: geänderte Archive fallen meist ohne Lesen des Inhaltsverzeichnisses auf
+                if zip_file_path.stat().st_size != archive.size:
+                    problems.append(f"{archive.name}: Größe geändert")
+                    continue
+                entries = [entry for entry in read_archive_entries(zip_file_path, index_cache)
+                           if not is_directory_member(entry.filename)]
+            except FileNotFoundError:
+                problems.append(f"{archive.name}: nicht gefunden")
+                continue
+            except Exception as e:
+                problems.append(f"{archive.name}: {e}")
+                continue
+            if archive_fingerprint(entries) != archive.fingerprint:
+                problems.append(f"{archive.name}: Inhalt geändert")
+        return problems
+
+    def map_targets(self, archive_name, names):
+        """Geplante Zielpfade der Dateien eines Archivs (wie PathRewriter.map_targets)"""
+        files = self.by_name[archive_name].files
+        if [file[0] for file in files] != list(names):
+            raise ValueError(f"{archive_name} entspricht nicht dem Installationsplan")
+        return [(member, target_path) for member, target_path, _, _ in files]
+
+
+def resolve_jobs(jobs):
+    """Anzahl paralleler Installationen bestimmen (0 = Anzahl CPU-Kerne)"""
+    if jobs is None or jobs < 1:
+        return os.cpu_count() or 1
+    return jobs
+
+
+# Leerer Kontext, wenn keine Zeitmessung aktiv ist
+NO_PHASE = contextlib.nullcontext()
+
+
+def no_phase(name, trace=True, args=None):
+    """Ersatz für PhaseProfiler.phase ohne Zeitmessung"""
+    return NO_PHASE
+
+
+class PhaseProfiler:
+    """Optionale Zeitmessung der Installationsphasen pro Archiv (als JSON und Chrome-Trace)"""
+
+    # Phasen außerhalb eines Archivs (Planung, Übernahme, Manifeste)
+    SESSION = "(Session)"
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # Archiv -> {Phase: Sekunden}
+        self.totals = {}
+        self.events = []
+        self.thread_ids = {}
+        self.current = threading.local()
+        self.lock = threading.Lock()
+
+    def set_archive(self, archive_name=None):
+        """Archiv, dem die Messungen des aktuellen Threads zugerechnet werden"""
+        self.current.archive = archive_name or self.SESSION
+
+    def add_time(self, name, seconds):
+        """Addiere eine Dauer zur Summe einer Phase"""
+        archive = getattr(self.current, "archive", self.SESSION)
+        with self.lock:
+            phases = self.totals.setdefault(archive, {})
+            phases[name] = phases.get(name, 0.0) + seconds
+
+    def add_event(self, name, start, end, args=None):
+        """Trace-Ereignis (Start/Ende aus time.perf_counter) im Chrome-Trace-Format"""
+        archive = getattr(self.current, "archive", self.SESSION)
+        with self.lock:
+            tid = self.thread_ids.setdefault(threading.get_ident(), len(self.thread_ids) + 1)
+            event = {
+                "name": name, "cat": archive, "ph": "X", "pid": 1, "tid": tid,
+                "ts": round((start - self.started) * 1000000, 1),
+                "dur": round((end - start) * 1000000, 1),
+            }
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def phase(self, name, trace=True, args=None):
+        """Miss einen Abschnitt (Summe und optional Trace-Ereignis)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.add_time(name, end - start)
+            if trace:
+                self.add_event(name, start, end, args)
+
+    def timed(self, func, name):
+        """Umhülle eine Funktion (z.B. Log-Ausgabe) mit Zeitmessung, ohne Trace-Ereignis pro Aufruf"""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(name, time.perf_counter() - start)
+        return wrapper
+
+    def summary(self):
+        """Summen pro Phase und pro Archiv (in Sekunden)"""
+        with self.lock:
+            archives = {archive: {name: round(seconds, 4) for name, seconds in phases.items()}
+                        for archive, phases in self.totals.items()}
+        phases = {}
+        for archive_phases in archives.values():
+            for name, seconds in archive_phases.items():
+                phases[name] = round(phases.get(name, 0.0) + seconds, 4)
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+            "phases": phases,
+            "archives": archives,
+        }
+
+    def chrome_trace(self):
+        """Alle Ereignisse im Chrome-Trace-Format (chrome://tracing, Perfetto)"""
+        with self.lock:
+            metadata = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": f"Thread {tid}"}}
+                        for tid in self.thread_ids.values()]
+            return {"traceEvents": metadata + list(self.events), "displayTimeUnit": "ms"}
+
+    def save(self, profile_path):
+        """Speichere Zusammenfassung (JSON) und Chrome-Trace (<Name>.trace.json), gibt den Trace-Pfad zurück"""
+        profile_path = Path(profile_path)
+        trace_path = profile_path.with_name(f"{profile_path.stem}.trace.json")
+        with open(profile_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        with open(trace_path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, separators=(',', ':'))
+        return trace_path
+
+
+class InstallSession:
+    """Installiert Mod-ZIP-Dateien nacheinander oder parallel in den WoT Ordner"""
+
+    def __init__(self, wot_base_path, current_version, log=print, file_log=None, buffer_size=DEFAULT_BUFFER_SIZE,
+                 incremental=False, index_cache=None, progress=None, transactional=False, content_store=None,
+                 profiler=None, pipeline=True, plan=None):
+        self.wot_base_path = Path(wot_base_path)
+        self.current_version = current_version
+        self.rewriter = get_path_rewriter(current_version)
+        # Gespeicherter Installationsplan: Zielpfade werden nicht neu berechnet
+        self.plan = plan
+        self.log = log
+        self.file_log = file_log or log
+        self.buffer_size = buffer_size
+
+        # Optionale Zeitmessung pro Phase (Log-Ausgaben zählen als eigene Phase)
+        self.profiler = profiler
+        self.phase = profiler.phase if profiler is not None else no_phase
+        if profiler is not None:
+            self.log = profiler.timed(self.log, "logging")
+            self.file_log = profiler.timed(self.file_log, "logging")
+
+        # Inkrementeller Modus: identische Zieldateien werden nicht neu geschrieben
+        self.incremental = incremental
+        self.file_state = FileStateIndex(wot_base_path) if incremental else None
+        self.written_count = 0
+        self.skipped_count = 0
+        self.lock = threading.Lock()
+
+        # Zielpfad -> (Archiv-Index, ZIP-Eintrag), nur im parallelen bzw. inkrementellen Modus gesetzt
+        self.owners = None
+
+        # Optionaler Index-Cache für die Installationsplanung
+        self.index_cache = index_cache
+
+        # Fortschritt in Bytes (wird von GUI bzw. CLI abgefragt)
+        self.progress = progress or InstallProgress()
+
+        # Transaktionaler Modus: alles oder nichts, Übernahme per Umbenennen
+        self.transaction = InstallTransaction(wot_base_path) if transactional else None
+
+        # Optionaler Dateispeicher: Bereitstellung per Hardlink statt Entpacken
+        self.content_store = content_store
+
+        # Große Einträge überlappend entpacken und schreiben (Worker werden in install_all angelegt)
+        self.pipeline = pipeline
+        self.pipeline_executor = None
+
+        # Manifest pro Archiv (für die Deinstallation): Archivname -> [Zielpfad, Größe, CRC32]
+        self.manifests = ManifestStore(wot_base_path)
+        self.manifest_files = {}
+
+        # Ergebnis pro Archiv, nach install_all gesetzt
+        self.results = []
+
+        # Zielpfad -> (Pfad, Größe) des zuletzt geschriebenen Eintrags, für die Speicherplatzprüfung
+        self.target_sizes = {}
+
+    def plan_install(self, zip_files, parallel=False):
+        """Installationsplanung in einem Durchlauf: Zielordner, Gesamtgröße und (parallel) Besitzer jedes Zielpfads"""
+        # Zielpfad -> Eintrag, der ihn bei sequentieller Installation zuletzt schreibt
+        # Inkrementell auch sequentiell, sonst schreibt ein früheres Archiv um, was das letzte zurückschreibt
+        owners = {} if parallel or self.incremental else None
+        parent_dirs = set()
+        planned = []
+        target_sizes = {}
+
+        for archive_index, member, target_path, file_size in self.iter_target_files(zip_files):
+            key = target_key(target_path)
+            parent_dirs.add((self.wot_base_path / target_path).parent)
+            planned.append((archive_index, member, key, file_size))
+            target_sizes[key] = (target_path, file_size)
+            if owners is not None:
+                owners[key] = (archive_index, member)
+        self.target_sizes = target_sizes
+
+        # Gesamtmenge für die Fortschrittsanzeige (mit Besitzern nur die tatsächlich geschriebenen Einträge)
+        if owners is not None:
+            planned = [item for item in planned if owners.get(item[2]) == (item[0], item[1])]
+        self.progress.start(sum(item[3] for item in planned), len(planned))
+
+        if self.index_cache is not None:
+            self.index_cache.save()
+        return owners, parent_dirs
+
+    def iter_target_files(self, zip_files):
+        """(Archiv-Index, ZIP-Eintrag, Zielpfad, Größe) aller Dateien, aus dem Installationsplan falls vorhanden"""
+        for archive_index, zip_file_path in enumerate(zip_files):
+            if self.plan is not None:
+                files = self.plan.by_name[Path(zip_file_path).name].files
+                for member, target_path, file_size, _ in files:
+                    yield archive_index, member, target_path, file_size
+                continue
+            try:
+                entries = [entry for entry in read_archive_entries(zip_file_path, self.index_cache)
+                           if not is_directory_member(entry.filename)]
+            except Exception:
+                # Defekte Archive werden bei der eigentlichen Installation gemeldet
+                continue
+            targets = self.rewriter.map_targets([entry.filename for entry in entries])
+            for entry, (member, target_path) in zip(entries, targets):
+                yield archive_index, member, target_path, entry.file_size
+
+    def map_targets(self, zip_file_path, names):
+        """Zielpfade der Dateien eines Archivs (aus dem Installationsplan oder per PathRewriter)"""
+        if self.plan is not None:
+            return self.plan.map_targets(Path(zip_file_path).name, names)
+        return self.rewriter.map_targets(names)
+
+    def required_space(self):
+        """Zusätzlich benötigter Platz auf dem WoT-Laufwerk, überschriebene Dateien werden angerechnet"""
+        def allocated(size):
+            return -(-size // ALLOCATION_UNIT) * ALLOCATION_UNIT
+
+        required = sum(allocated(file_size) for _, file_size in self.target_sizes.values())
+        # Transaktional bleiben die ersetzten Dateien als Backup erhalten und geben keinen Platz frei
+        if self.transaction is None:
+            for target_path, _ in self.target_sizes.values():
+                try:
+                    required -= allocated(os.stat(self.wot_base_path / target_path).st_size)
+                except OSError:
+                    continue
+        return required
+
+    def check_disk_space(self):
+        """Prüfe vor dem Schreiben, ob der Platz reicht (löst DiskSpaceError aus)"""
+        total = sum(file_size for _, file_size in self.target_sizes.values())
+        try:
+            free = shutil.disk_usage(self.wot_base_path).free
+        except OSError:
+            # Nicht ermittelbar (z.B. Netzlaufwerk): wie bisher ohne Prüfung installieren
+            return
+        # Meist reicht der Platz auch ohne Anrechnung, dann sind keine stat-Aufrufe pro Datei nötig
+        if total + len(self.target_sizes) * ALLOCATION_UNIT <= free:
+            return
+        required = self.required_space()
+        if required > free:
+            raise DiskSpaceError(f"Nicht genug Speicherplatz in {self.wot_base_path}: "
+                                 f"benötigt {format_size(required)}, frei {format_size(free)}")
+
+    def create_directories(self, parent_dirs):
+        """Lege alle Zielordner einmalig an (flachste zuerst), gibt die neu angelegten Ordner zurück"""
+        directories = set()
+        for directory in parent_dirs:
+            # Alle fehlenden Zwischenordner unterhalb des WoT Ordners einsammeln
+            while directory != self.wot_base_path and directory not in directories:
+                directories.add(directory)
+                if directory.parent == directory:
+                    break
+                directory = directory.parent
+
+        created = []
+        for directory in sorted(directories, key=lambda d: len(d.parts)):
+            try:
+                os.mkdir(directory)
+                created.append(directory)
+            except FileExistsError:
+                pass
+        return created
+
+    def is_target_up_to_date(self, info, target_path, full_target_path):
+        """Prüfe ob die Zieldatei dem ZIP-Eintrag entspricht (erst stat, CRC32 nur falls nötig)"""
+        try:
+            stat = os.stat(full_target_path)
+        except OSError:
+            return False
+
+        if stat.st_size != info.file_size:
+            return False
+
+        # In dieser Transaktion bereits von einem früheren Archiv bereitgestellt: neu schreiben
+        key = target_key(target_path)
+        if self.transaction is not None and self.transaction.is_staged(key):
+            return False
+
+        # Seit der letzten Installation unverändert: gespeicherte CRC32 genügt
+        crc = self.file_state.known_crc(key, stat)
+        if crc is None:
+            crc = file_crc32(full_target_path, self.buffer_size)
+            self.file_state.entries[key] = [stat.st_size, stat.st_mtime_ns, crc]
+        return crc == info.CRC
+
+    def owns_target(self, target_path, archive_index, member):
+        """Parallel bzw. inkrementell schreibt nur das Archiv, das sequentiell zuletzt gewinnen würde"""
+        return self.owners is None or self.owners.get(target_key(target_path)) == (archive_index, member)
+
+    def prepare_write(self, info, target_path, full_target_path):
+        """Pfad, in den ein ZIP-Eintrag geschrieben wird (None: Zieldatei ist bereits aktuell)"""
+        # Inkrementell: identische Dateien überspringen
+        if self.incremental:
+            with self.phase("incremental_check", trace=False):
+                up_to_date = self.is_target_up_to_date(info, target_path, full_target_path)
+            if up_to_date:
+                return None
+
+        # Transaktional: erst in das Staging-Verzeichnis entpacken
+        if self.transaction is not None:
+            return self.transaction.stage_path(target_key(target_path), full_target_path, info.CRC)
+        return full_target_path
+
+    def finish_write(self, info, member, target_path, full_target_path):
+        """Dateistatus einer geschriebenen Datei merken und sie protokollieren"""
+        if self.incremental and self.transaction is None:
+            self.file_state.record(target_key(target_path), full_target_path, info.CRC)
+
+        if target_path != member:
+            self.file_log(f"  {member} → {target_path}")
+        else:
+            self.file_log(f"  → {target_path}")
+
+    def log_archive_done(self, archive_name, written_count, skipped_count):
+        """Erfolgsmeldung eines Archivs"""
+        if self.incremental:
+            self.log(f"✓ {archive_name} erfolgreich installiert "
+                     f"({written_count} geschrieben, {skipped_count} unverändert)")
+        else:
+            self.log(f"✓ {archive_name} erfolgreich installiert")
+
+    def write_member(self, zip_ref, info, write_path, dir_handles):
+        """Schreibe einen ZIP-Eintrag, gibt True zurück wenn er ohne Entpacken aus dem Dateispeicher kam"""
+        if self.content_store is not None:
+            with self.phase("content_store", trace=False):
+                return self.content_store.deploy(zip_ref, info, write_path, self.buffer_size, self.progress)
+        if self.profiler is not None:
+            extract_member_profiled(zip_ref, info, write_path, self.profiler, self.buffer_size, dir_handles,
+                                    self.progress)
+        elif self.pipeline_executor is not None and info.file_size >= PIPELINE_MIN_SIZE:
+            extract_member_pipelined(zip_ref, info, write_path, self.pipeline_executor, self.buffer_size,
+                                     dir_handles, self.progress)
+        else:
+            extract_member(zip_ref, info, write_path, self.buffer_size, dir_handles, self.progress)
+        return False
+
+    def install_archive(self, zip_file_path, archive_index=None):
+        """Installiere eine einzelne Mod-ZIP-Datei"""
+        zip_file_path = Path(zip_file_path)
+        written_count = 0
+        skipped_count = 0
+        manifest_files = []
+        dir_handles = DirectoryHandles()
+        phase = self.phase
+        if self.profiler is not None:
+            self.profiler.set_archive(zip_file_path.name)
+            archive_start = time.perf_counter()
+        try:
+            self.log(f"Installiere: {zip_file_path.name}")
+
+            # Öffnen und Lesen des Inhaltsverzeichnisses getrennt, damit beide Phasen messbar sind
+            with phase("open_archive"):
+                archive_file = open(zip_file_path, 'rb')
+            with archive_file, contextlib.ExitStack() as stack:
+                with phase("central_directory"):
+                    zip_ref = stack.enter_context(zipfile.ZipFile(archive_file, 'r'))
+                    # Verschachtelte ZIP-Dateien werden direkt aus dem äußeren Archiv gelesen
+                    members = list_archive_members(zip_ref, stack, zip_file_path)
+                    targets = self.map_targets(zip_file_path, [info.filename for _, info in members])
+
+                for (source_ref, info), (member, target_path) in zip(members, targets):
+                    if not self.owns_target(target_path, archive_index, member):
+                        continue
+
+                    # Vollständiger Zielpfad (direkt in WoT Hauptordner)
+                    full_target_path = self.wot_base_path / target_path
+
+                    # Auch übersprungene Dateien gehören zum Archiv
+                    manifest_files.append([target_path, info.file_size, info.CRC])
+
+                    write_path = self.prepare_write(info, target_path, full_target_path)
+                    if write_path is None:
+                        skipped_count += 1
+                        self.progress.file_done(info.file_size)
+                        continue
+
+                    # Extrahiere Datei (blockweise, Zielordner wurden bei der Planung angelegt)
+                    try:
+                        stored = self.write_member(source_ref, info, write_path, dir_handles)
+                    except FileNotFoundError:
+                        # Ordner fehlt (z.B. Archiv seit der Planung geändert): nachträglich anlegen
+                        with phase("create_directories"):
+                            write_path.parent.mkdir(parents=True, exist_ok=True)
+                        stored = self.write_member(source_ref, info, write_path, dir_handles)
+                    self.progress.file_done(info.file_size if stored else 0)
+                    self.finish_write(info, member, target_path, full_target_path)
+                    written_count += 1
+
+            self.log_archive_done(zip_file_path.name, written_count, skipped_count)
+            with self.lock:
+                self.manifest_files[zip_file_path.name] = manifest_files
+            return True
+
+        except Exception as e:
+            self.log(f"✗ Fehler bei {zip_file_path.name}: {e}")
+            return False
+
+        finally:
+            dir_handles.close()
+            with self.lock:
+                self.written_count += written_count
+                self.skipped_count += skipped_count
+            if self.profiler is not None:
+                # Gesamtdauer des Archivs als eigene Zeile im Trace
+                archive_end = time.perf_counter()
+                self.profiler.add_time("install", archive_end - archive_start)
+                self.profiler.add_event("install", archive_start, archive_end, {"archive": zip_file_path.name})
+                self.profiler.set_archive(None)
+
+    def finish_transaction(self, zip_files, results):
+        """Übernehme die Transaktion nur, wenn alle Archive fehlerfrei entpackt wurden"""
+        if not all(results):
+            self.transaction.abort()
+            self.log("Transaktion abgebrochen: keine Dateien im WoT Ordner geändert")
+            return [False] * len(results)
+
+        def on_committed(key, full_target_path, crc):
+            if self.file_state is not None:
+                self.file_state.record(key, full_target_path, crc)
+
+        # Bisherige Manifeste der Archive: ein Rollback stellt sie wieder her
+        previous_manifests = {Path(zip_file_path).name: self.manifests.load(Path(zip_file_path).name)
+                              for zip_file_path in zip_files}
+        try:
+            committed = self.transaction.commit(on_committed, previous_manifests)
+        except Exception as e:
+            self.log(f"Fehler bei der Übernahme, Änderungen wurden zurückgerollt: {e}")
+            return [False] * len(results)
+
+        self.log(f"Transaktion übernommen: {committed} Dateien")
+        return results
+
+    def save_manifests(self, zip_files, results):
+        """Speichere die Manifeste der erfolgreich installierten Archive"""
+        # Reihenfolge über mehrere Sessions: spätere Installationen überschreiben frühere
+        session_sequence = time.time_ns()
+        for archive_index, (zip_file_path, result) in enumerate(zip(zip_files, results)):
+            files = self.manifest_files.get(Path(zip_file_path).name)
+            if not result or files is None:
+                continue
+            try:
+                self.manifests.save(Path(zip_file_path).name, self.current_version,
+                                    [session_sequence, archive_index], files)
+            except Exception as e:
+                self.log(f"Fehler beim Speichern des Manifests für {Path(zip_file_path).name}: {e}")
+
+    def prepare_install(self, zip_files, parallel=False):
+        """Installation planen, Platz prüfen, Transaktion beginnen und Zielordner anlegen, gibt die Besitzer zurück"""
+        # Planung: Zielordner einmalig anlegen statt mkdir pro Datei
+        with self.phase("plan"):
+            owners, parent_dirs = self.plan_install(zip_files, parallel)
+
+        # Vor der ersten Änderung: bricht die Installation nicht erst bei vollem Laufwerk ab
+        with self.phase("disk_space"):
+            self.check_disk_space()
+
+        if self.transaction is not None:
+            self.transaction.begin(self.log)
+        try:
+            with self.phase("create_directories"):
+                created_dirs = self.create_directories(parent_dirs)
+            if self.transaction is not None:
+                self.transaction.add_created_dirs(created_dirs)
+        except OSError as e:
+            # Fehlende Ordner werden beim Schreiben einzeln angelegt
+            self.log(f"Fehler beim Anlegen der Zielordner: {e}")
+        return owners
+
+    def finish_install(self, zip_files, results):
+        """Transaktion übernehmen, Manifeste und Dateistatus speichern, gibt die endgültigen Ergebnisse zurück"""
+        if self.transaction is not None:
+            with self.phase("commit"):
+                results = self.finish_transaction(zip_files, results)
+
+        with self.phase("manifest"):
+            self.save_manifests(zip_files, results)
+
+        if self.file_state is not None:
+            try:
+                with self.phase("file_state"):
+                    self.file_state.save()
+            except Exception as e:
+                self.log(f"Fehler beim Speichern des Dateistatus: {e}")
+        return results
+
+    def install_all(self, zip_files, jobs=1):
+        """Installiere mehrere ZIP-Dateien, gibt (Erfolgreich, Fehler) zurück"""
+        zip_files = list(zip_files)
+        jobs = resolve_jobs(jobs)
+        parallel = jobs > 1 and len(zip_files) > 1
+
+        try:
+            owners = self.prepare_install(zip_files, parallel)
+        except DiskSpaceError as e:
+            self.log(f"✗ {e}")
+            self.results = [False] * len(zip_files)
+            return 0, len(zip_files)
+
+        # Ein Entpack-Worker pro gleichzeitig installiertem Archiv
+        if self.pipeline:
+            self.pipeline_executor = ThreadPoolExecutor(max_workers=jobs if parallel else 1)
+        self.owners = owners
+        try:
+            if not parallel:
+                results = [self.install_archive(zip_file, archive_index)
+                           for archive_index, zip_file in enumerate(zip_files)]
+            else:
+                # Threads genügen: zlib und Dateizugriffe geben den GIL während der Arbeit frei
+                with ThreadPoolExecutor(max_workers=jobs) as executor:
+                    results = list(executor.map(self.install_archive, zip_files, range(len(zip_files))))
+        finally:
+            self.owners = None
+            if self.pipeline_executor is not None:
+                self.pipeline_executor.shutdown()
+                self.pipeline_executor = None
+
+        self.progress.report(force=True)
+
+        results = self.finish_install(zip_files, results)
+        self.results = results
+        success_count = sum(1 for result in results if result)
+        return success_count, len(results) - success_count
+
+
+class FleetInstallSession:
+    """Installiert dieselben ZIP-Dateien in mehrere WoT Ordner, jeder Eintrag wird nur einmal entpackt"""
+
+    def __init__(self, sessions, log=print, progress=None):
+        # Eine InstallSession pro Ziel (eigene Version, Transaktion, Manifeste und Dateistatus)
+        self.sessions = list(sessions)
+        self.log = log
+        self.buffer_size = self.sessions[0].buffer_size
+
+        # Gesamtfortschritt über alle Ziele (jedes Ziel zählt mit seinen geschriebenen Bytes)
+        self.progress = progress or InstallProgress()
+
+    def install_archive(self, zip_file_path, archive_index=None):
+        """Installiere ein Archiv in alle Ziele, gibt das Ergebnis pro Ziel zurück"""
+        zip_file_path = Path(zip_file_path)
+        sessions = self.sessions
+        written_counts = [0] * len(sessions)
+        skipped_counts = [0] * len(sessions)
+        manifest_files = [[] for _ in sessions]
+        # Ziel-Index -> Fehler, in dieses Ziel wird das Archiv danach nicht weiter geschrieben
+        errors = {}
+        try:
+            self.log(f"Installiere: {zip_file_path.name}")
+            with contextlib.ExitStack() as stack:
+                zip_ref = stack.enter_context(zipfile.ZipFile(zip_file_path, 'r'))
+                members = list_archive_members(zip_ref, stack, zip_file_path)
+                # Jedes Ziel hat eine eigene Spielversion und damit eigene Zielpfade
+                names = [info.filename for _, info in members]
+                session_targets = [session.map_targets(zip_file_path, names) for session in sessions]
+
+                for entry_index, (source_ref, info) in enumerate(members):
+                    writes = []
+                    for target_index, session in enumerate(sessions):
+                        if target_index in errors:
+                            continue
+                        member, target_path = session_targets[target_index][entry_index]
+                        if not session.owns_target(target_path, archive_index, member):
+                            continue
+
+                        full_target_path = session.wot_base_path / target_path
+                        manifest_files[target_index].append([target_path, info.file_size, info.CRC])
+
+                        write_path = session.prepare_write(info, target_path, full_target_path)
+                        if write_path is None:
+                            skipped_counts[target_index] += 1
+                            self.progress.file_done(info.file_size)
+                            continue
+                        writes.append((target_index, member, target_path, full_target_path, write_path))
+
+                    if not writes:
+                        continue
+
+                    # Einmal entpacken, jeder Block wird in alle Ziele geschrieben
+                    failed = extract_member_to_targets(source_ref, info, [write[4] for write in writes],
+                                                       self.buffer_size, self.progress)
+                    for position, (target_index, member, target_path, full_target_path, _) in enumerate(writes):
+                        self.progress.file_done()
+                        if position in failed:
+                            errors[target_index] = failed[position]
+                            continue
+                        sessions[target_index].finish_write(info, member, target_path, full_target_path)
+                        written_counts[target_index] += 1
+
+        except Exception as e:
+            # Defektes Archiv oder Fehler beim Entpacken: betrifft alle Ziele
+            for target_index in range(len(sessions)):
+                errors.setdefault(target_index, e)
+
+        results = []
+        for target_index, session in enumerate(sessions):
+            with session.lock:
+                session.written_count += written_counts[target_index]
+                session.skipped_count += skipped_counts[target_index]
+            error = errors.get(target_index)
+            if error is not None:
+                session.log(f"✗ Fehler bei {zip_file_path.name}: {error}")
+                results.append(False)
+                continue
+            session.log_archive_done(zip_file_path.name, written_counts[target_index], skipped_counts[target_index])
+            with session.lock:
+                session.manifest_files[zip_file_path.name] = manifest_files[target_index]
+            results.append(True)
+        return results
+
+    def install_all(self, zip_files, jobs=1):
+        """Installiere mehrere ZIP-Dateien in alle Ziele, gibt (Erfolgreich, Fehler) pro Ziel zurück"""
+        zip_files = list(zip_files)
+        jobs = resolve_jobs(jobs)
+        parallel = jobs > 1 and len(zip_files) > 1
+
+        # Ziele ohne genug Speicherplatz werden übersprungen, die übrigen normal installiert
+        all_sessions = self.sessions
+        owners = []
+        ready = []
+        for session in all_sessions:
+            try:
+                owners.append(session.prepare_install(zip_files, parallel))
+            except DiskSpaceError as e:
+                session.log(f"✗ {e}")
+                session.results = [False] * len(zip_files)
+                continue
+            ready.append(session)
+        if not ready:
+            return [(0, len(zip_files)) for _ in all_sessions]
+        totals = [session.progress.snapshot() for session in ready]
+        self.progress.start(sum(total.total_bytes for total in totals), sum(total.total_files for total in totals))
+
+        self.sessions = ready
+        # Wie InstallSession: pro Ziel schreibt nur das Archiv, das sequentiell zuletzt gewinnen würde
+        for session, session_owners in zip(self.sessions, owners):
+            session.owners = session_owners
+        try:
+            if not parallel:
+                archive_results = [self.install_archive(zip_file, archive_index)
+                                   for archive_index, zip_file in enumerate(zip_files)]
+            else:
+                with ThreadPoolExecutor(max_workers=jobs) as executor:
+                    archive_results = list(executor.map(self.install_archive, zip_files, range(len(zip_files))))
+        finally:
+            for session in self.sessions:
+                session.owners = None
+            self.sessions = all_sessions
+
+        self.progress.report(force=True)
+
+        for target_index, session in enumerate(ready):
+            session.results = session.finish_install(zip_files, [result[target_index] for result in archive_results])
+        counts = []
+        for session in all_sessions:
+            success_count = sum(1 for result in session.results if result)
+            counts.append((success_count, len(session.results) - success_count))
+        return counts